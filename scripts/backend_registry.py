@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""생성 백엔드 레지스트리 (여러 모델 서버에 부하 분산)
+
+USE_CODEX if/else 하나로 Codex 또는 localhost Ollama 1대만 쓰던 걸
+여러 엔드포인트(LAN의 Ollama 여러 대, Codex CLI, 로컬 mock)로 나눠 보냄.
+
+- 엔드포인트마다 weight(처리 능력 비율)와 capacity(동시 요청 상한)
+- 라우팅: 진행 중 요청 수 / weight 가 가장 작은 백엔드 (least outstanding)
+  capacity가 꽉 찼으면 다른 백엔드, 전부 꽉 찼으면 빈자리가 날 때까지 대기
+- 실패(None 반환/예외) 시 아직 안 써본 다른 백엔드로 재시도
+- healthy() 가 False인 백엔드(서킷 브레이커 열림 등)는 다른 후보가 있으면 건너뜀
+
+엔드포인트 문자열 (--endpoint, 여러 번 지정 가능):
+  kind=ollama,url=http://gpu1:11434/api/generate,weight=2,capacity=3
+  kind=codex,cmd=codex,mode=worker,capacity=4
+  kind=mock,latency=0.05
+"""
+import threading
+import time
+
+
+class Backend:
+    """엔드포인트 1개. call(prompt, **kwargs) → 텍스트 또는 None"""
+
+    def __init__(self, name: str, kind: str, call, weight: float = 1.0, capacity: int = 1,
+                 healthy=None):
+        if weight <= 0 or capacity <= 0:
+            raise ValueError(f'{name}: weight/capacity는 양수여야 함')
+        self.name = name
+        self.kind = kind
+        self.call = call
+        self.weight = weight
+        self.capacity = capacity
+        self.healthy = healthy or (lambda: True)
+        self.outstanding = 0
+        # 통계
+        self.calls = 0
+        self.failures = 0
+        self.total_latency = 0.0
+
+    def load(self) -> float:
+        """이 백엔드에 1건 더 보냈을 때의 가중 부하"""
+        return (self.outstanding + 1) / self.weight
+
+
+class BackendRegistry:
+    def __init__(self, backends=()):
+        self.backends = []
+        self.reroutes = 0
+        self._cond = threading.Condition()
+        for b in backends:
+            self.add(b)
+
+    def add(self, backend: Backend):
+        if any(b.name == backend.name for b in self.backends):
+            raise ValueError(f'백엔드 이름 중복: {backend.name}')
+        self.backends.append(backend)
+
+    def total_capacity(self) -> int:
+        return sum(b.capacity for b in self.backends)
+
+    def kinds(self) -> set:
+        return {b.kind for b in self.backends}
+
+    def _acquire(self, tried: set):
+        """안 써본 백엔드 중 가중 부하가 가장 낮은 것을 점유. 후보가 없으면 None"""
+        with self._cond:
+            while True:
+                candidates = [b for b in self.backends if b.name not in tried]
+                if not candidates:
+                    return None
+                healthy = [b for b in candidates if b.healthy()]
+                pool = healthy or candidates
+                free = [b for b in pool if b.outstanding < b.capacity]
+                if free:
+                    best = min(free, key=lambda b: (b.load(), b.calls))
+                    best.outstanding += 1
+                    return best
+                self._cond.wait()
+
+    def _release(self, backend: Backend, elapsed: float, ok: bool):
+        with self._cond:
+            backend.outstanding -= 1
+            backend.calls += 1
+            backend.total_latency += elapsed
+            if not ok:
+                backend.failures += 1
+            self._cond.notify_all()
+
+    def call(self, prompt: str, **kwargs):
+        """프롬프트 1건 생성. 실패하면 다른 백엔드로 넘김 — 전부 실패 시 None"""
+        tried = set()
+        while True:
+            backend = self._acquire(tried)
+            if backend is None:
+                return None
+            if tried:
+                with self._cond:
+                    self.reroutes += 1
+                print(f"  → {backend.name}로 재시도")
+            tried.add(backend.name)
+
+            start = time.time()
+            text = None
+            try:
+                text = backend.call(prompt, **kwargs)
+            except Exception as e:
+                print(f"  {backend.name} exception: {e}")
+            self._release(backend, time.time() - start, bool(text))
+            if text:
+                return text
+
+    def summary(self) -> str:
+        lines = [f'백엔드 {len(self.backends)}개 (동시 상한 합계 {self.total_capacity()}), 재라우팅 {self.reroutes}회']
+        for b in self.backends:
+            avg = b.total_latency / b.calls if b.calls else 0.0
+            lines.append(f'  {b.name}: {b.calls}건, 실패 {b.failures}, 평균 {avg:.2f}초 '
+                         f'(weight {b.weight:g}, capacity {b.capacity})')
+        return '\n'.join(lines)
+
+
+def parse_endpoint(spec: str) -> dict:
+    """'kind=ollama,url=...,weight=2' → {'kind': 'ollama', 'url': ..., 'weight': 2.0}"""
+    fields = {}
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '=' not in part:
+            raise ValueError(f'엔드포인트 형식 오류 (key=value 아님): {part!r}')
+        k, v = part.split('=', 1)
+        fields[k.strip()] = v.strip()
+    if 'kind' not in fields:
+        raise ValueError(f'엔드포인트에 kind 없음: {spec!r}')
+    if 'weight' in fields:
+        fields['weight'] = float(fields['weight'])
+    if 'capacity' in fields:
+        fields['capacity'] = int(fields['capacity'])
+    return fields
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""생성 처리량/비용 벤치마크
+
+sample_ai_narrative.py의 "평균 1개당 N초 × 14,400" 손 계산 대신
+설정 조합(matrix)별로 실제 호출을 돌려 숫자를 남김.
+
+matrix 축: 모델 × num_predict × temperature × 동시성 × 결정 박스 묶음(on/off)
+셀마다 기록:
+- 호출 지연 p50/p95/p99 (초), TTFT p50/p95
+- tokens/sec (스트림 디코딩 속도) / 처리량 tok/s (전체 토큰 ÷ 벽시계)
+- keys/min, 전체 840키 예상 소요(분)
+- 통과율 — validate_narratives 규칙 (길이 + 금지어 + 깨진 문법),
+  결정 박스는 🟢/🟡/🔴 3줄이 모두 파싱되면 통과
+
+결과: JSON 리포트 (--out). --compare BASE.json 으로 이전 리포트와 셀별 비교.
+LLM 캐시를 거치지 않고 매번 실제 호출.
+
+사용:
+  python scripts/bench_generation.py --mock --concurrency 1,4,8 --batching on,off
+  python scripts/bench_generation.py --url http://gpu1:11434/api/generate \\
+      --models gemma4:31b,qwen3.5:27b --num-predict 256,512 --samples 12
+  python scripts/bench_generation.py --mock --compare scripts/.cache/bench/bench_20260101_000000.json
+  python scripts/bench_generation.py --compare base.json new.json   (실행 없이 비교만)
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+import generate_narratives_v2 as v2
+from mock_ollama import MockOllamaHandler
+from ollama_client import generate_stream
+from validate_narratives import (BROKEN_GRAMMAR, FORBIDDEN, LENGTH_MAX_OVERALL,
+                                 LENGTH_MIN_OVERALL)
+
+REPORT_VERSION = 1
+DEFAULT_OUT_DIR = os.path.join(os.path.dirname(__file__), '.cache', 'bench')
+FULL_RUN_KEYS = 840  # v2 전체: overall 360 + categories 120 + decisions 360
+COMPARE_METRICS = [
+    # (리포트 경로, 표시 이름, 클수록 좋은지)
+    (('latency_s', 'p50'), 'p50', False),
+    (('latency_s', 'p95'), 'p95', False),
+    (('tokens_per_sec',), 'tok/s', True),
+    (('keys_per_min',), 'keys/min', True),
+    (('pass_rate',), '통과율', True),
+]
+
+
+def percentile(sorted_vals, p: float) -> float:
+    """nearest-rank 백분위 (정렬된 리스트)"""
+    if not sorted_vals:
+        return 0.0
+    rank = max(1, -(-len(sorted_vals) * p // 100))  # ceil(n * p / 100)
+    return sorted_vals[int(rank) - 1]
+
+
+def summarize(values) -> dict:
+    vals = sorted(values)
+    if not vals:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0, 'max': 0.0}
+    return {
+        'p50': round(percentile(vals, 50), 3),
+        'p95': round(percentile(vals, 95), 3),
+        'p99': round(percentile(vals, 99), 3),
+        'mean': round(sum(vals) / len(vals), 3),
+        'max': round(vals[-1], 3),
+    }
+
+
+def overall_passes(text: str) -> list:
+    """validate_narratives의 overall 규칙: 길이 범위 + 금지어 0 + 깨진 문법 0"""
+    text = v2._clean_output(text)
+    if not LENGTH_MIN_OVERALL <= len(text) <= LENGTH_MAX_OVERALL:
+        return [False]
+    return [not any(re.search(p, text) for p, _ in FORBIDDEN + BROKEN_GRAMMAR)]
+
+
+def decision_batch_passes(text: str) -> list:
+    """묶음 응답 → 단계별 통과 여부 (3줄이 다 파싱된 단계만 통과)"""
+    parsed = v2.parse_decision_batch(text, v2.TWELVE_STAGES)
+    return [stage in parsed for stage in v2.TWELVE_STAGES]
+
+
+def decision_passes(text: str) -> list:
+    return [all(v2._parse_decision_lines(text.split('\n')).values())]
+
+
+def build_workload(samples: int, decision_groups: int, batching: bool):
+    """[(프롬프트, 키 목록, 판정 함수, num_predict 배수)] — 셀마다 같은 키 집합.
+    판정 함수: 응답 → 키별 통과 여부 리스트"""
+    prompts = v2.build_prompts()
+    overall_keys = list(prompts['overall'])
+    step = max(1, len(overall_keys) // max(1, samples))
+    work = []
+    for key in overall_keys[::step][:samples]:
+        work.append((prompts['overall'][key][0], [key], overall_passes, 1))
+
+    groups = list(itertools.product(v2.TEN_GODS, v2.YONGSIN_TYPES))[:decision_groups]
+    for ten_god, yongsin in groups:
+        keys = [f"{ten_god}_{yongsin}_{stage}" for stage in v2.TWELVE_STAGES]
+        if batching:
+            prompt = v2.generate_prompt_decision_batch(ten_god, yongsin, v2.TWELVE_STAGES)
+            work.append((prompt, keys, decision_batch_passes, len(keys)))
+        else:
+            for key in keys:
+                work.append((prompts['decisions'][key][0], [key], decision_passes, 1))
+    return work
+
+
+def run_cell(url: str, cell: dict, work) -> dict:
+    """셀 1개 실행 → 지표 dict"""
+    base_options = {'temperature': cell['temperature'], 'num_predict': cell['num_predict'], 'top_p': 0.92}
+    calls = []
+    lock = threading.Lock()
+
+    def one(item):
+        prompt, keys, judge, scale = item
+        options = dict(base_options, num_predict=cell['num_predict'] * scale)
+        try:
+            result = generate_stream(url, cell['model'], prompt, options)
+            passed = judge(result['text'])
+            entry = {'ok': True, 'keys': len(keys), 'passed': sum(passed), **result}
+        except Exception as e:
+            entry = {'ok': False, 'keys': len(keys), 'passed': 0, 'error': str(e)}
+        with lock:
+            calls.append(entry)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=cell['concurrency']) as pool:
+        list(pool.map(one, work))
+    wall = time.time() - start
+
+    ok = [c for c in calls if c['ok']]
+    keys = sum(c['keys'] for c in calls)
+    tokens = sum(c['tokens'] for c in ok)
+    gen_time = sum(c['elapsed_s'] - c['ttft_s'] for c in ok if c['ttft_s'] is not None)
+    keys_per_sec = keys / wall if wall > 0 else 0.0
+    return {
+        **cell,
+        'calls': len(calls),
+        'errors': len(calls) - len(ok),
+        'keys': keys,
+        'wall_s': round(wall, 3),
+        'latency_s': summarize(c['elapsed_s'] for c in ok),
+        'ttft_s': summarize(c['ttft_s'] for c in ok if c['ttft_s'] is not None),
+        'tokens': tokens,
+        'tokens_per_sec': round(tokens / gen_time, 1) if gen_time > 0 else 0.0,
+        'throughput_tok_s': round(tokens / wall, 1) if wall > 0 else 0.0,
+        'keys_per_min': round(keys_per_sec * 60, 1),
+        'pass_rate': round(sum(c['passed'] for c in calls) / keys, 4) if keys else 0.0,
+        'est_full_run_min': round(FULL_RUN_KEYS / keys_per_sec / 60, 1) if keys_per_sec > 0 else None,
+    }
+
+
+def cell_id(cell: dict) -> str:
+    return (f"{cell['model']}|np={cell['num_predict']}|t={cell['temperature']}"
+            f"|c={cell['concurrency']}|batch={'on' if cell['batching'] else 'off'}")
+
+
+def _metric(cell: dict, path):
+    value = cell
+    for part in path:
+        value = value[part]
+    return value
+
+
+def compare_reports(base: dict, new: dict) -> str:
+    """같은 셀 id끼리 주요 지표 변화율 표"""
+    base_cells = {c['id']: c for c in base['cells']}
+    lines = [f"비교: {base.get('created', '?')} → {new.get('created', '?')}"]
+    matched = 0
+    for cell in new['cells']:
+        old = base_cells.get(cell['id'])
+        if old is None:
+            lines.append(f"  {cell['id']}: 기준 리포트에 없음")
+            continue
+        matched += 1
+        parts = []
+        for path, label, higher_better in COMPARE_METRICS:
+            a, b = _metric(old, path), _metric(cell, path)
+            if a:
+                change = (b - a) / a * 100
+                better = (change > 0) == higher_better
+                mark = '' if abs(change) < 5 else (' ▲' if better else ' ▼')
+                parts.append(f"{label} {a:g}→{b:g} ({change:+.0f}%{mark})")
+            else:
+                parts.append(f"{label} {a:g}→{b:g}")
+        lines.append(f"  {cell['id']}: " + ', '.join(parts))
+    lines.append(f"  일치 셀 {matched}/{len(new['cells'])} (▲ 개선 / ▼ 악화, 5% 이상 변화만 표시)")
+    return '\n'.join(lines)
+
+
+def start_mock_server(latency: float, token_delay: float) -> str:
+    """프로세스 안에 mock Ollama를 빈 포트로 띄우고 URL 반환"""
+    MockOllamaHandler.latency = latency
+    MockOllamaHandler.token_delay = token_delay
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}/api/generate'
+
+
+def _csv(cast):
+    return lambda s: [cast(x.strip()) for x in s.split(',') if x.strip()]
+
+
+def _on_off(s: str) -> bool:
+    if s not in ('on', 'off'):
+        raise argparse.ArgumentTypeError(f'on/off만 가능: {s}')
+    return s == 'on'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='생성 처리량/비용 벤치마크')
+    parser.add_argument('--url', default=v2.OLLAMA_URL, help='Ollama /api/generate URL')
+    parser.add_argument('--mock', action='store_true', help='프로세스 안에 mock 서버를 띄워서 측정')
+    parser.add_argument('--mock-latency', type=float, default=0.2, help='mock 요청당 지연 (초)')
+    parser.add_argument('--mock-token-delay', type=float, default=0.005, help='mock 토큰 간 지연 (초)')
+    parser.add_argument('--models', type=_csv(str), default=[v2.MODEL])
+    parser.add_argument('--num-predict', type=_csv(int), default=[512])
+    parser.add_argument('--temperature', type=_csv(float), default=[0.85])
+    parser.add_argument('--concurrency', type=_csv(int), default=[1, 4])
+    parser.add_argument('--batching', type=_csv(_on_off), default=[True, False],
+                        help='결정 박스 묶음 on/off (예: on,off)')
+    parser.add_argument('--samples', type=int, default=24, help='셀당 overall 프롬프트 수')
+    parser.add_argument('--decision-groups', type=int, default=2,
+                        help='셀당 결정 박스 그룹 수 (그룹당 12키)')
+    parser.add_argument('--out', help='리포트 경로 (기본 scripts/.cache/bench/bench_<시각>.json)')
+    parser.add_argument('--compare', nargs='+', metavar='REPORT',
+                        help='기준 리포트 (1개면 이번 실행과 비교, 2개면 실행 없이 둘을 비교)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0], encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.compare[1], encoding='utf-8') as f:
+            new = json.load(f)
+        print(compare_reports(base, new))
+        return
+
+    url = start_mock_server(args.mock_latency, args.mock_token_delay) if args.mock else args.url
+    cells = [
+        {'model': m, 'num_predict': n, 'temperature': t, 'concurrency': c, 'batching': b}
+        for m, n, t, c, b in itertools.product(args.models, args.num_predict, args.temperature,
+                                               args.concurrency, args.batching)
+    ]
+    print(f"=== 벤치마크: {len(cells)}셀, 백엔드 {url}{' (mock)' if args.mock else ''} ===")
+
+    results = []
+    for i, cell in enumerate(cells, 1):
+        work = build_workload(args.samples, args.decision_groups, cell['batching'])
+        r = run_cell(url, cell, work)
+        r['id'] = cell_id(cell)
+        results.append(r)
+        lat = r['latency_s']
+        print(f"[{i}/{len(cells)}] {r['id']}: 호출 {r['calls']}회 (오류 {r['errors']}), "
+              f"p50 {lat['p50']:.2f} / p95 {lat['p95']:.2f} / p99 {lat['p99']:.2f}초, "
+              f"{r['tokens_per_sec']:.1f} tok/s, {r['keys_per_min']:.1f} keys/min, "
+              f"통과 {r['pass_rate'] * 100:.0f}%, 전체 {FULL_RUN_KEYS}키 예상 {r['est_full_run_min']}분")
+
+    report = {
+        'version': REPORT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': platform.node(),
+        'backend': 'mock' if args.mock else url,
+        'workload': {'samples': args.samples, 'decision_groups': args.decision_groups},
+        'cells': results,
+    }
+    out = args.out or os.path.join(DEFAULT_OUT_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n리포트: {out}")
+
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as f:
+            print(compare_reports(json.load(f), report))
+
+
+if __name__ == '__main__':
+    main()
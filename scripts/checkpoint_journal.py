@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""생성 결과 체크포인트 저널 (append-only JSONL)
+
+기존 save_progress()는 10개마다 results 전체를 indent=2로 다시 써서
+파일이 커질수록 쓰기량이 O(n²)로 늘고, 쓰는 도중 죽으면 JSON이 깨졌음.
+
+저널 방식:
+- 키 1개 완료 → {"s": 섹션, "k": 키, "v": 값} 한 줄 append + fsync (O(1))
+- 재시작 → 본 JSON(마지막 compact 결과) 로드 후 저널을 순서대로 replay
+- 마지막 줄이 쓰다 만 상태면 그 줄만 버림 (나머지는 온전)
+  재시작 후 첫 append 전에 그 조각을 잘라냄 → 새 줄이 조각에 이어 붙어 같이 버려지는 일 없음
+- compact() → 임시 파일에 전체 JSON 기록 후 os.replace로 교체, 저널 비움
+
+파일:
+  <output>.json          — compact된 본 결과 (앱/후처리가 읽는 파일)
+  <output>.journal.jsonl — 마지막 compact 이후 완료된 키들
+
+append(..., input_hash=)를 주면 줄에 "h"로 같이 기록 → load() 후 self.hashes
+({섹션: {키: 해시}})로 복원 (regen_manifest용).
+"""
+import json
+import os
+import threading
+
+_TAIL_CHUNK = 1 << 16
+
+
+def _truncate_partial_line(path: str) -> int:
+    """파일이 줄바꿈으로 안 끝나면 마지막 줄바꿈 뒤(쓰다 만 줄)를 잘라냄 → 잘라낸 바이트 수"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - _TAIL_CHUNK)
+            f.seek(start)
+            chunk = f.read(pos - start)
+            nl = chunk.rfind(b'\n')
+            if nl != -1:
+                keep = start + nl + 1
+                break
+            pos = start
+        else:
+            keep = 0
+        if keep < end:
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+        return end - keep
+
+
+class CheckpointJournal:
+    def __init__(self, output_path: str, sections):
+        self.output_path = output_path
+        self.journal_path = os.path.splitext(output_path)[0] + '.journal.jsonl'
+        self.sections = list(sections)
+        self._lock = threading.Lock()
+        self._fh = None
+        self.hashes = {s: {} for s in self.sections}
+
+    def load(self):
+        """본 JSON + 저널 replay → (results, replay된 줄 수, 버린 줄 수)"""
+        results = {s: {} for s in self.sections}
+        if os.path.exists(self.output_path):
+            with open(self.output_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            for s in self.sections:
+                if s in existing:
+                    results[s] = existing[s]
+
+        replayed = dropped = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        dropped += 1  # 크래시로 잘린 줄
+                        continue
+                    if entry.get('s') in results:
+                        results[entry['s']][entry['k']] = entry['v']
+                        if entry.get('h'):
+                            self.hashes[entry['s']][entry['k']] = entry['h']
+                        replayed += 1
+        return results, replayed, dropped
+
+    def append(self, section: str, key: str, value, input_hash: str = None):
+        """완료된 키 1개를 저널에 기록 (한 줄 write + fsync)"""
+        entry = {'s': section, 'k': key, 'v': value}
+        if input_hash:
+            entry['h'] = input_hash
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._fh is None:
+                _truncate_partial_line(self.journal_path)  # 크래시로 잘린 마지막 줄
+                self._fh = open(self.journal_path, 'a', encoding='utf-8')
+            self._fh.write(line)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def compact(self, results: dict):
+        """results 전체를 본 JSON으로 원자적 교체 후 저널 비움"""
+        tmp_path = self.output_path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.output_path)
+
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""CLI 기반 백엔드용 상주 워커 풀 (MCP stdio)
+
+`codex exec <prompt>`를 프롬프트마다 실행하면 키 840개 × Node 런타임 부팅 비용.
+대신 `codex mcp-server`처럼 stdio로 JSON-RPC를 주고받는 자식 프로세스를
+N개 띄워두고(warm) 프롬프트를 나눠 보냄.
+
+프로토콜 (MCP stdio — 줄 단위 JSON-RPC 2.0):
+  → initialize / notifications/initialized (워커 시작 시 1회)
+  → tools/call {"name": <tool>, "arguments": {"prompt": ..., ...}}
+  ← result.content[].text
+  응답 id가 다른 메시지(진행 알림 등)는 무시.
+
+- 워커별 호출 수/누적 지연/실패/재시작 횟수 기록 → summary()
+- 타임아웃/프로세스 종료 시 해당 워커만 죽이고 다음 호출 때 새로 띄움
+- 로컬 테스트: scripts/fake_codex_cli.py (같은 프로토콜의 가짜 CLI)
+"""
+import json
+import queue
+import subprocess
+import threading
+import time
+
+MCP_PROTOCOL_VERSION = '2025-03-26'
+
+
+class WorkerError(Exception):
+    """워커 응답 오류/타임아웃/비정상 종료"""
+
+
+class CliWorker:
+    """MCP stdio 서버 자식 프로세스 1개"""
+
+    def __init__(self, worker_id: int, cmd, tool_name: str, tool_args: dict = None,
+                 startup_timeout: float = 60):
+        self.worker_id = worker_id
+        self.cmd = list(cmd)
+        self.tool_name = tool_name
+        self.tool_args = dict(tool_args or {})
+        self.startup_timeout = startup_timeout
+        self.proc = None
+        self._inbox = None
+        self._next_id = 0
+        # 통계
+        self.calls = 0
+        self.failures = 0
+        self.restarts = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    # --- 프로세스 관리 ---
+    def _spawn(self):
+        self.proc = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+        )
+        self._inbox = queue.Queue()
+        reader = threading.Thread(target=self._read_loop, args=(self.proc, self._inbox), daemon=True)
+        reader.start()
+
+        self._request('initialize', {
+            'protocolVersion': MCP_PROTOCOL_VERSION,
+            'capabilities': {},
+            'clientInfo': {'name': 'sajutoday-generator', 'version': '1.0'},
+        }, timeout=self.startup_timeout)
+        self._send({'jsonrpc': '2.0', 'method': 'notifications/initialized'})
+
+    @staticmethod
+    def _read_loop(proc, inbox):
+        for line in proc.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                inbox.put(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # 로그 등 JSON 아닌 줄은 무시
+        inbox.put(None)  # EOF
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def ensure_started(self):
+        if not self.alive():
+            if self.proc is not None:
+                self.restarts += 1
+            self._spawn()
+
+    def kill(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+
+    def close(self):
+        if self.proc is None or self.proc.poll() is not None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.kill()
+
+    # --- JSON-RPC ---
+    def _send(self, msg: dict):
+        self.proc.stdin.write(json.dumps(msg, ensure_ascii=False) + '\n')
+        self.proc.stdin.flush()
+
+    def _request(self, method: str, params: dict, timeout: float):
+        self._next_id += 1
+        req_id = self._next_id
+        self._send({'jsonrpc': '2.0', 'id': req_id, 'method': method, 'params': params})
+
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise WorkerError(f'worker {self.worker_id}: {method} 타임아웃 ({timeout:.0f}초)')
+            try:
+                msg = self._inbox.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if msg is None:
+                raise WorkerError(f'worker {self.worker_id}: 프로세스 종료 (rc={self.proc.poll()})')
+            if msg.get('id') != req_id or 'method' in msg:
+                continue  # 알림/서버 요청 — 무시
+            if 'error' in msg:
+                raise WorkerError(f"worker {self.worker_id}: {msg['error'].get('message', msg['error'])}")
+            return msg.get('result', {})
+
+    def call(self, prompt: str, timeout: float) -> str:
+        """프롬프트 1건 → 응답 텍스트. 실패 시 워커를 죽이고 WorkerError"""
+        start = time.time()
+        try:
+            self.ensure_started()
+            result = self._request('tools/call', {
+                'name': self.tool_name,
+                'arguments': {'prompt': prompt, **self.tool_args},
+            }, timeout=timeout)
+        except (WorkerError, OSError, ValueError) as e:
+            self.failures += 1
+            self.kill()  # 상태를 알 수 없는 워커는 폐기 → 다음 호출 때 재시작
+            if isinstance(e, WorkerError):
+                raise
+            raise WorkerError(f'worker {self.worker_id}: {e}') from e
+        elapsed = time.time() - start
+        self.calls += 1
+        self.total_latency += elapsed
+        self.max_latency = max(self.max_latency, elapsed)
+
+        if result.get('isError'):
+            self.failures += 1
+            raise WorkerError(f'worker {self.worker_id}: 도구 오류 응답')
+        return ''.join(c.get('text', '') for c in result.get('content', []) if c.get('type') == 'text')
+
+
+class CliWorkerPool:
+    """워커 N개를 유지하고 프롬프트를 빈 워커에 배정"""
+
+    def __init__(self, cmd, size: int, tool_name: str, tool_args: dict = None,
+                 startup_timeout: float = 60):
+        self.workers = [CliWorker(i, cmd, tool_name, tool_args, startup_timeout) for i in range(size)]
+        self._idle = queue.Queue()
+        for w in self.workers:
+            self._idle.put(w)
+
+    def call(self, prompt: str, timeout: float = 180) -> str:
+        worker = self._idle.get()
+        try:
+            return worker.call(prompt, timeout)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for w in self.workers:
+            w.close()
+
+    def summary(self) -> str:
+        lines = [f'CLI 워커 풀: {len(self.workers)}개']
+        for w in self.workers:
+            avg = w.total_latency / w.calls if w.calls else 0.0
+            lines.append(f'  worker {w.worker_id}: {w.calls}건, 평균 {avg:.2f}초 / 최대 {w.max_latency:.2f}초, '
+                         f'실패 {w.failures}, 재시작 {w.restarts}')
+        return '\n'.join(lines)
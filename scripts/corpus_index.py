@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""코퍼스 단어-문서 색인 (validate_narratives 공용)
+
+기존 검증: 금지어 8개 + 깨진 문법 7개 + 클리셰 6개 + 관계 어절 6개 = 검사마다 전체 텍스트를 한 번씩,
+거기에 Gini용 토큰화 한 번 → 검사를 늘릴 때마다 검증 시간이 코퍼스 크기만큼 늘어남.
+
+색인 방식:
+1. 텍스트마다 토큰화 1회 (공백 분리 + 기호 제거 — 기존 Gini 어절과 같은 규칙)
+   → 문서별 단어 번호 배열 (CSR: indptr / indices)
+2. finalize(): (단어, 문서) 쌍을 정렬해 단어별 문서 목록(posting, CSC) + 단어별 총 빈도 / 문서 빈도
+3. 검사 = 후보 문서 찾기 + 후보만 정확히 확인
+   - 리터럴 → 그 리터럴을 포함하는 단어들 (단어 사전 전체를 이어 붙인 문자열에서 str.find)
+     → 그 단어들의 posting 합집합. 공백이 들어간 리터럴은 조각별 후보의 교집합
+   - 정규식 → rewrite_engine.required_literals (AND of OR) 조건별 후보의 교집합
+   - 후보 문서에만 원래 검사(re.search / in)를 돌려 확정 → 기존 전체 스캔과 결과 동일
+   리터럴을 못 뽑는 검사만 전체 문서 확인
+→ 검사 1개 추가 비용 = 단어 사전 검색 + 후보 문서 수 (코퍼스 전체 스캔 아님)
+
+NumPy가 있으면 배열 연산(np.unique / bincount / searchsorted), 없으면 같은 결과를 파이썬 리스트로.
+"""
+import re
+from array import array
+from bisect import bisect_right
+from collections import Counter
+
+from rewrite_engine import required_literals
+
+try:
+    import numpy as np
+except ImportError:  # NumPy는 선택 — 없으면 posting을 파이썬 리스트로
+    np = None
+
+_STRIP_RE = re.compile(r'[^\w가-힣\s]')  # 어절에서 뺄 기호 (공백은 남겨 토큰 경계 유지)
+_WORD_LITERAL_RE = re.compile(r'[\w가-힣]+')
+_SEP = '\n'  # 단어 사전 문자열 구분자 (토큰에 절대 안 들어감)
+
+
+def tokenize(text: str) -> list:
+    """어절 목록 — re.split(r'\\s+') 후 어절마다 [^\\w가-힣] 제거한 것과 같음 (빈 어절 제외)"""
+    return _STRIP_RE.sub('', text).split()
+
+
+class CorpusIndex:
+    """add(섹션, 텍스트)로 문서를 쌓고 finalize() 후 검사 질의"""
+
+    def __init__(self):
+        self.texts = []       # 후보 확인용 원문
+        self.sections = []
+        self.vocab = {}       # 단어 → 번호 (처음 나온 순서)
+        self.terms = []       # 번호 → 단어
+        self._indices = array('q')
+        self._indptr = [0]
+        self._blob = None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, section: str, text: str):
+        vocab = self.vocab
+        ids = []
+        for token in tokenize(text):
+            tid = vocab.get(token)
+            if tid is None:
+                tid = vocab[token] = len(self.terms)
+                self.terms.append(token)
+            ids.append(tid)
+        self._indices.extend(ids)
+        self._indptr.append(len(self._indices))
+        self.texts.append(text)
+        self.sections.append(section)
+
+    def finalize(self):
+        """posting(단어 → 문서 목록), 단어 빈도, 문서 빈도 계산"""
+        n_terms = len(self.terms)
+        if np is not None:
+            indices = np.frombuffer(self._indices, dtype=np.int64) if len(self._indices) else np.zeros(0, np.int64)
+            doc_of = np.repeat(np.arange(len(self.texts)), np.diff(self._indptr))
+            self.term_counts = np.bincount(indices, minlength=n_terms)
+            # (단어, 문서) 쌍 중복 제거 + 단어 순 정렬 → CSC posting
+            pairs = np.unique(indices * max(len(self.texts), 1) + doc_of)
+            pair_terms = pairs // max(len(self.texts), 1)
+            self._post_docs = pairs % max(len(self.texts), 1)
+            self._post_ptr = np.searchsorted(pair_terms, np.arange(n_terms + 1))
+            self.doc_freq = np.diff(self._post_ptr)
+        else:
+            postings = [[] for _ in range(n_terms)]
+            counts = [0] * n_terms
+            for doc in range(len(self.texts)):
+                ids = self._indices[self._indptr[doc]:self._indptr[doc + 1]]
+                for tid in ids:
+                    counts[tid] += 1
+                for tid in dict.fromkeys(ids):
+                    postings[tid].append(doc)
+            self._postings = postings
+            self.term_counts = counts
+            self.doc_freq = [len(p) for p in postings]
+        # 단어 사전을 한 문자열로 (리터럴을 포함하는 단어 찾기 = str.find 반복)
+        self._blob = _SEP + _SEP.join(self.terms) + _SEP
+        offsets, pos = [], 1
+        for term in self.terms:
+            offsets.append(pos)
+            pos += len(term) + 1
+        self._offsets = offsets
+        return self
+
+    # === 후보 문서 ===
+
+    def _terms_containing(self, literal: str) -> list:
+        found = []
+        blob, offsets = self._blob, self._offsets
+        pos = blob.find(literal)
+        while pos != -1:
+            tid = bisect_right(offsets, pos) - 1  # pos가 속한 단어
+            found.append(tid)
+            pos = blob.find(literal, offsets[tid] + len(self.terms[tid]) + 1)  # 같은 단어 안 중복은 건너뜀
+        return found
+
+    def _docs_for_terms(self, tids) -> set:
+        if np is not None:
+            if not tids:
+                return set()
+            parts = [self._post_docs[self._post_ptr[t]:self._post_ptr[t + 1]] for t in tids]
+            return set(np.concatenate(parts).tolist())
+        docs = set()
+        for t in tids:
+            docs.update(self._postings[t])
+        return docs
+
+    def docs_with_literal(self, literal: str):
+        """literal이 들어 있을 수 있는 문서 (상위 집합). 색인으로 못 좁히면 None (= 전체)"""
+        pieces = literal.split()
+        if not pieces or any(not _WORD_LITERAL_RE.fullmatch(p) for p in pieces):
+            return None  # 기호가 든 리터럴은 토큰에서 지워졌을 수 있음
+        docs = None
+        for piece in pieces:
+            found = self._docs_for_terms(self._terms_containing(piece))
+            docs = found if docs is None else docs & found
+            if not docs:
+                break
+        return docs
+
+    def candidates(self, requires) -> list:
+        """AND of OR 리터럴 조건 → 후보 문서 번호 (오름차순). 조건이 없으면 전체"""
+        docs = None
+        for group in requires:
+            union = set()
+            for lit in group:
+                found = self.docs_with_literal(lit)
+                if found is None:
+                    union = None
+                    break
+                union |= found
+            if union is None:
+                continue  # 이 조건으로는 못 좁힘
+            docs = union if docs is None else docs & union
+        return list(range(len(self.texts))) if docs is None else sorted(docs)
+
+    # === 검사 ===
+
+    def count_regex(self, pattern: str, flags: int = 0) -> int:
+        """re.search(pattern)이 걸리는 문서 수 (후보만 실제 검색)"""
+        regex = re.compile(pattern, flags)
+        texts = self.texts
+        return sum(1 for d in self.candidates(required_literals(pattern, flags)) if regex.search(texts[d]))
+
+    def count_substring(self, word: str) -> int:
+        """word in 텍스트 인 문서 수"""
+        texts = self.texts
+        return sum(1 for d in self.candidates(((word,),)) if word in texts[d])
+
+    def word_counts(self, min_len: int = 2) -> Counter:
+        """어절 빈도 (길이 min_len 이상) — 처음 나온 순서로 정렬돼 있어 most_common 동점 순서도 기존과 같음"""
+        counts = self.term_counts.tolist() if np is not None else self.term_counts
+        return Counter({t: c for t, c in zip(self.terms, counts) if len(t) >= min_len})
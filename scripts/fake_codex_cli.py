@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""가짜 Codex CLI (로컬 테스트용)
+
+실제 codex와 같은 두 가지 호출 방식을 흉내냄:
+  fake_codex_cli.py exec --skip-git-repo-check "<prompt>"  → stdout에 답변 1회
+  fake_codex_cli.py mcp-server                             → stdio MCP 서버 (상주)
+
+부팅 비용(FAKE_CODEX_STARTUP초)은 프로세스 시작마다 1번 — exec 모드는 프롬프트마다,
+mcp-server 모드는 워커 시작 시 1번만 지불 → 두 방식의 차이를 로컬에서 측정 가능.
+
+사용:
+  CODEX_CMD=scripts/fake_codex_cli.py python scripts/generate_narratives_v2.py --backend codex
+환경 변수:
+  FAKE_CODEX_STARTUP  프로세스 부팅 지연 (기본 0.5초, Node 런타임 부팅 흉내)
+  FAKE_CODEX_LATENCY  프롬프트당 생성 지연 (기본 0.1초)
+"""
+import json
+import os
+import sys
+import time
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stdin.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_ollama import fake_response
+
+STARTUP = float(os.environ.get('FAKE_CODEX_STARTUP', '0.5'))
+LATENCY = float(os.environ.get('FAKE_CODEX_LATENCY', '0.1'))
+
+
+def send(msg: dict):
+    sys.stdout.write(json.dumps(msg, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+
+def run_exec(prompt: str):
+    time.sleep(LATENCY)
+    print(fake_response(prompt))
+    print('tokens used: 0', file=sys.stderr)
+
+
+def run_mcp_server():
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        msg = json.loads(line)
+        method = msg.get('method')
+        req_id = msg.get('id')
+        if req_id is None:
+            continue  # 알림 (notifications/initialized 등)
+
+        if method == 'initialize':
+            send({'jsonrpc': '2.0', 'id': req_id, 'result': {
+                'protocolVersion': msg['params'].get('protocolVersion'),
+                'capabilities': {'tools': {}},
+                'serverInfo': {'name': 'fake-codex', 'version': '0.0.1'},
+            }})
+        elif method == 'tools/list':
+            send({'jsonrpc': '2.0', 'id': req_id, 'result': {'tools': [
+                {'name': 'codex', 'inputSchema': {'type': 'object', 'properties': {'prompt': {'type': 'string'}}}},
+            ]}})
+        elif method == 'tools/call':
+            prompt = msg['params'].get('arguments', {}).get('prompt', '')
+            # 실제 codex처럼 진행 알림을 먼저 보냄 (클라이언트가 무시해야 함)
+            send({'jsonrpc': '2.0', 'method': 'codex/event', 'params': {'msg': {'type': 'task_started'}}})
+            time.sleep(LATENCY)
+            send({'jsonrpc': '2.0', 'id': req_id, 'result': {
+                'content': [{'type': 'text', 'text': fake_response(prompt)}],
+            }})
+        else:
+            send({'jsonrpc': '2.0', 'id': req_id, 'error': {'code': -32601, 'message': f'unknown method {method}'}})
+
+
+def main():
+    args = sys.argv[1:]
+    time.sleep(STARTUP)
+    if args and args[0] == 'exec':
+        run_exec(args[-1])
+    else:
+        run_mcp_server()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,82 +2,44 @@
 """Council B안 v2: bucket 7개 자동 생성 (요일별 다른 본문)
 사용자 신고 "1주 단위도 비슷" → bucket 3→7 확장
 같은 사주 사용자가 한 주 7가지 본문 회전 보장
+
+bucket 1~6은 원본 + 키 해시로 결정되는 변환이라 파일에 펼쳐 둘 필요 없음
+(펼치면 v1plus 0.5MB → 3.3MB, 검증 임계값도 7배로 부풀려야 했음).
+  - BucketSource: 원본만 들고 bucket 본문은 요청 시 계산 (LRU)
+  - python generate_buckets.py                   # 예전 bucket 키 정리 + 한 주 시뮬레이션
+  - python generate_buckets.py --export PATH     # 평탄 파일이 꼭 필요할 때만 bucket 0~6 펼쳐서 저장
+
+단어 치환(apply_word_swaps)은 필수 리터럴이 있는 규칙만, 회차마다 regex.split 1번 (콜백 없음).
+규칙끼리 연쇄되므로 스캔은 규칙별로 따로. 결과는 기존 순차 스캔과 동일 (test_bucket_swaps.py)
 """
-import json, re, sys, os
+import argparse
+import re, sys, os
+from functools import lru_cache
+
+from key_hash import hash_batch, hash_with_suffix
+from narrative_stream import NarrativeWriter, iter_entries, iter_section
+from rule_tables import load_rule_tables
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 INPUT = os.path.join(os.path.dirname(__file__), '..', 'src', 'data', 'generated', 'narratives_generated_v1plus.json')
 OUTPUT = os.path.join(os.path.dirname(__file__), '..', 'src', 'data', 'generated', 'narratives_generated_v1plus.json')
 
 
-def hash_str(s: str) -> int:
-    h = 0
-    for c in s:
-        h = ((h << 5) - h) + ord(c)
-        h = h & 0xFFFFFFFF
-    return h
+# 7개 bucket × 6개 prefix = 42가지 시작 표현 (한 사용자가 한 주 다 다른 prefix 봄)
+# 테이블은 rules/rewrite_rules.json (postprocess_v1과 같은 파일/컴파일 캐시)
+RULES = load_rule_tables()
+BUCKET_PREFIXES = RULES.bucket_prefixes()
 
 
-# 7개 bucket × 6개 prefix = 42가지 시작 표현 (한 사용자가 한 주 다 다른 prefix 봄)
-BUCKET_PREFIXES = {
-    1: [  # 핵심 강조형
-        '오늘 한 가지만 짚는다면, ',
-        '핵심부터 말하면, ',
-        '먼저 흐름부터 보면, ',
-        '한 마디로 요약하면, ',
-        '오늘의 큰 그림은, ',
-        '결정적인 한 줄로는, ',
-    ],
-    2: [  # 거리두기형
-        '오늘 한 발 떨어져 보면, ',
-        '한 발짝 물러서면, ',
-        '천천히 풀어 보면, ',
-        '오늘 자리에서 보면, ',
-        '잠시 거리를 두고 보면, ',
-        '관조하듯 살피면, ',
-    ],
-    3: [  # 결/흐름형
-        '오늘 결을 따라가 보면, ',
-        '하루 흐름으로 짚으면, ',
-        '오늘 결로 풀어보면, ',
-        '큰 흐름으로 보면, ',
-        '결의 방향으로 가면, ',
-        '오늘 흐름을 짚으면, ',
-    ],
-    4: [  # 감각형
-        '문득 살펴보니, ',
-        '느낌부터 말하면, ',
-        '직감으로는, ',
-        '오늘 결이 부드럽게, ',
-        '마음으로 짚으면, ',
-        '차분히 들여다보면, ',
-    ],
-    5: [  # 시간/오늘형
-        '오늘 하루를 열며, ',
-        '아침을 시작하며, ',
-        '하루의 첫걸음으로, ',
-        '오늘 시작점에서, ',
-        '하루의 결을 잡으며, ',
-        '오늘이라는 시간 안에서, ',
-    ],
-    6: [  # 사색형
-        '잠시 돌아보면, ',
-        '깊이 들여다보면, ',
-        '곰곰이 생각하면, ',
-        '한 호흡 멈추고 보면, ',
-        '조용히 살피면, ',
-        '내면을 따라가 보면, ',
-    ],
-}
-
-
-def paraphrase_bucket(text: str, key: str, bucket_num: int) -> str:
-    """bucket 1~6에 대해 prefix + 단어 치환"""
+def paraphrase_bucket(text: str, key: str, bucket_num: int, h: int = None) -> str:
+    """bucket 1~6에 대해 prefix + 단어 치환 (h: 미리 계산한 hash_str(f'{key}_b{bucket_num}'))"""
     if bucket_num == 0:
         return text  # 원본 유지
 
     paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-    h = hash_str(f'{key}_b{bucket_num}')
+    if h is None:
+        h = hash_with_suffix(key, f'_b{bucket_num}')
 
     prefixes = BUCKET_PREFIXES.get(bucket_num, [''])
     prefix = prefixes[abs(h) % len(prefixes)]
@@ -91,100 +53,310 @@ def paraphrase_bucket(text: str, key: str, bucket_num: int) -> str:
     return apply_word_swaps(result, h, intensity=intensity, bucket_num=bucket_num)
 
 
-# 단어 치환 풀 (의미 보존, 표현만 변경)
-SWAP_POOLS = [
-    # 동사 어미
-    (r'있어요\.', ['있네요.', '있답니다.', '있어요.', '있죠.']),
-    (r'좋아요\.', ['좋네요.', '괜찮아요.', '좋아요.', '훌륭해요.']),
-    (r'돼요\.', ['됩니다.', '돼요.', '되네요.']),
-    # 부사
-    (r'(?<![\w])특히(?=\s)', ['유독', '특히', '특별히', '눈에 띄게']),
-    (r'(?<![\w])정말(?=\s)', ['진짜', '정말', '꽤', '제법']),
-    (r'(?<![\w])혹시(?=\s)', ['만약', '혹시', '어쩌면', '혹여']),
-    # 시간
-    (r'아침(?=에는|\s)', ['이른 시간', '아침', '하루 시작', '새벽']),
-    (r'저녁(?=에는|\s)', ['해 질 무렵', '저녁', '하루 마무리', '땅거미 질 때']),
-    (r'낮(?=에는|\s|\.)', ['한낮', '낮', '한가운데', '햇살 강할 때']),
-    # 사람 표현
-    (r'곁의 사람', ['가까운 사람', '곁의 사람', '주변 사람', '가까운 인연']),
-    (r'곁에 있는 사람', ['옆에 있는 사람', '곁에 있는 사람', '주변에 있는 사람', '가까이 있는 사람']),
-    # 운세 표현
-    (r'기운이 (\S+)', [r'에너지가 \1', r'기운이 \1', r'흐름이 \1', r'결이 \1']),
-    (r'흐름이 (\S+)', [r'결이 \1', r'흐름이 \1', r'기운이 \1', r'리듬이 \1']),
-    # 결말
-    (r'분위기예요\.', ['분위기네요.', '분위기예요.', '결이에요.', '느낌이에요.']),
-    (r'시간이에요\.', ['시기예요.', '시간이에요.', '때예요.', '순간이에요.']),
-    (r'결이에요\.', ['흐름이에요.', '결이에요.', '시간이에요.', '느낌이에요.']),
-]
-
-
-def apply_word_swaps(text: str, seed: int, intensity: str = 'normal', bucket_num: int = 0) -> str:
-    """단어 치환 (bucket 번호로 다른 후보 선택)"""
-    counter = [0]
-    for i, (pattern, candidates) in enumerate(SWAP_POOLS):
-        local_seed = seed + i * 17 + bucket_num * 31
-
-        def picker(m):
-            idx = counter[0]
-            counter[0] += 1
-            chosen = candidates[(local_seed + idx) % len(candidates)]
-            if '\\1' in chosen and m.lastindex:
-                chosen = chosen.replace('\\1', m.group(1))
-            return chosen
-
-        text = re.sub(pattern, picker, text)
-        if intensity == 'high':
-            counter[0] = local_seed + 999 + bucket_num
-            text = re.sub(pattern, picker, text)
-
+# 단어 치환 풀 (의미 보존, 표현만 변경) — [(패턴, 후보)]
+SWAP_POOLS = RULES.pairs('swap_pools')
+# 같은 테이블의 Rule (필수 리터럴은 rule_tables 컴파일 캐시에서) — local_seed = seed + i*17 + bucket*31
+_SWAP_RULES = RULES.rules('swap_pools', seed_step=17)
+# intensity → 규칙마다 적용 횟수 (2회차부터는 카운터를 local_seed + 999 + bucket 으로 재설정)
+INTENSITY_PASSES = {'normal': 1, 'high': 2}
+
+
+def _has_literals(requires, text: str) -> bool:
+    """필수 리터럴 조건 (AND of OR)을 text가 만족하는지 — 아니면 그 규칙은 절대 안 걸림"""
+    for group in requires:
+        for lit in group:
+            if lit in text:
+                break
+        else:
+            return False
+    return True
+
+
+def _revive_targets(rules) -> list:
+    """규칙 i의 치환으로 새로 걸릴 수 있는 뒤 규칙 번호 목록 (규칙마다)
+
+    치환 뒤 새로 생긴 리터럴은 후보 고정 부분('\\1' 밖)의 글자를 적어도 하나 포함
+    (나머지 글자는 원래 있던 텍스트 그대로) → 그 글자가 하나도 없는 리터럴만 가진 규칙은 다시 볼 필요 없음.
+    후보가 빈 문자열이면 앞뒤가 붙어 아무 리터럴이나 생길 수 있으니 전부.
+    """
+    targets = []
+    for i, rule in enumerate(rules):
+        fixed = [c.replace('\\1', '') for c in rule.candidates]
+        chars = set(''.join(fixed))
+        later = range(i + 1, len(rules))
+        if not all(fixed):
+            targets.append(list(later))
+        else:
+            targets.append([j for j in later
+                            if any(chars.intersection(lit) for group in rules[j].requires for lit in group)])
+    return targets
+
+
+_SWAP_REVIVES = _revive_targets(_SWAP_RULES)
+# 조건이 리터럴 1개뿐인 규칙(지금 테이블 전부)은 함수 호출 없이 `lit in text`로
+_SWAP_LITERALS = [r.requires[0][0] if len(r.requires) == 1 and len(r.requires[0]) == 1 else None
+                  for r in _SWAP_RULES]
+_SWAP_ALL_LITERAL = None not in _SWAP_LITERALS
+# 규칙별 (정규식, 후보, split 간격 = 그룹 수 + 1) — 그룹 2개 이상인 규칙은 None → 순차 스캔
+_SWAP_SPECS = [(r.regex, r.candidates, r.regex.groups + 1) if r.regex.groups <= 1 else None
+               for r in _SWAP_RULES]
+
+
+def _swap_choice(candidates, seed: int, idx: int, group) -> str:
+    chosen = candidates[(seed + idx) % len(candidates)]
+    if group is not None and '\\1' in chosen:
+        chosen = chosen.replace('\\1', group)
+    return chosen
+
+
+def _swap_rule_sequential(text: str, rule, local_seed: int, reset: int, passes: int, counter: list) -> str:
+    """규칙 1개를 회차마다 전체 텍스트에 re.sub (기존 방식 — 그룹 2개 이상일 때만)"""
+    candidates, regex = rule.candidates, rule.regex
+
+    def picker(m):
+        idx = counter[0]
+        counter[0] += 1
+        return _swap_choice(candidates, local_seed, idx, m.group(1) if m.lastindex else None)
+
+    for p in range(passes):
+        if p:
+            counter[0] = reset
+        text = regex.sub(picker, text)
     return text
 
 
-def main():
-    print(f"입력: {INPUT}")
-    with open(INPUT, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    overall = data.get('overall', {})
-    categories = data.get('categories', {})
-
-    # 기존 bucket 키 제거 (원본 _0 키로 시작)
-    overall_clean = {k: v for k, v in overall.items() if not re.search(r'_[1-6]$', k)}
-    categories_clean = {k: v for k, v in categories.items() if not re.search(r'_[1-6]$', k)}
-
-    new_overall = dict(overall_clean)
-    new_categories = dict(categories_clean)
+def _swap_rule(text: str, i: int, local_seed: int, reset: int, passes: int, counter: list) -> str:
+    """규칙 i를 passes회 적용 — 회차마다 전체 텍스트에 regex.split 1번 (매치마다 파이썬 콜백 없음)
+
+    split 결과 [원문, (그룹 1,) 원문, ...] 의 매치 자리마다 후보를 끼워 넣음 = re.sub와 같은 매치, 같은 순서.
+    2회차도 1회차 결과 전체를 다시 split (앞 회차 후보가 옆 원문과 붙어 새로 생긴 매치까지 기존과 같게)
+    """
+    regex, candidates, stride = _SWAP_SPECS[i]
+    n = len(candidates)
+    for p in range(passes):
+        idx = reset if p else counter[0]
+        parts = regex.split(text)
+        if len(parts) > 1:
+            if stride == 1:
+                out = [None] * (len(parts) * 2 - 1)
+                out[0::2] = parts
+                for k in range(1, len(out), 2):
+                    out[k] = candidates[(local_seed + idx) % n]
+                    idx += 1
+                parts = out
+            else:  # 그룹 자리를 후보로 ('\\1' → 그룹 1, 그룹이 안 걸렸으면 그대로)
+                for k in range(1, len(parts), 2):
+                    chosen = candidates[(local_seed + idx) % n]
+                    idx += 1
+                    group = parts[k]
+                    parts[k] = chosen.replace('\\1', group) if group is not None and '\\1' in chosen else chosen
+            text = ''.join(parts)
+        counter[0] = idx
+    return text
 
-    print(f"\n=== overall {len(overall_clean)}개에 대해 bucket 1~6 생성 중... ===")
-    for k, v in overall_clean.items():
-        for b in range(1, 7):
-            new_overall[f'{k}_{b}'] = paraphrase_bucket(v, k, b)
 
-    print(f"  생성: {len(overall_clean) * 6}개 (각 키당 6개 bucket)")
+def apply_word_swaps(text: str, seed: int, intensity: str = 'normal', bucket_num: int = 0) -> str:
+    """단어 치환 (bucket 번호로 다른 후보 선택) — 걸릴 수 있는 규칙만 훑음
+
+    기존: 규칙 16개를 회차마다(high = 2회) re.sub → 텍스트당 최대 32번 전체 스캔 + 매치마다 콜백.
+    - 필수 리터럴(Rule.requires)이 텍스트에 없는 규칙은 정규식을 안 돌림
+      (카운터는 기존과 똑같이: normal은 그대로, high는 직전 규칙의 local_seed + 999 + bucket)
+    - 걸리는 규칙은 _swap_rule: 회차마다 전체 텍스트 split 1번 (매치마다 콜백 대신 조각 사이에 후보)
+      (1회차 후보 candidates[(local_seed + 공용 카운터) % n],
+       2회차 후보 candidates[(local_seed + 999 + bucket + k) % n], k = 2회차 매치 번호 — 기존과 같은 순서)
+      2회차를 1회차 치환 자리로 좁히지 않음 — 후보가 옆 원문과 붙어 새 매치를 만들 수 있음 (rules 파일은 수정 가능)
+    - 규칙은 원래 순서대로 적용, 텍스트가 바뀌면 건너뛴 뒤 규칙 중 되살아날 수 있는 것(_SWAP_REVIVES)만 다시 확인
+      → 앞 규칙 결과가 뒤 규칙에 걸리는 연쇄('기운이' → '흐름이')도 같음
+    - 한 번에 모든 규칙을 훑지 않음: 뒤 규칙은 앞 규칙 결과에 걸려야 하므로 규칙 순서대로 따로 스캔
+    결과는 기존 순차 스캔과 바이트 단위로 같음 → test_bucket_swaps.py
+    """
+    passes = INTENSITY_PASSES[intensity]
+    if _SWAP_ALL_LITERAL:
+        live = [lit in text for lit in _SWAP_LITERALS]
+    else:
+        live = [lit in text if lit is not None else _has_literals(rule.requires, text)
+                for lit, rule in zip(_SWAP_LITERALS, _SWAP_RULES)]
+    if True not in live:
+        return text
+    base = seed + bucket_num * 31
+    counter = [0]
+    for i, rule in enumerate(_SWAP_RULES):
+        if not live[i]:
+            continue
+        if passes > 1 and i and not live[i - 1]:  # 직전 규칙은 매치 0개 → 카운터는 그 규칙의 재설정 값
+            counter[0] = base + _SWAP_RULES[i - 1].seed_offset + 999 + bucket_num
+        local_seed = base + rule.seed_offset
+        reset = local_seed + 999 + bucket_num
+        if _SWAP_SPECS[i] is None:
+            new_text = _swap_rule_sequential(text, rule, local_seed, reset, passes, counter)
+        else:
+            new_text = _swap_rule(text, i, local_seed, reset, passes, counter)
+        if new_text != text:
+            text = new_text
+            for j in _SWAP_REVIVES[i]:
+                if not live[j]:
+                    lit = _SWAP_LITERALS[j]
+                    live[j] = lit in text if lit is not None else _has_literals(_SWAP_RULES[j].requires, text)
+    return text
 
-    print(f"\n=== categories {len(categories_clean)}개에 대해 bucket 1~6 생성 중... ===")
-    for k, v in categories_clean.items():
-        for b in range(1, 7):
-            h = hash_str(f'{k}_b{b}')
-            intensity = 'high' if b >= 4 else 'normal'
-            new_categories[f'{k}_{b}'] = apply_word_swaps(v, h, intensity=intensity, bucket_num=b)
 
-    print(f"  생성: {len(categories_clean) * 6}개")
+BUCKET_KEY = re.compile(r'_[1-6]$')  # 예전에 파일로 만들어 둔 bucket 키
+BUCKET_KEY_PARTS = re.compile(r'^(.+)_([1-6])$')
+SECTIONS = ('overall', 'categories')
+SEED_BATCH = 256  # bucket 시드를 한 번에 해시할 원본 키 수
+BUCKET_CACHE_SIZE = 512  # BucketSource LRU (최근 생성 본문 수)
 
-    new_data = {'overall': new_overall, 'categories': new_categories}
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(new_data, f, ensure_ascii=False, indent=2)
 
-    print(f"\n저장: {OUTPUT}")
-    print(f"전체 overall: {len(new_overall)} (원본 {len(overall_clean)} + bucket1~6 {len(overall_clean)*6})")
-    print(f"전체 categories: {len(new_categories)} (원본 {len(categories_clean)} + bucket1~6 {len(categories_clean)*6})")
+def bucket_text(section: str, key: str, text: str, bucket_num: int, h: int = None) -> str:
+    """원본 text의 bucket 1~6 본문 (h: 미리 계산한 hash_str(f'{key}_b{bucket_num}'))"""
+    if section == 'overall':
+        return paraphrase_bucket(text, key, bucket_num, h)
+    if h is None:
+        h = hash_with_suffix(key, f'_b{bucket_num}')
+    intensity = 'high' if bucket_num >= 4 else 'normal'
+    return apply_word_swaps(text, h, intensity=intensity, bucket_num=bucket_num)
+
+
+class BucketSource:
+    """bucket 본문 on-demand 생성 — 원본(bucket 0)만 들고, bucket 1~6은 요청할 때 계산
+
+    source = BucketSource()                           # INPUT의 원본 키만 읽음 (예전 bucket 키는 무시)
+    source.get('overall', '비견_yongsin_장생', 3)
+    source.lookup('categories', 'wealth_비견_yongsin_5')   # 예전 평탄 파일의 키 형식 그대로
+    최근 결과는 LRU(cache_size)에 보관 — 같은 날 같은 키를 여러 번 물어도 1번만 계산
+    """
+
+    def __init__(self, base: dict = None, path: str = None, cache_size: int = BUCKET_CACHE_SIZE):
+        if base is None:
+            path = path or INPUT
+            base = {s: {k: v for k, v in iter_section(path, s) if not BUCKET_KEY.search(k)} for s in SECTIONS}
+        self.base = base
+        self._generate = lru_cache(maxsize=cache_size)(self._generate_uncached)
+
+    def _generate_uncached(self, section: str, key: str, bucket_num: int) -> str:
+        return bucket_text(section, key, self.base[section][key], bucket_num)
+
+    def get(self, section: str, key: str, bucket_num: int = 0) -> str:
+        """원본 키 + bucket 번호 (0 = 원본). 없는 키면 KeyError"""
+        if bucket_num == 0:
+            return self.base[section][key]
+        if not 1 <= bucket_num <= 6:
+            raise ValueError(f'bucket 번호는 0~6: {bucket_num}')
+        if key not in self.base[section]:
+            raise KeyError(f'{section}/{key}')
+        return self._generate(section, key, bucket_num)
+
+    def lookup(self, section: str, flat_key: str) -> str:
+        """평탄 파일 키 ('…_장생_3' 또는 원본 키) → 본문"""
+        if flat_key in self.base[section]:
+            return self.base[section][flat_key]
+        m = BUCKET_KEY_PARTS.match(flat_key)
+        if not m:
+            raise KeyError(f'{section}/{flat_key}')
+        return self.get(section, m.group(1), int(m.group(2)))
+
+    def cache_info(self):
+        return self._generate.cache_info()
+
+
+def iter_clean(section: str, path: str = None):
+    """섹션의 원본(bucket 0) 항목만 스트리밍 — 기존 bucket 키는 버림"""
+    for key, value in iter_section(path or INPUT, section):
+        if not BUCKET_KEY.search(key):
+            yield key, value
+
+
+def iter_with_seeds(section: str, path: str = None):
+    """(키, 원본, [bucket 1~6 시드]) — 시드는 SEED_BATCH개 키씩 key_hash.hash_batch로 계산"""
+    batch = []
+
+    def flush():
+        names = [f'{k}_b{b}' for k, _ in batch for b in range(1, 7)]
+        seeds = hash_batch(names)
+        for i, (k, v) in enumerate(batch):
+            yield k, v, seeds[i * 6:(i + 1) * 6]
+        batch.clear()
+
+    for item in iter_clean(section, path):
+        batch.append(item)
+        if len(batch) >= SEED_BATCH:
+            yield from flush()
+    yield from flush()
+
+
+def export_buckets(path: str) -> dict:
+    """bucket 0~6 평탄 파일 (예전 narratives_generated_v1plus.json 형식) → 섹션별 원본 키 수
+
+    평탄 파일이 꼭 필요한 소비자용. 섹션마다 입력을 두 번 스트리밍: 1) 원본 키 그대로 2) bucket 1~6
+    (출력 키 순서 = 원본 전체 뒤에 키별 bucket 1~6 — 예전 파일과 바이트 단위 동일)
+    path == INPUT 이어도 NarrativeWriter가 임시 파일에 쓰고 끝날 때 교체하므로 안전
+    """
+    sizes = {}
+    with NarrativeWriter(path, SECTIONS) as writer:
+        for section in SECTIONS:
+            n = 0
+            for k, v in iter_clean(section):
+                writer.write(section, k, v)
+                n += 1
+            sizes[section] = n
+            print(f"\n=== {section} {n}개에 대해 bucket 1~6 생성 중... ===")
+            for k, v, seeds in iter_with_seeds(section):
+                for b, h in enumerate(seeds, 1):
+                    writer.write(section, f'{k}_{b}', bucket_text(section, k, v, b, h))
+            print(f"  생성: {n * 6}개" + (" (각 키당 6개 bucket)" if section == 'overall' else ''))
+    return sizes
+
+
+def strip_buckets(path: str) -> dict:
+    """예전에 파일로 만들어 둔 bucket 1~6 키 제거 (원본만 남김) → 섹션별 제거 수"""
+    removed = {s: 0 for s in SECTIONS}
+
+    def entries():
+        for section, key, value in iter_entries(INPUT, SECTIONS):
+            if BUCKET_KEY.search(key):
+                removed[section] += 1
+            else:
+                yield section, key, value
+
+    with NarrativeWriter(path, SECTIONS) as writer:
+        for section, key, value in entries():
+            writer.write(section, key, value)
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='bucket 0~6 (요일별 본문) — on-demand 생성 / 평탄 파일 내보내기')
+    parser.add_argument('--export', metavar='PATH',
+                        help='bucket 1~6까지 펼친 평탄 파일을 PATH에 씀 (평탄 파일이 꼭 필요한 소비자용)')
+    args = parser.parse_args(argv)
+    print(f"입력: {INPUT}")
 
-    # 7일치 시뮬레이션
+    if args.export:
+        sizes = export_buckets(args.export)
+        print(f"\n저장: {args.export}")
+        for section in SECTIONS:
+            n = sizes[section]
+            print(f"전체 {section}: {n * 7} (원본 {n} + bucket1~6 {n*6})")
+    else:
+        # 기본: bucket은 파일에 안 씀 (BucketSource로 필요할 때 계산)
+        # 예전 실행이 남긴 bucket 키가 있으면 정리
+        if any(BUCKET_KEY.search(k) for _, k, _ in iter_entries(INPUT, SECTIONS)):
+            before = os.path.getsize(INPUT)
+            removed = strip_buckets(OUTPUT)
+            print(f"\n예전 bucket 키 제거: {removed} → {OUTPUT}")
+            print(f"  {before / 1024:.0f} KB → {os.path.getsize(OUTPUT) / 1024:.0f} KB")
+        else:
+            print("\nbucket 키 없음 — 원본만 있는 파일 (bucket은 BucketSource로 on-demand 생성)")
+
+    # 7일치 시뮬레이션 (on-demand)
     print("\n=== 같은 사주 한 주 시뮬레이션 (비견_yongsin_장생) ===")
     sample_key = '비견_yongsin_장생'
+    source = BucketSource(path=args.export or OUTPUT)
     for b in range(7):
-        bk = f'{sample_key}_{b}' if b > 0 else sample_key
-        text = new_overall.get(bk, '없음')
+        try:
+            text = source.get('overall', sample_key, b)
+        except KeyError:
+            text = '없음'
         print(f"\n[Day {b+1}] bucket {b}:")
         print(f"  {text[:100]}...")
 
@@ -7,12 +7,16 @@
 총 480개 생성
 """
 
+import argparse
 import json
 import subprocess
 import os
 import sys
 import time
 
+from llm_cache import add_cache_args, configure_from_args, get_cache
+from ollama_client import CircuitOpenError, StreamStats, backoff_delay, generate_stream, pool_summary
+
 # Windows 콘솔 인코딩 강제 UTF-8
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -21,6 +25,7 @@ if sys.platform == 'win32':
 
 OLLAMA = os.path.expandvars(r"%LOCALAPPDATA%\Programs\Ollama\ollama.exe")
 MODEL = "gemma3:12b"
+OLLAMA_URL = "http://localhost:11434/api/generate"
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "src", "data", "generated")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -67,6 +72,12 @@ STAGE_DESC = {
     '양': '조용히 자라는 기운. 서서히 좋아지는 중.',
 }
 
+# 길이 상한 (스트리밍 조기 중단 기준)
+MAX_CHARS_OVERALL = 800
+MAX_CHARS_CATEGORY = 400
+
+stream_stats = StreamStats()
+
 CATEGORY_DESC = {
     'wealth': '재물운/금전운',
     'love': '연애운/대인관계',
@@ -118,39 +129,49 @@ def generate_prompt_category(ten_god, yongsin_type, category):
 풀이 텍스트만 출력."""
 
 
-def call_ollama(prompt, retries=2):
-    import urllib.request
+def call_ollama(prompt, retries=2, max_chars=None):
+    """Ollama 호출 (프롬프트 캐시 경유)"""
+    options = {"temperature": 0.8, "num_predict": 512}
+    return get_cache().cached_call('ollama', MODEL, prompt,
+                                   lambda: _call_ollama_raw(prompt, options, retries, max_chars),
+                                   options=options)
+
+
+def _call_ollama_raw(prompt, options, retries=2, max_chars=None):
     import re
     for attempt in range(retries + 1):
         try:
-            data = json.dumps({
-                "model": MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.8, "num_predict": 512}
-            }).encode('utf-8')
-            req = urllib.request.Request(
-                "http://localhost:11434/api/generate",
-                data=data,
-                headers={"Content-Type": "application/json"}
+            # 스트리밍으로 받으며 길이 초과 시 조기 중단 (마지막 시도는 끝까지)
+            result = generate_stream(
+                OLLAMA_URL, MODEL, prompt, options,
+                max_chars=None if attempt == retries else max_chars,
             )
-            with urllib.request.urlopen(req, timeout=120) as resp:
-                result = json.loads(resp.read().decode('utf-8'))
-                output = result.get("response", "").strip()
-                # 불필요한 마크다운/포맷 제거
-                output = re.sub(r'\*\*.*?\*\*', '', output)
-                output = re.sub(r'##.*?\n', '', output)
-                output = re.sub(r'\n{3,}', '\n\n', output)
-                output = output.strip()
-                if len(output) > 30:
-                    return output
+            stream_stats.record(result)
+            if result['aborted']:
+                print(f"  조기 중단 (attempt {attempt+1}): {result['abort_reason']} ({result['elapsed_s']:.1f}초)")
+                continue
+            output = result['text']
+            # 불필요한 마크다운/포맷 제거
+            output = re.sub(r'\*\*.*?\*\*', '', output)
+            output = re.sub(r'##.*?\n', '', output)
+            output = re.sub(r'\n{3,}', '\n\n', output)
+            output = output.strip()
+            if len(output) > 30:
+                return output
+        except CircuitOpenError as e:
+            print(f"  Ollama 차단: {e}")
+            return None
         except Exception as e:
             print(f"  Error (attempt {attempt+1}): {e}")
-            time.sleep(3)
+            time.sleep(backoff_delay(attempt))
     return None
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ollama 운세 통문장 생성")
+    add_cache_args(parser)
+    cache = configure_from_args(parser.parse_args(argv))
+
     results = {
         'overall': {},      # key: "십신_용신_12운성" → text
         'categories': {},   # key: "카테고리_십신_용신" → text
@@ -168,7 +189,7 @@ def main():
                 print(f"[{count}/{total}] {key}...", end=" ", flush=True)
 
                 prompt = generate_prompt_overall(ten_god, yongsin, stage)
-                text = call_ollama(prompt)
+                text = call_ollama(prompt, max_chars=MAX_CHARS_OVERALL)
 
                 if text:
                     results['overall'][key] = text
@@ -189,7 +210,7 @@ def main():
                 print(f"[{cat_count}/{cat_total}] {key}...", end=" ", flush=True)
 
                 prompt = generate_prompt_category(ten_god, yongsin, category)
-                text = call_ollama(prompt)
+                text = call_ollama(prompt, max_chars=MAX_CHARS_CATEGORY)
 
                 if text:
                     results['categories'][key] = text
@@ -207,6 +228,9 @@ def main():
     print(f"종합 풀이: {len(results['overall'])}개")
     print(f"카테고리 풀이: {len(results['categories'])}개")
     print(f"저장 위치: {output_path}")
+    print(cache.summary())
+    print(stream_stats.summary())
+    print(pool_summary())
 
 
 if __name__ == "__main__":
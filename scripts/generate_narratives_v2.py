@@ -11,26 +11,57 @@ v2 — Council 합의 반영 재생성
 5. 명리학 근거 한 줄 추가
 """
 
+import argparse
 import json
 import os
 import sys
+import threading
 import time
 import random
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
-import urllib.request
 import subprocess
 
-# Codex CLI 경로 (Windows)
-CODEX_CMD = r"C:\Users\wsw18\AppData\Roaming\npm\codex.cmd"
-USE_CODEX = True  # False로 바꾸면 Ollama 사용
+from backend_registry import Backend, BackendRegistry, parse_endpoint
+from checkpoint_journal import CheckpointJournal
+from cli_worker_pool import CliWorkerPool, WorkerError
+from llm_cache import add_cache_args, configure_from_args, get_cache
+from regen_manifest import RegenManifest, fingerprint, stale_report
+from mock_ollama import fake_response
+from ollama_client import (CircuitOpenError, StreamStats, backoff_delay, generate,
+                           generate_stream, get_breaker, pool_summary)
+
+# Codex CLI 경로 (Windows) — 테스트 시 CODEX_CMD=scripts/fake_codex_cli.py
+CODEX_CMD = os.environ.get("CODEX_CMD", r"C:\Users\wsw18\AppData\Roaming\npm\codex.cmd")
+DEFAULT_BACKEND = 'codex'  # --endpoint 없이 실행할 때 쓸 백엔드 ('codex' / 'ollama' / 'mock')
+
+# Codex 호출 방식: 'worker' = mcp-server 프로세스 상주 (부팅 1회), 'exec' = 프롬프트마다 codex exec
+CODEX_MODE = 'worker'
+CODEX_MCP_ARGS = ["mcp-server"]
+CODEX_TOOL_ARGS = {"approval-policy": "never", "sandbox": "read-only"}
 
 MODEL = "gemma4:31b"  # Ollama 폴백용
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/generate")
+OLLAMA_STREAM = True  # 토큰 스트림으로 받으며 금지어/길이 초과 시 조기 중단 (False면 단일 응답)
+
+# 섹션별 길이 상한 (스트리밍 조기 중단 기준, validate_narratives 상한과 동일)
+MAX_CHARS_OVERALL = 800
+MAX_CHARS_CATEGORY = 400
+MAX_CHARS_DECISION = 200
+
+# 결정 박스 묶음 크기 — 같은 십신/용신의 12운성을 한 프롬프트로 (12 → 호출 1회)
+DECISION_BATCH = 12
+
+# 동시 실행 제한: 전체 워커 수 + 엔드포인트별 동시 요청 상한 (capacity 기본값)
+# (Codex는 계정 레이트 리밋, Ollama는 GPU 1장 기준 OLLAMA_NUM_PARALLEL에 맞춤)
+DEFAULT_WORKERS = 4
+DEFAULT_CAPACITY = {'codex': 4, 'ollama': 2, 'mock': 8}
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "src", "data", "generated")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -204,6 +235,34 @@ def generate_prompt_decision(ten_god, yongsin_type, stage):
 지금 출력하세요. 첫 글자는 반드시 🟢."""
 
 
+# 결정 박스 묶음 — 같은 십신/용신의 12운성 여러 개를 한 번에 (호출 수 1/K)
+def generate_prompt_decision_batch(ten_god, yongsin_type, stages):
+    stage_lines = "\n".join(f"- {stage}: {STAGE_DESC[stage]}" for stage in stages)
+    first = stages[0]
+    return f"""한국 운세 앱의 "오늘의 결정" 박스를 에너지 단계별로 {len(stages)}개 만듭니다.
+
+공통 기운 상황:
+- 오늘의 십신: {ten_god} ({TEN_GOD_DESC[ten_god]})
+- 용신 여부: {YONGSIN_DESC[yongsin_type]}
+
+에너지 단계 ({len(stages)}개, 이 순서대로 전부 작성):
+{stage_lines}
+
+엄격 출력 형식 (단계마다 [단계명] 줄 + 정확히 3줄, 다른 어떤 설명도 금지):
+[단계명]
+🟢 [해도 좋은 구체적 행동 1가지, 15자 이내]
+🟡 [신중하게 할 구체적 행동 1가지, 15자 이내]
+🔴 [오늘 미룰 구체적 행동 1가지, 15자 이내]
+
+예시 출력:
+[{first}]
+🟢 보고서 초안 끝내기
+🟡 친구와 돈 약속
+🔴 새 투자 결정
+
+단계마다 행동이 겹치지 않게 하세요. 지금 출력하세요. 첫 줄은 반드시 [{first}]."""
+
+
 def _clean_output(output: str) -> str:
     """공통 후처리: 마크다운/헤더/과도한 줄바꿈 제거"""
     output = re.sub(r'\*\*.*?\*\*', '', output)
@@ -214,14 +273,58 @@ def _clean_output(output: str) -> str:
     return output.strip()
 
 
-def call_codex(prompt, retries=2):
+def call_codex(prompt, retries=2, cmd=None, mode=None, pool_size=None, **_):
+    """Codex CLI 호출 (프롬프트 캐시 경유). num_predict/max_chars 등 Ollama 옵션은 무시"""
+    cmd = cmd or CODEX_CMD
+    mode = mode or CODEX_MODE
+    return get_cache().cached_call('codex', 'codex-cli', prompt,
+                                   lambda: _call_codex_raw(prompt, retries, cmd, mode, pool_size))
+
+
+_codex_pools = {}
+_codex_pool_lock = threading.Lock()
+
+
+def get_codex_pool(cmd=None, size=None):
+    """CLI 경로별 상주 Codex 워커 풀 (첫 호출 때 생성, 워커는 필요할 때 부팅)"""
+    cmd = cmd or CODEX_CMD
+    with _codex_pool_lock:
+        if cmd not in _codex_pools:
+            _codex_pools[cmd] = CliWorkerPool([cmd] + CODEX_MCP_ARGS,
+                                              size=size or DEFAULT_CAPACITY['codex'],
+                                              tool_name='codex', tool_args=CODEX_TOOL_ARGS)
+        return _codex_pools[cmd]
+
+
+def _call_codex_raw(prompt, retries=2, cmd=None, mode=None, pool_size=None):
+    if (mode or CODEX_MODE) == 'worker':
+        return _call_codex_worker(prompt, retries, cmd, pool_size)
+    return _call_codex_exec(prompt, retries, cmd)
+
+
+def _call_codex_worker(prompt, retries=2, cmd=None, pool_size=None):
+    """상주 워커(codex mcp-server)로 호출 — 프로세스 부팅 비용 없음"""
+    pool = get_codex_pool(cmd, pool_size)
+    for attempt in range(retries + 1):
+        try:
+            text = _clean_output(pool.call(prompt, timeout=180))
+            if len(text) > 20:
+                return text
+            print(f"  Codex short output (attempt {attempt+1}): {len(text)}자")
+        except WorkerError as e:
+            print(f"  Codex worker error (attempt {attempt+1}): {e}")
+            time.sleep(2)
+    return None
+
+
+def _call_codex_exec(prompt, retries=2, cmd=None):
     """Codex CLI 비대화형 호출 (codex exec).
     Codex는 답변만 stdout, 메타정보는 stderr로 분리해서 출력함.
     """
     for attempt in range(retries + 1):
         try:
             result = subprocess.run(
-                [CODEX_CMD, "exec", "--skip-git-repo-check", prompt],
+                [cmd or CODEX_CMD, "exec", "--skip-git-repo-check", prompt],
                 capture_output=True,
                 text=True,
                 encoding='utf-8',
@@ -248,179 +351,417 @@ def call_codex(prompt, retries=2):
     return None
 
 
-def call_ollama(prompt, retries=2, num_predict=512):
+stream_stats = StreamStats()
+
+
+def call_ollama(prompt, retries=2, num_predict=512, max_chars=None, url=None, model=None):
+    """Ollama 호출 (프롬프트 캐시 경유 — 같은 모델이면 호스트가 달라도 캐시 공유)"""
+    url = url or OLLAMA_URL
+    model = model or MODEL
+    options = {"temperature": 0.85, "num_predict": num_predict, "top_p": 0.92}
+    return get_cache().cached_call('ollama', model, prompt,
+                                   lambda: _call_ollama_raw(prompt, options, retries, max_chars, url, model),
+                                   options=options)
+
+
+def _call_ollama_raw(prompt, options, retries=2, max_chars=None, url=None, model=None):
     for attempt in range(retries + 1):
         try:
-            data = json.dumps({
-                "model": MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.85, "num_predict": num_predict, "top_p": 0.92}
-            }).encode('utf-8')
-            req = urllib.request.Request(
-                "http://localhost:11434/api/generate",
-                data=data,
-                headers={"Content-Type": "application/json"}
-            )
-            with urllib.request.urlopen(req, timeout=120) as resp:
-                result = json.loads(resp.read().decode('utf-8'))
-                output = _clean_output(result.get("response", "").strip())
+            if OLLAMA_STREAM:
+                # 마지막 시도는 끝까지 받음 — 금지어는 postprocess가 정리하므로 실패로 버리지 않음
+                last = attempt == retries
+                result = generate_stream(
+                    url, model, prompt, options,
+                    forbidden=() if last else FORBIDDEN_PHRASES,
+                    max_chars=None if last else max_chars,
+                )
+                stream_stats.record(result)
+                if result['aborted']:
+                    print(f"  조기 중단 (attempt {attempt+1}): {result['abort_reason']} ({result['elapsed_s']:.1f}초)")
+                    continue
+                output = _clean_output(result['text'])
                 if len(output) > 20:
                     return output
+                continue
+
+            output = _clean_output(generate(url, model, prompt, options))
+            if len(output) > 20:
+                return output
+        except CircuitOpenError as e:
+            # 서버 다운 — 재시도 없이 실패 처리 (다음 실행에서 skip 로직이 다시 집어감)
+            print(f"  Ollama 차단 ({url}): {e}")
+            return None
         except Exception as e:
             print(f"  Error (attempt {attempt+1}): {e}")
-            time.sleep(3)
+            time.sleep(backoff_delay(attempt))
     return None
 
 
-def call_ai(prompt, **kwargs):
-    """라우터: USE_CODEX 플래그에 따라 Codex 또는 Ollama 호출"""
-    if USE_CODEX:
-        return call_codex(prompt)
-    return call_ollama(prompt, **kwargs)
+def call_mock(prompt, latency=0.0, **_):
+    """로컬 mock — 서버 없이 mock_ollama의 고정 응답 (파이프라인 점검용, 캐시 안 씀)"""
+    if latency:
+        time.sleep(latency)
+    return _clean_output(fake_response(prompt))
 
 
-def main():
-    output_path = os.path.join(OUTPUT_DIR, "narratives_generated_v2.json")
+def make_backend(fields: dict, index: int) -> Backend:
+    """parse_endpoint() 결과 → Backend. 종류별 호출 함수에 엔드포인트 설정을 묶어 넣음"""
+    kind = fields['kind']
+    if kind not in DEFAULT_CAPACITY:
+        raise ValueError(f"알 수 없는 백엔드 종류: {kind}")
+    capacity = fields.get('capacity', DEFAULT_CAPACITY[kind])
+    weight = fields.get('weight', 1.0)
 
-    # 기존 결과가 있으면 이어서 (중간 재시작 지원)
-    results = {'overall': {}, 'categories': {}, 'decisions': {}}
-    if os.path.exists(output_path):
-        try:
-            with open(output_path, 'r', encoding='utf-8') as f:
-                existing = json.load(f)
-            for k in ['overall', 'categories', 'decisions']:
-                if k in existing:
-                    results[k] = existing[k]
-            print(f"=== 기존 결과 로드: overall {len(results['overall'])}개, categories {len(results['categories'])}개, decisions {len(results['decisions'])}개 ===")
-        except Exception as e:
-            print(f"기존 파일 로드 실패: {e}")
+    if kind == 'ollama':
+        url = fields.get('url', OLLAMA_URL)
+        model = fields.get('model', MODEL)
+        name = fields.get('name', f"ollama@{url.split('//')[-1].split('/')[0]}")
+        return Backend(name, kind, lambda prompt, **kw: call_ollama(prompt, url=url, model=model, **kw),
+                       weight, capacity, healthy=lambda: not get_breaker(url).is_open())
+    if kind == 'codex':
+        cmd = fields.get('cmd', CODEX_CMD)
+        mode = fields.get('mode', CODEX_MODE)
+        name = fields.get('name', f"codex#{index}")
+        return Backend(name, kind,
+                       lambda prompt, **kw: call_codex(prompt, cmd=cmd, mode=mode, pool_size=capacity),
+                       weight, capacity)
+    latency = float(fields.get('latency', 0.0))
+    name = fields.get('name', f"mock#{index}")
+    return Backend(name, kind, lambda prompt, **kw: call_mock(prompt, latency=latency), weight, capacity)
 
-    def save_progress():
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
 
-    # 종합 풀이 (구조 4개 순환)
+def build_registry(endpoints, default_backend) -> BackendRegistry:
+    """--endpoint 목록 → 레지스트리. 없으면 --backend 하나짜리 (기존 동작)"""
+    specs = [parse_endpoint(spec) for spec in endpoints] or [{'kind': default_backend}]
+    return BackendRegistry(make_backend(fields, i) for i, fields in enumerate(specs))
+
+
+_registry = None
+
+
+def call_ai(prompt, **kwargs):
+    """라우터: 레지스트리에서 진행 중 요청이 가장 적은 백엔드로 보내고, 실패하면 다른 백엔드로"""
+    return _registry.call(prompt, **kwargs)
+
+
+DECISION_FALLBACK = {
+    "green": "평소대로 일하기",
+    "yellow": "큰 지출 결정",
+    "red": "무리한 약속",
+}
+
+
+def _parse_decision_lines(lines) -> dict:
+    """🟢/🟡/🔴 줄에서 본문만 추출 (없는 항목은 빈 문자열)"""
+    green = yellow = red = ""
+    for line in lines:
+        s = line.strip()
+        if not s:
+            continue
+        # 이모지 제거하고 본문만
+        if '🟢' in s:
+            green = re.sub(r'^.*?🟢\s*', '', s).strip()
+        elif '🟡' in s:
+            yellow = re.sub(r'^.*?🟡\s*', '', s).strip()
+        elif '🔴' in s:
+            red = re.sub(r'^.*?🔴\s*', '', s).strip()
+    return {"green": green, "yellow": yellow, "red": red}
+
+
+def parse_decision(text: str) -> dict:
+    """🟢/🟡/🔴 줄을 파싱해 {green, yellow, red} 객체로 변환"""
+    parsed = _parse_decision_lines(text.split('\n'))
+    return {k: v or DECISION_FALLBACK[k] for k, v in parsed.items()}
+
+
+def parse_decision_batch(text: str, stages) -> dict:
+    """묶음 응답을 [단계명] 블록별로 파싱 → {stage: decision}
+    3항목이 모두 채워진 단계만 반환 (빠진 단계는 단건 호출로 재시도)."""
+    blocks = {}
+    current = None
+    for line in text.split('\n'):
+        # [장생] / **[장생]** / ### 장생: 등 헤더 변형 허용
+        m = re.match(r'^[\s*#]*\[?\s*([가-힣]+)\s*\]?[\s*:]*$', line)
+        if m:
+            # 모르는 헤더 뒤의 줄은 어느 단계에도 붙이지 않음
+            current = m.group(1) if m.group(1) in stages else None
+            if current is not None:
+                blocks[current] = []
+        elif current is not None:
+            blocks[current].append(line)
+
+    parsed = {}
+    for stage, lines in blocks.items():
+        decision = _parse_decision_lines(lines)
+        if all(decision.values()):
+            parsed[stage] = decision
+    return parsed
+
+
+def build_prompts() -> dict:
+    """섹션별 {키: (프롬프트, 해시 입력)} — 해시 입력은 프롬프트 + 구조 키.
+    결정 박스는 묶음 여부와 무관하게 단건 프롬프트 기준 (같은 입력이면 같은 해시)."""
+    prompts = {'overall': {}, 'categories': {}, 'decisions': {}}
     structure_keys = list(STRUCTURES.keys())
-    total = len(TEN_GODS) * len(YONGSIN_TYPES) * len(TWELVE_STAGES)
     count = 0
-
-    print(f"=== v2 종합 풀이 생성 ({total}개) ===")
     for ten_god in TEN_GODS:
         for yongsin in YONGSIN_TYPES:
-            for stage_idx, stage in enumerate(TWELVE_STAGES):
+            for stage in TWELVE_STAGES:
                 count += 1
                 key = f"{ten_god}_{yongsin}_{stage}"
                 structure_key = structure_keys[(count - 1) % len(structure_keys)]
-
-                # 이미 만든 항목은 건너뛰기 (재시작 지원)
-                if key in results['overall'] and not results['overall'][key].startswith('[생성 실패'):
-                    print(f"[{count}/{total}] {key} (skip)")
-                    continue
-
-                print(f"[{count}/{total}] {key} ({structure_key})...", end=" ", flush=True)
                 prompt = generate_prompt_overall(ten_god, yongsin, stage, structure_key)
-                text = call_ai(prompt)
-
-                if text:
-                    results['overall'][key] = text
-                    print(f"OK ({len(text)}자)")
-                else:
-                    print("FAILED")
-                    results['overall'][key] = f"[생성 실패] {key}"
-
-                # 10개마다 중간 저장
-                if count % 10 == 0:
-                    save_progress()
-
-    save_progress()
-
-    # 카테고리별
-    cat_total = len(TEN_GODS) * len(YONGSIN_TYPES) * len(CATEGORIES)
-    cat_count = 0
-    print(f"\n=== v2 카테고리별 풀이 ({cat_total}개) ===")
+                prompts['overall'][key] = (prompt, (prompt, structure_key))
+                prompt = generate_prompt_decision(ten_god, yongsin, stage)
+                prompts['decisions'][key] = (prompt, (prompt,))
     for category in CATEGORIES:
         for ten_god in TEN_GODS:
             for yongsin in YONGSIN_TYPES:
-                cat_count += 1
                 key = f"{category}_{ten_god}_{yongsin}"
-
-                if key in results['categories'] and not results['categories'][key].startswith('[생성 실패'):
-                    print(f"[{cat_count}/{cat_total}] {key} (skip)")
-                    continue
-
-                print(f"[{cat_count}/{cat_total}] {key}...", end=" ", flush=True)
                 prompt = generate_prompt_category(ten_god, yongsin, category)
-                text = call_ai(prompt)
-                if text:
-                    results['categories'][key] = text
-                    print(f"OK ({len(text)}자)")
+                prompts['categories'][key] = (prompt, (prompt,))
+    return prompts
+
+
+def _is_valid(value) -> bool:
+    """저장된 값이 실패 표시가 아닌지"""
+    if isinstance(value, dict):
+        return True
+    return isinstance(value, str) and not value.startswith('[생성 실패')
+
+
+def find_stale(section, values, fingerprints, manifest) -> dict:
+    """재생성할 키 → 사유. 매니페스트 도입 전 결과(파일 자체가 없음)는 현재 해시로 adopt"""
+    stale = {}
+    for key, current in fingerprints.items():
+        if key not in values:
+            stale[key] = '신규'
+        elif not _is_valid(values[key]):
+            stale[key] = '생성 실패'
+        else:
+            recorded = manifest.get(section, key)
+            if recorded is None and not manifest.existed:
+                manifest.record(section, key, current)
+            elif recorded is None:
+                stale[key] = '해시 기록 없음'
+            elif recorded != current:
+                stale[key] = '입력 변경'
+    return stale
+
+
+def run_jobs(jobs, section, results, journal, workers, manifest, fingerprints):
+    """생성 작업을 스레드 풀로 병렬 실행.
+
+    jobs: [(label, prompt, call_kwargs, on_success, on_failure)] 또는 끝에 기대 키 수를 붙인 6-튜플
+      on_success(text) / on_failure() 가 results[section]에 넣을 {key: 값}을 반환
+      (묶음 작업은 키 여러 개, 파싱 못 한 키는 빠질 수 있음).
+      on_success가 기대 키 수(기본 1)보다 적게 돌려주면 실패로 셈 — 파싱된 키만 저장,
+      빠진 키는 매니페스트에 안 남으니 다음 단계(단건 호출)에서 다시 생성.
+    results 갱신과 저널 기록은 메인 스레드에서만 수행 → 키 단위로 즉시 체크포인트.
+    성공한 키만 입력 해시(fingerprints[key])를 매니페스트에 기록 — 실패 값은 다음 실행에서 다시 생성.
+    반환: (저장된 키 수, 실패 작업 수, 소요 초)
+    """
+    total = len(jobs)
+    if total == 0:
+        return 0, 0, 0.0
+
+    start = time.time()
+    done = failed = stored = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(call_ai, prompt, **call_kwargs): (label, on_success, on_failure, *rest)
+                   for label, prompt, call_kwargs, on_success, on_failure, *rest in jobs}
+        for fut in as_completed(futures):
+            label, on_success, on_failure, *rest = futures[fut]
+            expected = rest[0] if rest else 1
+            try:
+                text = fut.result()
+            except Exception as e:
+                print(f"  {label} exception: {e}")
+                text = None
+            done += 1
+            if text:
+                values = on_success(text)
+                if len(values) >= expected:
+                    print(f"[{done}/{total}] {label} OK ({len(text)}자)")
                 else:
-                    results['categories'][key] = f"[생성 실패]"
-                    print("FAILED")
+                    failed += 1
+                    print(f"[{done}/{total}] {label} {'FAILED' if not values else 'PARTIAL'} "
+                          f"({len(text)}자, 파싱 {len(values)}/{expected}키 — 나머지는 단건 재시도)")
+            else:
+                failed += 1
+                values = on_failure()
+                print(f"[{done}/{total}] {label} FAILED")
+
+            for key, value in values.items():
+                input_hash = fingerprints[key] if text else None
+                results[section][key] = value
+                journal.append(section, key, value, input_hash)
+                if input_hash:
+                    manifest.record(section, key, input_hash)
+                else:
+                    manifest.forget(section, key)
+            stored += len(values)
+
+    elapsed = time.time() - start
+    rate = stored / elapsed * 60 if elapsed > 0 else 0.0
+    print(f"  → {stored}개 / {elapsed:.1f}초 ({rate:.1f} keys/min, 호출 {done}회, 실패 {failed})")
+    return stored, failed, elapsed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="v2 운세 풀이 생성")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'동시 생성 워커 수 (기본 {DEFAULT_WORKERS})')
+    parser.add_argument('--codex-mode', choices=['worker', 'exec'], default=CODEX_MODE,
+                        help=f'Codex 호출 방식 (기본 {CODEX_MODE})')
+    parser.add_argument('--backend', choices=sorted(DEFAULT_CAPACITY), default=DEFAULT_BACKEND,
+                        help=f'--endpoint가 없을 때 쓸 생성 백엔드 (기본 {DEFAULT_BACKEND})')
+    parser.add_argument('--endpoint', action='append', default=[], metavar='SPEC',
+                        help='백엔드 엔드포인트 (여러 번 지정). 예: kind=ollama,url=http://gpu1:11434/api/generate,'
+                             'weight=2,capacity=3 / kind=codex,mode=worker / kind=mock,latency=0.05')
+    parser.add_argument('--decision-batch', type=int, default=DECISION_BATCH,
+                        help=f'결정 박스를 한 번에 몇 개씩 묶어 생성할지 (1이면 묶음 끔, 기본 {DECISION_BATCH})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='재생성 대상(입력 해시가 바뀐 키)만 출력하고 종료')
+    add_cache_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    global CODEX_MODE, _registry
+    args = parse_args(argv)
+    CODEX_MODE = args.codex_mode
+    _registry = build_registry(args.endpoint, args.backend)
+    workers = max(1, args.workers)
+    cache = configure_from_args(args)
 
-                if cat_count % 10 == 0:
-                    save_progress()
+    output_path = os.path.join(OUTPUT_DIR, "narratives_generated_v2.json")
+    sections = ['overall', 'categories', 'decisions']
+
+    # 기존 결과 + 저널이 있으면 이어서 (중간 재시작 지원)
+    journal = CheckpointJournal(output_path, sections)
+    results = {s: {} for s in sections}
+    try:
+        results, replayed, dropped = journal.load()
+        print(f"=== 기존 결과 로드: overall {len(results['overall'])}개, categories {len(results['categories'])}개, decisions {len(results['decisions'])}개 ===")
+        if replayed or dropped:
+            print(f"  저널 replay: {replayed}개 (잘린 줄 {dropped}개 무시)")
+    except Exception as e:
+        print(f"기존 파일 로드 실패: {e}")
+
+    # 키별 입력 해시 — 지난 실행과 달라진 키만 재생성
+    manifest = RegenManifest(output_path, sections).load()
+    manifest.merge(journal.hashes)
+    prompts = build_prompts()
+    fingerprints = {s: {key: fingerprint(*parts) for key, (_, parts) in prompts[s].items()} for s in sections}
+    stale = {s: find_stale(s, results[s], fingerprints[s], manifest) for s in sections}
+
+    print("=== 재생성 대상 (입력 해시 비교) ===")
+    if not manifest.existed:
+        print("  매니페스트 없음 → 기존 결과는 현재 프롬프트로 만든 것으로 기록")
+    for s in sections:
+        print(stale_report(s, stale[s]))
+    if args.dry_run:
+        return
+
+    print(f"=== 백엔드: {', '.join(b.name for b in _registry.backends)}, 워커 {workers}개 "
+          f"(백엔드 상한 합계 {_registry.total_capacity()}) ===")
+    run_start = time.time()
+    run_done = 0
 
-    # 결정 박스
-    dec_total = len(TEN_GODS) * len(YONGSIN_TYPES) * len(TWELVE_STAGES)
-    dec_count = 0
-    def parse_decision(text: str) -> dict:
-        """🟢/🟡/🔴 줄을 파싱해 {green, yellow, red} 객체로 변환"""
-        green = yellow = red = ""
-        for line in text.split('\n'):
-            s = line.strip()
-            if not s:
-                continue
-            # 이모지 제거하고 본문만
-            if '🟢' in s:
-                green = re.sub(r'^.*?🟢\s*', '', s).strip()
-            elif '🟡' in s:
-                yellow = re.sub(r'^.*?🟡\s*', '', s).strip()
-            elif '🔴' in s:
-                red = re.sub(r'^.*?🔴\s*', '', s).strip()
-        return {
-            "green": green or "평소대로 일하기",
-            "yellow": yellow or "큰 지출 결정",
-            "red": red or "무리한 약속",
-        }
-
-    save_progress()
+    # 종합 풀이 (구조 4개 순환)
+    total = len(prompts['overall'])
+    jobs = []
+    print(f"=== v2 종합 풀이 생성 ({total}개) ===")
+    for key, (prompt, (_, structure_key)) in prompts['overall'].items():
+        if key not in stale['overall']:
+            continue
+        jobs.append((f"{key} ({structure_key})", prompt, {'max_chars': MAX_CHARS_OVERALL},
+                     lambda text, key=key: {key: text},
+                     lambda key=key: {key: f"[생성 실패] {key}"}))
+
+    print(f"  skip {total - len(jobs)}개 / 생성 대상 {len(jobs)}개")
+    run_done += run_jobs(jobs, 'overall', results, journal, workers, manifest, fingerprints['overall'])[0]
+
+    # 카테고리별
+    cat_total = len(prompts['categories'])
+    jobs = []
+    print(f"\n=== v2 카테고리별 풀이 ({cat_total}개) ===")
+    for key, (prompt, _) in prompts['categories'].items():
+        if key not in stale['categories']:
+            continue
+        jobs.append((key, prompt, {'max_chars': MAX_CHARS_CATEGORY},
+                     lambda text, key=key: {key: text},
+                     lambda key=key: {key: "[생성 실패]"}))
+
+    print(f"  skip {cat_total - len(jobs)}개 / 생성 대상 {len(jobs)}개")
+    run_done += run_jobs(jobs, 'categories', results, journal, workers, manifest, fingerprints['categories'])[0]
 
+    # 결정 박스
+    dec_total = len(prompts['decisions'])
+    batch_size = max(1, args.decision_batch)
     print(f"\n=== v2 결정 박스 ({dec_total}개) ===")
+
+    def pending_stages(ten_god, yongsin):
+        # 묶음에서 이미 저장된 키는 매니페스트에 현재 해시가 기록돼 있음
+        return [stage for stage in TWELVE_STAGES
+                if manifest.get('decisions', f"{ten_god}_{yongsin}_{stage}")
+                != fingerprints['decisions'][f"{ten_god}_{yongsin}_{stage}"]]
+
+    # 1단계: 묶음 호출 — 파싱된 단계만 저장, 나머지는 2단계 단건 호출로
+    if batch_size > 1:
+        jobs = []
+        for ten_god in TEN_GODS:
+            for yongsin in YONGSIN_TYPES:
+                stages = pending_stages(ten_god, yongsin)
+                for i in range(0, len(stages), batch_size):
+                    chunk = stages[i:i + batch_size]
+                    if len(chunk) == 1:
+                        continue  # 1개짜리는 단건 호출과 같음
+                    prompt = generate_prompt_decision_batch(ten_god, yongsin, chunk)
+                    jobs.append((f"{ten_god}_{yongsin} ×{len(chunk)}", prompt,
+                                 {'num_predict': 120 * len(chunk), 'max_chars': MAX_CHARS_DECISION * len(chunk)},
+                                 lambda text, tg=ten_god, ys=yongsin, chunk=chunk: {
+                                     f"{tg}_{ys}_{stage}": d
+                                     for stage, d in parse_decision_batch(text, chunk).items()},
+                                 lambda: {}, len(chunk)))
+        print(f"  묶음 호출 {len(jobs)}회 (최대 {batch_size}개씩)")
+        run_done += run_jobs(jobs, 'decisions', results, journal, workers, manifest, fingerprints['decisions'])[0]
+
+    # 2단계: 단건 호출 (묶음 미사용 / 묶음에서 파싱 실패한 키)
+    jobs = []
     for ten_god in TEN_GODS:
         for yongsin in YONGSIN_TYPES:
-            for stage in TWELVE_STAGES:
-                dec_count += 1
+            for stage in pending_stages(ten_god, yongsin):
                 key = f"{ten_god}_{yongsin}_{stage}"
+                prompt = prompts['decisions'][key][0]
+                jobs.append((key, prompt, {'num_predict': 200, 'max_chars': MAX_CHARS_DECISION},
+                             lambda text, key=key: {key: parse_decision(text)},
+                             lambda key=key: {key: dict(DECISION_FALLBACK)}))
 
-                if key in results['decisions'] and isinstance(results['decisions'][key], dict):
-                    print(f"[{dec_count}/{dec_total}] {key} (skip)")
-                    continue
-
-                print(f"[{dec_count}/{dec_total}] {key}...", end=" ", flush=True)
-                prompt = generate_prompt_decision(ten_god, yongsin, stage)
-                text = call_ai(prompt, num_predict=200)
-                if text:
-                    results['decisions'][key] = parse_decision(text)
-                    print(f"OK")
-                else:
-                    results['decisions'][key] = {
-                        "green": "평소대로 일하기",
-                        "yellow": "큰 지출 결정",
-                        "red": "무리한 약속",
-                    }
-                    print("FAILED")
+    print(f"  단건 호출 대상 {len(jobs)}개")
+    run_done += run_jobs(jobs, 'decisions', results, journal, workers, manifest, fingerprints['decisions'])[0]
 
-                if dec_count % 10 == 0:
-                    save_progress()
+    # 매니페스트 먼저 저장 → 저널 → 본 JSON으로 compact (둘 다 원자적 교체)
+    manifest.save()
+    journal.compact(results)
 
-    save_progress()
+    run_elapsed = time.time() - run_start
+    run_rate = run_done / run_elapsed * 60 if run_elapsed > 0 else 0.0
 
     print(f"\n=== v2 완료! ===")
     print(f"종합: {len(results['overall'])}개")
     print(f"카테고리: {len(results['categories'])}개")
     print(f"결정 박스: {len(results['decisions'])}개")
+    print(f"처리량: {run_done}개 / {run_elapsed/60:.1f}분 ({run_rate:.1f} keys/min, 워커 {workers})")
+    print(cache.summary())
+    print(_registry.summary())
+    if 'ollama' in _registry.kinds():
+        print(stream_stats.summary())
+        print(pool_summary())
+    for pool in _codex_pools.values():
+        print(pool.summary())
+        pool.close()
     print(f"저장: {output_path}")
 
 
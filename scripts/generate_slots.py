@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-"""단락 셔플 데이터 생성 — 가짜 bucket 1~6 폐기 + 슬롯 풀 빌드
+"""단락 셔플 데이터 생성 — 슬롯 풀 빌드
 
-원본: narratives_generated_v1plus.json (3.2MB, bucket 7배 확장 = 가짜)
+원본: narratives_generated_v1plus.json (원본 키만 — bucket 1~6은 generate_buckets가 요청 시 계산,
+      예전 파일에 남은 '_1'~'_6' 키는 건너뜀)
 → narratives_slots_v1.json (실제 다양성)
 
 구조:
@@ -18,13 +19,31 @@
 }
 
 런타임에 dateHash로 4슬롯 각각 독립 선택 → 12^4 = 20,736가지 조합/그룹
+
+슬롯 중복 제거 (그룹·슬롯마다, 처음 나온 순서 유지 — 해시 집합이라 풀 크기에 선형):
+  exact       본문이 완전히 같을 때만
+  normalized  공백/기호를 지운 형태가 같으면 같은 파편 (기본)
+  near        normalized + MinHash 자카드 NEAR_DUP_THRESHOLD 이상 (near_duplicates)
+slot0은 추가로 첫 4자가 같은 도입도 뺌 (사용자 신고: 같은 시작 자주 나옴)
+
+"파일 크기"에 압축 형식(slots_compact: 문자열 표 + 번호 배열)이면 크기/gzip/파이썬 파싱 시간이 어떻게 되는지 같이 출력
+(메모리에서만 — 압축 파일 쓰기와 node 파싱 비교는 수동 단계 pipeline.py slots_compact)
 """
-import sys, json, re
+import sys, re
 sys.stdout.reconfigure(encoding='utf-8')
 
+from narrative_stream import NarrativeWriter, iter_section
+from near_duplicates import NearDuplicateIndex, normalize
+from slots_compact import compare_in_memory, print_compare
+
 INPUT = 'src/data/generated/narratives_generated_v1plus.json'
 OUTPUT = 'src/data/generated/narratives_slots_v1.json'
 
+DEDUP_MODES = ('exact', 'normalized', 'near')
+DEDUP_MODE = 'normalized'
+NEAR_DUP_THRESHOLD = 0.9  # validate_narratives 거의 같은 본문 검사와 같은 기준
+SLOT0_START_CHARS = 4
+
 
 def split_sentences(text):
     """한국어 문장 분리"""
@@ -49,16 +68,58 @@ def split_4slots(text):
         return [sents[0:2], sents[2:5], sents[5:9], sents[9:n]]
 
 
-def build_slot_pools(data_dict, key_extractor):
+class SlotDeduper:
+    """파편 중복 판정 — 그룹·슬롯(scope)별 해시 집합 (+ near 모드는 MinHash 색인 1개를 scope로 나눠 씀)"""
+
+    def __init__(self, mode: str = DEDUP_MODE, near_threshold: float = NEAR_DUP_THRESHOLD):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f'dedup 모드는 {DEDUP_MODES} 중 하나: {mode}')
+        self.mode = mode
+        self.raw_seen = set()  # (scope, 원문)
+        self.seen = set()      # (scope, 키)
+        self.starts = set()    # (scope, 첫 SLOT0_START_CHARS자)
+        self.near = NearDuplicateIndex(near_threshold) if mode == 'near' else None
+        self.dropped = 0
+
+    def key(self, text: str) -> str:
+        return text if self.mode == 'exact' else normalize(text)
+
+    def admit(self, scope: str, text: str, check_start: bool = False) -> bool:
+        """처음 보는 파편이면 기록하고 True"""
+        raw = (scope, text)
+        start = (scope, text[:SLOT0_START_CHARS])
+        if raw in self.raw_seen or (check_start and start in self.starts):
+            self.dropped += 1
+            return False
+        self.raw_seen.add(raw)  # 원문이 같은 파편은 정규화 없이 바로 걸러짐
+        key = raw if self.mode == 'exact' else (scope, self.key(text))
+        if key in self.seen:
+            self.dropped += 1
+            return False
+        if self.near is not None and self.near.add_unique(scope, str(len(self.near)), text) is not None:
+            self.dropped += 1
+            return False
+        self.seen.add(key)
+        if check_start:
+            self.starts.add(start)
+        return True
+
+
+def build_slot_pools(entries, key_extractor, dedup=DEDUP_MODE):
     """원본 데이터에서 슬롯 풀 구축
+    entries: {키: 본문} 또는 (키, 본문) 스트림 (narrative_stream.iter_section)
     key_extractor: 키에서 그룹 키 추출하는 함수 (예: '비견_yongsin_장생' → '비견_yongsin')
+    dedup: DEDUP_MODES 중 하나 또는 SlotDeduper (뺀 파편 수는 deduper.dropped)
     """
     groups = {}  # group_key -> {slot0:[], slot1:[], slot2:[], slot3:[]}
     skipped_short = 0
     skipped_bucket = 0
+    deduper = dedup if isinstance(dedup, SlotDeduper) else SlotDeduper(dedup)
 
-    for k, text in data_dict.items():
-        # bucket 1~6 스킵 (가짜 다양성)
+    if hasattr(entries, 'items'):
+        entries = entries.items()
+    for k, text in entries:
+        # 예전 파일에 펼쳐 둔 bucket 1~6 키 (generate_buckets 정리 전) — 같은 원본의 변환이라 건너뜀
         if re.search(r'_[1-6]$', k):
             skipped_bucket += 1
             continue
@@ -75,32 +136,12 @@ def build_slot_pools(data_dict, key_extractor):
         if group_key not in groups:
             groups[group_key] = {f'slot{i}': [] for i in range(4)}
 
-        # 슬롯별 파편 추가 (중복 제거를 위해 set 변환은 마지막에)
+        # 슬롯별 파편 추가 — 읽으면서 바로 중복 제거 (처음 나온 순서 유지)
         for i, slot_sents in enumerate(slots):
             joined = ' '.join(slot_sents).strip()
-            if joined:
-                groups[group_key][f'slot{i}'].append(joined)
-
-    # 중복 제거 + slot0(도입)은 같은 첫 4자 중복 제거 (사용자 신고: 같은 시작 자주 나옴)
-    for gk, slots_dict in groups.items():
-        for slot_name in slots_dict:
-            if slot_name == 'slot0':
-                # slot0: 첫 4자 기준 dedup (같은 도입 단어 회피)
-                seen_starts = set()
-                kept = []
-                for t in slots_dict[slot_name]:
-                    start = t[:4]
-                    if start not in seen_starts and t not in kept:
-                        seen_starts.add(start)
-                        kept.append(t)
-                slots_dict[slot_name] = kept
-            else:
-                # slot1~3: 본문 전체 dedup만
-                seen = []
-                for t in slots_dict[slot_name]:
-                    if t not in seen:
-                        seen.append(t)
-                slots_dict[slot_name] = seen
+            slot_name = f'slot{i}'
+            if joined and deduper.admit(f'{group_key}/{slot_name}', joined, check_start=(i == 0)):
+                groups[group_key][slot_name].append(joined)
 
     return groups, skipped_short, skipped_bucket
 
@@ -118,23 +159,34 @@ def category_key_extractor(key):
     return key
 
 
-def main():
-    print(f'입력: {INPUT}')
-    with open(INPUT, 'r', encoding='utf-8') as f:
-        d = json.load(f)
+class _Counted:
+    """스트림을 그대로 넘기면서 항목 수 세기"""
 
-    overall = d.get('overall', {})
-    categories = d.get('categories', {})
+    def __init__(self, items):
+        self.items_iter = items
+        self.n = 0
 
-    print(f'\n원본 overall: {len(overall)}개 (bucket 1~6 포함)')
-    print(f'원본 categories: {len(categories)}개')
+    def __iter__(self):
+        for item in self.items_iter:
+            self.n += 1
+            yield item
+
+
+def main():
+    print(f'입력: {INPUT}')
+    # 입력은 섹션별로 스트리밍 — 메모리에 남는 건 overall 슬롯 풀(그룹당 원본 1벌)뿐
 
     # overall: 같은 (십신, 용신) 그룹으로 슬롯 풀
     print('\n=== overall 슬롯 풀 빌드 ===')
-    overall_pools, short, bucket = build_slot_pools(overall, overall_key_extractor)
+    overall_in = _Counted(iter_section(INPUT, 'overall'))
+    deduper = SlotDeduper(DEDUP_MODE)
+    overall_pools, short, bucket = build_slot_pools(overall_in, overall_key_extractor, deduper)
+    print(f'  원본 overall: {overall_in.n}개')
     print(f'  그룹 수: {len(overall_pools)} (10 십신 × 3 용신 = 30 예상)')
-    print(f'  가짜 bucket 1~6 제거: {bucket}개')
+    if bucket:
+        print(f'  ⚠️ 예전 bucket 키 건너뜀: {bucket}개 (generate_buckets.py로 정리 필요)')
     print(f'  너무 짧아서 스킵: {short}개')
+    print(f'  중복 파편 제거 ({DEDUP_MODE}): {deduper.dropped}개')
 
     # 그룹별 슬롯 변형 수 확인
     sample_group = list(overall_pools.keys())[0]
@@ -146,21 +198,21 @@ def main():
     # categories는 본문이 짧음 → 슬롯 분리 안 하고 그대로 두는 게 안전
     print('\n=== categories는 셔플 미적용 (짧은 본문) ===')
 
-    # 출력
-    out = {
-        'overall_slots': overall_pools,
-        'categories': {k: v for k, v in categories.items() if not re.search(r'_[1-6]$', k)},
-        'meta': {
+    # 출력 (categories는 읽으면서 바로 씀)
+    with NarrativeWriter(OUTPUT, ['overall_slots', 'categories']) as writer:
+        for gk, pool in overall_pools.items():
+            writer.write('overall_slots', gk, pool)
+        categories_in = _Counted(iter_section(INPUT, 'categories'))
+        for k, v in categories_in:
+            if not re.search(r'_[1-6]$', k):
+                writer.write('categories', k, v)
+        writer.write_member('meta', {
             'version': 'slots_v1',
             'source': 'narratives_generated_v1plus.json',
-            'bucket_removed': bucket,
             'overall_groups': len(overall_pools),
-            'note': 'overall은 4슬롯 셔플, categories는 원본 유지 (bucket 1~6 제거)'
-        }
-    }
-
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+            'note': 'overall은 4슬롯 셔플, categories는 원본 유지'
+        })
+    print(f'  원본 categories: {categories_in.n}개')
 
     # 파일 크기 비교
     import os
@@ -170,6 +222,9 @@ def main():
     print(f'  원본: {in_size:.0f} KB ({in_size/1024:.2f} MB)')
     print(f'  슬롯: {out_size:.0f} KB ({out_size/1024:.2f} MB)')
     print(f'  감소: {(in_size-out_size)/in_size*100:.1f}%')
+    # 압축 형식(slots_compact)이면 얼마나 되는지 — 메모리에서만 (파일/node 비교는 pipeline.py slots_compact)
+    with open(OUTPUT, 'r', encoding='utf-8') as f:
+        print_compare(*compare_in_memory(f.read()))
 
     # 다양성 추정
     avg_per_slot = sum(
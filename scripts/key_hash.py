@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""키 해시 (postprocess_v1 / generate_buckets 공용)
+
+앱(TypeScript)과 같은 31배 다항식 해시:
+  str.split('').reduce((a, b) => ((a << 5) - a) + b.charCodeAt(0), 0)   // useTodayFortune.ts getHash
+파이썬 결과 = JS 결과 >>> 0 (부호 없는 32비트). JS 중간값은 int32 밖으로 나가도
+전부 2^53 안의 정수 연산이라 mod 2^32로 보면 같음 → test_hash_parity.py로 검증.
+
+charCodeAt은 UTF-16 코드 단위 → BMP 밖 문자(이모지 등)는 서로게이트 2개로 해시.
+(한글 키만 쓰는 기존 스크립트의 ord() 루프와는 BMP 안에서 완전히 같은 값)
+
+- hash_str(s):                LRU 메모이즈 — 같은 키를 단계마다 다시 해시하지 않음
+- hash_extend(h, suffix):     hash_str(base + suffix) == hash_extend(hash_str(base), suffix)
+- hash_with_suffix(key, sfx): key 해시는 캐시에서, suffix만 이어서 계산 ('_first', '_close', '_b3')
+- hash_batch(strings):        NumPy로 전체 키를 열 단위 벡터 연산 (NumPy 없으면 hash_str 반복)
+- fmix32(h):                  MurmurHash3 finalizer — 앱의 fmix32와 동일
+"""
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy는 선택 — 없으면 hash_batch가 스칼라 경로로 동작
+    np = None
+
+MASK32 = 0xFFFFFFFF
+HASH_CACHE_SIZE = 1 << 16
+
+
+def hash_extend(h: int, suffix: str) -> int:
+    """기존 해시 h 뒤에 suffix 문자들을 이어서 해시"""
+    for c in suffix:
+        code = ord(c)
+        if code > 0xFFFF:  # UTF-16 서로게이트 쌍 (JS charCodeAt과 동일)
+            code -= 0x10000
+            h = (h * 31 + (0xD800 + (code >> 10))) & MASK32
+            code = 0xDC00 + (code & 0x3FF)
+        h = (h * 31 + code) & MASK32
+    return h
+
+
+@lru_cache(maxsize=HASH_CACHE_SIZE)
+def hash_str(s: str) -> int:
+    return hash_extend(0, s)
+
+
+@lru_cache(maxsize=HASH_CACHE_SIZE)
+def hash_with_suffix(key: str, suffix: str) -> int:
+    """hash_str(key + suffix) — key 부분은 캐시된 해시 재사용"""
+    return hash_extend(hash_str(key), suffix)
+
+
+def fmix32(h: int) -> int:
+    h &= MASK32
+    h = ((h ^ (h >> 16)) * 0x85EBCA6B) & MASK32
+    h = ((h ^ (h >> 13)) * 0xC2B2AE35) & MASK32
+    return h ^ (h >> 16)
+
+
+def hash_batch(strings) -> list:
+    """문자열 목록 → 해시 목록 (hash_str과 비트 단위 동일)
+
+    NumPy 경로: 코드 포인트 행렬(n × 최대 길이)을 만들고 열마다 h = h*31 + c 를
+    uint32 배열로 한 번에 계산 (오버플로는 mod 2^32로 자연스럽게 감김).
+    BMP 밖 문자가 들어간 문자열만 스칼라 경로로 다시 계산.
+    """
+    strings = list(strings)
+    if np is None or not strings:
+        return [hash_str(s) for s in strings]
+
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    width = int(lengths.max())
+    if width == 0:
+        return [0] * len(strings)
+    codes = np.array(strings, dtype=f'<U{width}').view(np.uint32).reshape(len(strings), width)
+    h = np.zeros(len(strings), dtype=np.uint32)
+    for col in range(width):
+        active = lengths > col
+        h = np.where(active, h * np.uint32(31) + codes[:, col], h)
+    result = h.tolist()
+    for i in np.flatnonzero((codes > 0xFFFF).any(axis=1)):
+        result[i] = hash_str(strings[i])
+    return result
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""LLM 프롬프트/응답 캐시 (내용 주소 기반, 디스크 영속)
+
+같은 프롬프트를 매 실행마다 다시 보내던 문제 해결.
+키 = sha256(backend, model, prompt, system, options, variant)
+→ 프롬프트 템플릿을 고친 뒤 재실행하면 바뀐 프롬프트만 실제 호출.
+
+- 저장소: SQLite 1파일 (스레드 병렬 호출 안전, 잠금 1개)
+- 용량 상한: 마지막 접근 시각 기준 LRU 제거 (LLM_CACHE_MAX_MB, 기본 200MB)
+- bypass: 캐시 조회 안 함 (응답은 새로 저장) — 재샘플링 강제용
+- variant: 같은 프롬프트의 n번째 샘플을 별도 키로 — 의도적 다양화용
+
+환경 변수:
+  LLM_CACHE_PATH    캐시 파일 경로 (기본 scripts/.cache/llm_cache.sqlite)
+  LLM_CACHE_MAX_MB  용량 상한 MB
+  LLM_CACHE_BYPASS  1이면 조회 생략
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), '.cache', 'llm_cache.sqlite')
+DEFAULT_MAX_MB = 200
+
+
+def make_key(backend: str, model: str, prompt: str, system: str = None,
+             options: dict = None, variant: int = 0) -> str:
+    """요청을 정규화(JSON, 키 정렬)해서 sha256 해시"""
+    payload = {
+        'backend': backend,
+        'model': model,
+        'prompt': prompt,
+        'system': system or '',
+        'options': options or {},
+        'variant': variant,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 bypass: bool = False, variant: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.variant = variant
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' backend TEXT, model TEXT,'
+            ' response TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' created REAL, last_access REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)')
+        self._conn.commit()
+
+    def get(self, key: str):
+        if self.bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            row = self._conn.execute('SELECT response FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, backend: str = '', model: str = ''):
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, backend, model, response, size, created, last_access)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, backend, model, response, size, now, now),
+            )
+            self.stores += 1
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self):
+        """총 용량이 상한을 넘으면 오래 안 쓴 것부터 제거"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT key, size FROM responses ORDER BY last_access ASC').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            self.evictions += 1
+
+    def cached_call(self, backend: str, model: str, prompt: str, call,
+                    system: str = None, options: dict = None):
+        """캐시에 있으면 반환, 없으면 call() 실행 후 성공(truthy) 응답만 저장"""
+        key = make_key(backend, model, prompt, system, options, self.variant)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        result = call()
+        if result:
+            self.put(key, result, backend, model)
+        return result
+
+    def entry_count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return (f"LLM 캐시: hit {self.hits} / miss {self.misses} ({rate:.0f}%), "
+                f"저장 {self.stores}, 제거 {self.evictions}, 항목 {self.entry_count()}개"
+                f"{' [bypass]' if self.bypass else ''}{f' [variant {self.variant}]' if self.variant else ''}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """환경 변수 설정으로 만든 프로세스 공용 캐시"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache(
+                path=os.environ.get('LLM_CACHE_PATH', DEFAULT_PATH),
+                max_bytes=int(float(os.environ.get('LLM_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024),
+                bypass=os.environ.get('LLM_CACHE_BYPASS', '') == '1',
+            )
+        return _default_cache
+
+
+def add_cache_args(parser):
+    """생성 스크립트 공통 CLI 옵션"""
+    parser.add_argument('--no-cache', action='store_true',
+                        help='LLM 캐시 조회 생략 (응답은 새로 저장)')
+    parser.add_argument('--variant', type=int, default=0,
+                        help='같은 프롬프트의 다른 샘플을 원할 때 변형 번호 (기본 0)')
+
+
+def configure_from_args(args) -> LLMCache:
+    cache = get_cache()
+    if args.no_cache:
+        cache.bypass = True
+    cache.variant = args.variant
+    return cache
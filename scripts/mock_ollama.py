@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""로컬 Ollama 대역 서버 (/api/generate 흉내)
+
+GPU 없이 생성 파이프라인(동시성/재시작/저장)을 점검하기 위한 가짜 서버.
+요청 1건당 --latency 초만큼 지연 후 고정 패턴의 한국어 풀이를 돌려줌.
+"stream": true 요청은 NDJSON 청크로 --token-delay 간격을 두고 토큰 단위 전송 (토큰 = --token-size 글자).
+
+사용:
+  python scripts/mock_ollama.py --port 11434 --latency 2.0
+  OLLAMA_URL=http://localhost:11434/api/generate \\
+      python scripts/generate_narratives_v2.py --backend ollama --workers 8
+"""
+import argparse
+import hashlib
+import json
+import re
+import socket
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+SAMPLE_SENTENCES = [
+    '오늘은 마음이 한결 가벼워지는 흐름이에요.',
+    '아침에는 밀린 일을 하나만 골라 끝내 보세요.',
+    '낮에는 생각보다 일이 수월하게 풀릴 수 있어요.',
+    '저녁에는 퇴근길 카페에서 5분만 쉬어 가도 충분해요.',
+    '작은 결정은 미루지 말고 바로 정리하는 편이 좋아요.',
+    '밤에는 휴대폰을 내려두고 일찍 잠자리에 드세요.',
+    '급하게 서두르기보다 한 박자 쉬어 가는 게 어울려요.',
+]
+
+DECISION_TEXT = "🟢 보고서 초안 끝내기\n🟡 친구와 돈 약속\n🔴 새 투자 결정"
+
+
+def fake_response(prompt: str) -> str:
+    """프롬프트 해시로 결정적인 가짜 응답 생성"""
+    h = int(hashlib.md5(prompt.encode('utf-8')).hexdigest(), 16)
+    if '오늘의 결정' in prompt:
+        # 묶음 프롬프트: "- 단계: 설명" 목록마다 [단계] 블록
+        stages = re.findall(r'^- ([가-힣]+): ', prompt.split('에너지 단계', 1)[-1], re.MULTILINE)
+        if '[단계명]' in prompt and stages:
+            return '\n'.join(f'[{stage}]\n{DECISION_TEXT}' for stage in stages)
+        return DECISION_TEXT
+    n = 3 if '3~4문장' in prompt else 6
+    start = h % len(SAMPLE_SENTENCES)
+    sents = [SAMPLE_SENTENCES[(start + i) % len(SAMPLE_SENTENCES)] for i in range(n)]
+    return ' '.join(sents)
+
+
+def split_tokens(text: str, size: int = 3):
+    """가짜 토큰화: 3글자 단위"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    latency = 1.0
+    token_delay = 0.0
+    token_size = 3
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # 작은 토큰 청크가 Nagle 알고리즘에 묶여 한꺼번에 나가지 않게 (Ollama 실서버와 동일)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        if self.path != '/api/generate':
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+        time.sleep(self.latency)
+        response = fake_response(payload.get('prompt', ''))
+        model = payload.get('model', 'mock')
+
+        if payload.get('stream', True):
+            self._stream(model, response)
+            return
+
+        body = json.dumps({
+            'model': model,
+            'response': response,
+            'done': True,
+        }, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, model: str, response: str):
+        """NDJSON 토큰 스트림 (chunked) — 클라이언트가 중간에 끊으면 조용히 종료"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        tokens = split_tokens(response, self.token_size)
+        try:
+            for tok in tokens:
+                self._write_chunk({'model': model, 'response': tok, 'done': False})
+                if self.token_delay:
+                    time.sleep(self.token_delay)
+            self._write_chunk({'model': model, 'response': '', 'done': True, 'eval_count': len(tokens)})
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _write_chunk(self, obj: dict):
+        data = json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def log_message(self, fmt, *args):
+        pass  # 요청 로그 생략 (생성 스크립트 출력과 섞이지 않게)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ollama 대역 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--latency', type=float, default=1.0, help='요청당 지연 (초)')
+    parser.add_argument('--token-delay', type=float, default=0.0, help='스트리밍 토큰 간 지연 (초)')
+    parser.add_argument('--token-size', type=int, default=3, help='스트리밍 토큰 1개의 글자 수 (한국어 실서버는 1글자도 흔함)')
+    args = parser.parse_args()
+
+    MockOllamaHandler.latency = args.latency
+    MockOllamaHandler.token_delay = args.token_delay
+    MockOllamaHandler.token_size = max(1, args.token_size)
+    server = ThreadingHTTPServer((args.host, args.port), MockOllamaHandler)
+    print(f'mock ollama: http://{args.host}:{args.port}/api/generate (latency {args.latency}s)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""내러티브 JSON 스트리밍 입출력 (postprocess_v1 / generate_buckets / generate_slots / validate 공용)
+
+기존: json.load로 파일 전체(v1plus 3.2MB) → dict, 결과도 dict로 다 만든 뒤 json.dump(indent=2)
+  → 입력 + 출력 사본이 동시에 메모리에. 14,400 샘플 규모로 가면 감당 안 됨.
+
+읽기 iter_entries(path, sections):
+  최상위 {"섹션": {"키": 값, ...}, ...} 구조를 청크 단위로 읽으면서
+  (섹션, 키, 값)을 하나씩 yield → 메모리는 항목 1개 + 읽기 버퍼 크기.
+  값은 json.JSONDecoder.raw_decode로 해석 (문자열뿐 아니라 중첩 dict/list 값도 가능 — slots 파일).
+  sections를 주면 그 섹션만 yield하고 나머지는 해석만 하고 버림, 마지막 섹션이 끝나면 바로 멈춤.
+
+쓰기 NarrativeWriter(path, sections):
+  항목을 받는 즉시 파일에 씀. 출력 바이트는 json.dump(obj, f, ensure_ascii=False, indent=2)와 동일.
+  임시 파일에 쓰고 close()에서 os.replace → 입력과 출력이 같은 파일이어도 안전
+  (generate_buckets는 자기 입력 파일을 덮어씀), 중간에 실패하면 원본 그대로.
+"""
+import json
+import os
+
+CHUNK_SIZE = 1 << 16
+_WS = ' \t\n\r'
+_DELIMS = _WS + ',}]'
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """청크 버퍼 위에서 토큰 단위로 읽기"""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk  # 이미 읽은 앞부분은 버림
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """공백 건너뛰고 다음 글자 (EOF면 '')"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch: str):
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f'JSON 형식 오류: {ch!r} 기대, {got!r} 발견 (버퍼 위치 {self.pos})')
+        self.pos += 1
+
+    def value(self):
+        """다음 JSON 값 1개. 버퍼에서 끝나지 않으면 더 읽고 재시도"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # 숫자/리터럴은 청크 경계에서 잘려도 앞부분만으로 해석될 수 있음 ('1.5' → '1')
+            # → 뒤에 구분자(공백 , } ])가 보일 때만 확정 (문자열/객체/배열은 닫는 글자로 끝나서 안전)
+            if (not isinstance(value, (str, dict, list))
+                    and (end == len(self.buf) or self.buf[end] not in _DELIMS) and self._fill()):
+                continue
+            self.pos = end
+            return value
+
+
+def iter_entries(path: str, sections=None, chunk_size: int = CHUNK_SIZE):
+    """(섹션, 키, 값) 스트림. 최상위 값이 객체가 아닌 멤버는 건너뜀"""
+    wanted = set(sections) if sections is not None else None
+    remaining = set(wanted) if wanted is not None else None
+    with open(path, 'r', encoding='utf-8') as f:
+        r = _Reader(f, chunk_size)
+        r.expect('{')
+        if r.peek() == '}':
+            return
+        while True:
+            section = r.value()
+            r.expect(':')
+            if r.peek() != '{':
+                r.value()  # 객체가 아닌 최상위 값
+            else:
+                r.pos += 1
+                keep = wanted is None or section in wanted
+                if r.peek() == '}':
+                    r.pos += 1
+                else:
+                    while True:
+                        key = r.value()
+                        r.expect(':')
+                        value = r.value()
+                        if keep:
+                            yield section, key, value
+                        if r.peek() == ',':
+                            r.pos += 1
+                            continue
+                        r.expect('}')
+                        break
+                if remaining is not None:
+                    remaining.discard(section)
+                    if not remaining:
+                        return  # 원하는 섹션 다 읽음 — 나머지 파일은 안 읽음
+            if r.peek() == ',':
+                r.pos += 1
+                continue
+            r.expect('}')
+            return
+
+
+def iter_section(path: str, section: str, chunk_size: int = CHUNK_SIZE):
+    """섹션 1개의 (키, 값) 스트림"""
+    for _, key, value in iter_entries(path, [section], chunk_size):
+        yield key, value
+
+
+def _dumps(value, depth: int, indent: int) -> str:
+    text = json.dumps(value, ensure_ascii=False, indent=indent)
+    if '\n' in text:  # 중첩 값: 현재 깊이만큼 들여쓰기 (문자열 안 개행은 \n으로 이스케이프돼 있음)
+        text = text.replace('\n', '\n' + ' ' * (indent * depth))
+    return text
+
+
+class NarrativeWriter:
+    """{"섹션": {"키": 값}} 증분 쓰기. 섹션 순서 = sections 인자 순서 (안 쓴 섹션은 {}로)
+
+    with NarrativeWriter(path, ['overall', 'categories']) as w:
+        w.write('overall', key, value)       # 섹션 순서대로, 섹션 안에서는 쓴 순서대로
+        w.write_member('meta', {...})        # 스트리밍 섹션 뒤의 일반 최상위 멤버
+    """
+
+    def __init__(self, path: str, sections=(), indent: int = 2):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.sections = list(sections)
+        self.indent = indent
+        self.f = open(self.tmp_path, 'w', encoding='utf-8')
+        self.f.write('{')
+        self._members = 0        # 쓴 최상위 멤버 수
+        self._current = None     # 열려 있는 섹션
+        self._entries = 0        # 현재 섹션의 항목 수
+        self._done = []          # 닫힌 섹션
+        self.count = 0
+
+    def _pad(self, depth: int) -> str:
+        return '\n' + ' ' * (self.indent * depth)
+
+    def _open_member(self, name: str):
+        self.f.write((',' if self._members else '') + self._pad(1) + json.dumps(name, ensure_ascii=False) + ': ')
+        self._members += 1
+
+    def _close_section(self):
+        if self._current is None:
+            return
+        self.f.write((self._pad(1) if self._entries else '') + '}')
+        self._done.append(self._current)
+        self._current = None
+
+    def begin_section(self, section: str):
+        if section == self._current:
+            return
+        if section in self._done:
+            raise ValueError(f'섹션 {section}은 이미 닫힘 — 섹션별로 모아서 써야 함')
+        if section in self.sections:
+            # 선언 순서상 앞 섹션이 비어 있으면 {}로 먼저 씀
+            self._close_section()
+            for s in self.sections[:self.sections.index(section)]:
+                if s not in self._done:
+                    self._open_member(s)
+                    self.f.write('{}')
+                    self._done.append(s)
+        else:
+            self._close_section()
+        self._open_member(section)
+        self.f.write('{')
+        self._current, self._entries = section, 0
+
+    def write(self, section: str, key: str, value):
+        if section != self._current:
+            self.begin_section(section)
+        self.f.write((',' if self._entries else '') + self._pad(2)
+                     + json.dumps(key, ensure_ascii=False) + ': ' + _dumps(value, 2, self.indent))
+        self._entries += 1
+        self.count += 1
+
+    def write_member(self, name: str, value):
+        """일반 최상위 멤버 (메타 정보 등) — 통째로 씀"""
+        self._finish_sections()
+        self._open_member(name)
+        self.f.write(_dumps(value, 1, self.indent))
+
+    def _finish_sections(self):
+        self._close_section()
+        for s in self.sections:
+            if s not in self._done:
+                self._open_member(s)
+                self.f.write('{}')
+                self._done.append(s)
+
+    def close(self):
+        self._finish_sections()
+        self.f.write(self._pad(0) + '}' if self._members else '}')
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.f.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""거의 같은 본문 찾기 — MinHash + LSH 색인 (validate_narratives 공용)
+
+배경: bucket 0~6 본문이 "자카드 유사도 0.95 = prefix만 다른 동일 본문"이라는 건
+generatePersonalNarrative.ts 주석에만 남아 있고 손으로 찾은 것. 모든 쌍 비교는 O(n²)
+(14,400 샘플이면 1억 쌍) → 색인으로 후보 쌍만 비교.
+
+방식:
+1. 본문 → 정규화(공백/기호 제거) 후 글자 SHINGLE_SIZE-gram 집합
+2. MinHash 서명: 해시 함수 num_perm개 각각의 최솟값 → 두 서명의 일치 비율 ≈ 자카드 유사도
+   (해시는 zlib.crc32 + (a·x + b) mod 2^61-1 — 실행마다 같은 값, NumPy 유무와 무관하게 같은 서명)
+3. LSH: 서명을 bands × rows 로 잘라 band마다 버킷 — 유사도 threshold 이상인 쌍이
+   적어도 한 band에서 같은 버킷에 들어갈 확률이 높도록 (bands, rows)를 고름 (optimal_params,
+   놓치는 쪽에 가중치 — 임계 0.9면 8 bands × 16 rows, 유사도 0.9 쌍의 81%·0.95 쌍의 99%가 후보)
+4. 같은 버킷에 든 쌍만 서명으로 유사도 추정 → threshold 이상이면 union-find로 묶어 군집
+   버킷이 MAX_BUCKET_PAIRS개보다 크면 (같은 본문이 수백 개) 버킷 첫 문서와만 비교 → 군집 크기와 무관하게 선형
+→ 문서 수에 거의 비례 (n × bands 버킷 + 후보 쌍 수)
+
+섹션: overall / categories (키 → 본문), overall_slots (그룹 → {slot0~3: [파편]}) — 섹션끼리는 비교 안 함.
+
+  python scripts/near_duplicates.py src/data/generated/narratives_slots_v1.json
+  python scripts/near_duplicates.py FILE --threshold 0.8 --top 20
+"""
+import argparse
+import functools
+import re
+import sys
+import zlib
+from collections import defaultdict
+
+from narrative_stream import iter_entries
+
+try:
+    import numpy as np
+except ImportError:  # NumPy는 선택 — 없으면 서명을 파이썬 정수 연산으로 (같은 값)
+    np = None
+
+SECTIONS = ('overall', 'categories', 'overall_slots')
+DEFAULT_THRESHOLD = 0.9
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+SEED = 1
+FALSE_NEGATIVE_WEIGHT = 0.9  # 검증용이라 놓치는 쪽을 더 무겁게 (거짓 양성은 서명 비교 1번으로 걸러짐)
+MAX_BUCKET_PAIRS = 64  # 버킷 문서 수가 이보다 많으면 모든 쌍 대신 첫 문서와만 비교
+
+_MERSENNE = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+_MAX_HASH = (1 << 32) - 1
+_NORMALIZE_RE = re.compile(r'[^\w가-힣]+')
+
+
+def normalize(text: str) -> str:
+    """공백/기호를 지운 본문 (띄어쓰기·문장부호만 다른 본문은 같은 값)"""
+    return _NORMALIZE_RE.sub('', text)
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set:
+    """공백/기호를 지운 글자 k-gram 집합 (k보다 짧으면 본문 전체 1개)"""
+    s = normalize(text)
+    if len(s) <= k:
+        return {s} if s else set()
+    return {s[i:i + k] for i in range(len(s) - k + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    """정확한 자카드 유사도 (검증/테스트용)"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _permutations(num_perm: int, seed: int) -> list:
+    """(a, b) 계수 num_perm쌍 — 선형 합동 생성기로 고정 (random 모듈 버전과 무관)"""
+    state = seed & _MASK64
+    coeffs = []
+    for _ in range(num_perm):
+        pair = []
+        for lo in (1, 0):
+            state = (state * 6364136223846793005 + 1442695040888963407) & _MASK64
+            pair.append(lo + state % (_MERSENNE - lo))
+        coeffs.append(tuple(pair))
+    return coeffs
+
+
+def _integrate(f, a: float, b: float, steps: int = 100) -> float:
+    dx = (b - a) / steps
+    return sum(f(a + (i + 0.5) * dx) for i in range(steps)) * dx
+
+
+@functools.lru_cache(maxsize=None)
+def optimal_params(threshold: float, num_perm: int, fn_weight: float = FALSE_NEGATIVE_WEIGHT) -> tuple:
+    """(bands, rows) — threshold 기준 거짓 양성 면적·거짓 음성 면적 가중합이 가장 작은 조합"""
+    best, best_err = (num_perm, 1), float('inf')
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        if rows == 0:
+            break
+        fp = _integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+        fn = _integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+        err = (1 - fn_weight) * fp + fn_weight * fn
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class MinHasher:
+    """shingle 집합 → 서명 (길이 num_perm 정수 튜플)"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        self.num_perm = num_perm
+        self.coeffs = _permutations(num_perm, seed)
+        if np is not None:
+            self._a = np.array([a for a, _ in self.coeffs], dtype=np.uint64)
+            self._b = np.array([b for _, b in self.coeffs], dtype=np.uint64)
+
+    def signature(self, grams: set) -> tuple:
+        if not grams:
+            return (_MAX_HASH,) * self.num_perm
+        hashes = [zlib.crc32(g.encode('utf-8')) for g in grams]
+        if np is not None:
+            # uint64 곱셈은 2^64에서 감김 → 아래 파이썬 경로의 & _MASK64와 같은 값
+            hv = np.array(hashes, dtype=np.uint64)
+            with np.errstate(over='ignore'):
+                phv = (np.outer(self._a, hv) + self._b[:, None]) % np.uint64(_MERSENNE)
+            return tuple((phv & np.uint64(_MAX_HASH)).min(axis=1).tolist())
+        return tuple(min((((a * h) & _MASK64) + b & _MASK64) % _MERSENNE & _MAX_HASH for h in hashes)
+                     for a, b in self.coeffs)
+
+
+def estimate(sig_a: tuple, sig_b: tuple) -> float:
+    """서명 일치 비율 = 자카드 유사도 추정치"""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(x, x) != root:  # 경로 압축
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)  # 번호 작은(먼저 들어온) 문서가 대표
+
+
+class NearDuplicateIndex:
+    """add(섹션, 이름, 본문)로 쌓고 clusters()로 threshold 이상 군집
+
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add('overall', '비견_yongsin_장생', text)
+    for c in index.clusters(): c['section'], c['members'], c['min_similarity'], ...
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM,
+                 shingle_size: int = SHINGLE_SIZE, seed: int = SEED):
+        if not 0 < threshold <= 1:
+            raise ValueError(f'threshold는 0~1: {threshold}')
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = optimal_params(threshold, num_perm)
+        self.names = []        # 문서 번호 → 이름
+        self.sections = []
+        self.signatures = []
+        self._buckets = defaultdict(list)  # (섹션, band, band 서명) → 문서 번호
+        self.compared = 0      # 서명으로 비교한 후보 쌍 수 (통계)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _signature(self, text: str) -> tuple:
+        return self.hasher.signature(shingles(text, self.shingle_size))
+
+    def _band_keys(self, section: str, sig: tuple):
+        rows = self.rows
+        return [(section, band, sig[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def add(self, section: str, name: str, text: str):
+        self._insert(section, name, self._signature(text))
+
+    def _insert(self, section: str, name: str, sig: tuple):
+        doc = len(self.names)
+        self.names.append(name)
+        self.sections.append(section)
+        self.signatures.append(sig)
+        for band_key in self._band_keys(section, sig):
+            self._buckets[band_key].append(doc)
+
+    def add_unique(self, section: str, name: str, text: str):
+        """같은 섹션에 threshold 이상인 문서가 이미 있으면 그 이름 (추가 안 함), 없으면 추가하고 None
+
+        먼저 들어온 것을 남기는 중복 제거용 (generate_slots) — 후보 확인은 add 1번 비용
+        """
+        sig = self._signature(text)
+        sigs, seen = self.signatures, set()
+        for band_key in self._band_keys(section, sig):
+            for doc in self._buckets.get(band_key, ()):
+                if doc in seen:
+                    continue
+                seen.add(doc)
+                self.compared += 1
+                if estimate(sig, sigs[doc]) >= self.threshold:
+                    return self.names[doc]
+        self._insert(section, name, sig)
+        return None
+
+    def add_entry(self, section: str, key: str, value):
+        """iter_entries 항목 1개 — overall_slots 그룹은 파편마다 '그룹/slotN/번호' 이름으로"""
+        if isinstance(value, str):
+            self.add(section, key, value)
+        elif isinstance(value, dict):
+            for slot, fragments in value.items():
+                for i, text in enumerate(fragments):
+                    self.add(section, f'{key}/{slot}/{i}', text)
+
+    def pairs(self):
+        """threshold 이상인 (문서 a, 문서 b, 추정 유사도) — 쌍마다 1번"""
+        seen = set()
+        sigs, threshold = self.signatures, self.threshold
+        for docs in self._buckets.values():
+            if len(docs) < 2:
+                continue
+            if len(docs) > MAX_BUCKET_PAIRS:
+                candidates = ((docs[0], d) for d in docs[1:])
+            else:
+                candidates = ((a, b) for i, a in enumerate(docs) for b in docs[i + 1:])
+            for a, b in candidates:
+                if (a, b) in seen:
+                    continue
+                seen.add((a, b))
+                self.compared += 1
+                sim = estimate(sigs[a], sigs[b])
+                if sim >= threshold:
+                    yield a, b, sim
+
+    def clusters(self) -> list:
+        """군집 목록 (큰 것부터): {'section', 'members': [이름], 'size', 'min_similarity', 'max_similarity'}
+
+        min/max는 군집을 묶은 쌍들의 추정 유사도 (연쇄로 묶여 군집 안 모든 쌍이 threshold 이상은 아닐 수 있음)
+        """
+        uf = _UnionFind()
+        sims = defaultdict(list)
+        for a, b, sim in self.pairs():
+            uf.union(a, b)
+            sims[(a, b)] = sim
+        groups = defaultdict(list)
+        for doc in list(uf.parent):
+            groups[uf.find(doc)].append(doc)
+        for root in list(groups):
+            if root not in groups[root]:
+                groups[root].append(root)
+        edge_sims = defaultdict(list)
+        for (a, _), sim in sims.items():
+            edge_sims[uf.find(a)].append(sim)
+        result = []
+        for root, docs in groups.items():
+            docs.sort()
+            result.append({
+                'section': self.sections[root],
+                'members': [self.names[d] for d in docs],
+                'size': len(docs),
+                'min_similarity': min(edge_sims[root]),
+                'max_similarity': max(edge_sims[root]),
+            })
+        result.sort(key=lambda c: (-c['size'], c['section'], c['members'][0]))
+        return result
+
+
+def build_index(paths, sections=SECTIONS, threshold: float = DEFAULT_THRESHOLD, **kwargs) -> NearDuplicateIndex:
+    """생성 JSON 파일들의 섹션을 스트리밍으로 색인 (여러 파일이면 이름 앞에 '파일명:')"""
+    index = NearDuplicateIndex(threshold, **kwargs)
+    for path in paths:
+        prefix = f'{path}:' if len(paths) > 1 else ''
+        for section, key, value in iter_entries(path, sections):
+            index.add_entry(section, prefix + key, value)
+    return index
+
+
+def summarize(clusters: list) -> dict:
+    """섹션 → (군집 수, 군집에 든 문서 수)"""
+    summary = defaultdict(lambda: [0, 0])
+    for c in clusters:
+        summary[c['section']][0] += 1
+        summary[c['section']][1] += c['size']
+    return {s: tuple(v) for s, v in summary.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='내러티브 JSON의 거의 같은 본문 군집 (MinHash/LSH)')
+    parser.add_argument('paths', nargs='+', metavar='FILE', help='narratives_*.json (여러 개면 함께 색인)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'자카드 유사도 임계값 (기본 {DEFAULT_THRESHOLD})')
+    parser.add_argument('--sections', default=','.join(SECTIONS), help='쉼표로 구분한 섹션')
+    parser.add_argument('--num-perm', type=int, default=NUM_PERM, help=f'MinHash 해시 수 (기본 {NUM_PERM})')
+    parser.add_argument('--top', type=int, default=10, help='출력할 군집 수')
+    args = parser.parse_args(argv)
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    index = build_index(args.paths, args.sections.split(','), args.threshold, num_perm=args.num_perm)
+    clusters = index.clusters()
+    print(f'문서 {len(index)}개, LSH {index.bands} bands × {index.rows} rows, 임계 {args.threshold}')
+    summary = summarize(clusters)
+    for section in args.sections.split(','):
+        n, docs = summary.get(section, (0, 0))
+        print(f'  {section:15} 군집 {n}개 (문서 {docs}개)')
+    print(f'  후보 쌍 비교: {index.compared}회 (모든 쌍이면 {len(index) * (len(index) - 1) // 2}회)')
+    for c in clusters[:args.top]:
+        shown = ', '.join(c['members'][:5]) + (f' 외 {c["size"] - 5}개' if c['size'] > 5 else '')
+        print(f"\n  [{c['section']}] {c['size']}개, 유사도 {c['min_similarity']:.2f}~{c['max_similarity']:.2f}")
+        print(f'    {shown}')
+    return clusters
+
+
+if __name__ == '__main__':
+    main()
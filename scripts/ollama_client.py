@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Ollama /api/generate 클라이언트 (스트리밍 + 연결 풀 + 서킷 브레이커)
+
+"stream": False로 120초까지 전체 응답을 기다렸다가 금지어/길이 때문에 버리던 걸
+NDJSON 토큰 스트림으로 받으면서 중간에 끊음 → 재시도에 쓰던 GPU 시간 절약.
+
+- 금지 어구(forbidden)가 나오면 즉시 중단 (abort_reason='forbidden:<어구>')
+- 누적 길이가 max_chars를 넘으면 즉시 중단 (abort_reason='too_long')
+- 호출마다 time-to-first-token, tokens/sec 기록 → StreamStats로 집계
+
+연결 관리 (generate_narratives / v2 / sample_ai_narrative 공용):
+- 호스트별 keep-alive 연결 풀 — 프롬프트마다 TCP 연결을 새로 열지 않음
+  (조기 중단한 스트림은 응답이 남아 있어 재사용 불가 → 그 연결만 닫음)
+- backoff_delay(): 고정 3초 대신 지수 증가 + 지터
+- 호스트별 서킷 브레이커: 연속 실패 BREAKER_THRESHOLD회 → BREAKER_COOLDOWN초 동안
+  요청 없이 CircuitOpenError로 즉시 실패, 이후 1건만 시험 통과시켜 복구 확인
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+POOL_MAX_IDLE = 8          # 호스트당 유지할 유휴 연결 수
+BREAKER_THRESHOLD = 5      # 연속 실패 몇 번이면 차단할지
+BREAKER_COOLDOWN = 30.0    # 차단 유지 시간 (초)
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+class OllamaError(Exception):
+    """HTTP 오류 응답"""
+
+
+class CircuitOpenError(OllamaError):
+    """서킷 브레이커가 열려 있어 요청을 보내지 않음"""
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """지수 백오프 + 지터: [d/2, d] 구간 균등 분포 (d = base * 2^attempt, 상한 cap)"""
+    d = min(cap, base * (2 ** attempt))
+    return random.uniform(d / 2, d)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """요청 전 호출 — 열려 있으면 CircuitOpenError"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.cooldown - (time.time() - self.opened_at)
+            if remaining > 0 or self.trial_in_flight:
+                raise CircuitOpenError(f'서버 응답 없음 — 차단 중 ({max(remaining, 0):.0f}초 남음)')
+            self.trial_in_flight = True  # half-open: 1건만 시험
+
+    def is_open(self) -> bool:
+        """차단 중인지 (쿨다운이 끝나 시험 요청을 받을 수 있으면 False)"""
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            return self.trial_in_flight or time.time() - self.opened_at < self.cooldown
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    self.trips += 1
+                self.opened_at = time.time()
+
+
+class ConnectionPool:
+    """(host, port)별 keep-alive HTTPConnection 풀"""
+
+    def __init__(self, max_idle: int = POOL_MAX_IDLE):
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, scheme: str, netloc: str, timeout: float):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                self.reused += 1
+                return conn, True
+            self.created += 1
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return cls(netloc, timeout=timeout), False
+
+    def release(self, scheme: str, netloc: str, conn):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+
+_pool = ConnectionPool()
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    netloc = urlsplit(url).netloc
+    with _breakers_lock:
+        if netloc not in _breakers:
+            _breakers[netloc] = CircuitBreaker()
+        return _breakers[netloc]
+
+
+class _PooledResponse:
+    """풀 연결로 받은 응답. close(reusable)로 연결 반납/폐기"""
+
+    def __init__(self, url: str, payload: dict, timeout: float):
+        parts = urlsplit(url)
+        self._scheme, self._netloc = parts.scheme, parts.netloc
+        path = parts.path or '/'
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+
+        conn, reused = _pool.acquire(self._scheme, self._netloc, timeout)
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+            # 서버가 닫아버린 유휴 연결 → 새 연결로 1회 재전송
+            conn, _ = _pool.acquire(self._scheme, self._netloc, timeout)
+            try:
+                conn.request('POST', path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+        self.conn = conn
+        self.resp = resp
+        if resp.status != 200:
+            detail = resp.read()[:200].decode('utf-8', 'replace')
+            self.close(reusable=not resp.will_close)
+            raise OllamaError(f'HTTP {resp.status}: {detail}')
+
+    def close(self, reusable: bool):
+        if reusable and not self.resp.will_close and self.resp.isclosed():
+            _pool.release(self._scheme, self._netloc, self.conn)
+        else:
+            self.conn.close()
+
+
+def generate(url: str, model: str, prompt: str, options: dict = None,
+             system: str = None, timeout: float = 120) -> str:
+    """비스트리밍 생성 1회 → response 문자열"""
+    breaker = get_breaker(url)
+    breaker.before_request()
+    payload = {'model': model, 'prompt': prompt, 'stream': False, 'options': options or {}}
+    if system:
+        payload['system'] = system
+    try:
+        r = _PooledResponse(url, payload, timeout)
+        result = json.loads(r.resp.read().decode('utf-8'))
+        r.close(reusable=True)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result.get('response', '').strip()
+
+
+def pool_summary() -> str:
+    return f"HTTP 연결: 신규 {_pool.created}개 / 재사용 {_pool.reused}회, 브레이커 차단 {sum(b.trips for b in _breakers.values())}회"
+
+
+def generate_stream(url: str, model: str, prompt: str, options: dict = None,
+                    system: str = None, timeout: float = 120,
+                    forbidden=(), max_chars: int = None) -> dict:
+    """스트리밍 생성 1회. 반환 dict:
+      text, aborted, abort_reason, ttft_s, elapsed_s, tokens, tokens_per_sec
+    네트워크/HTTP 오류는 그대로 raise (재시도는 호출 측 책임, backoff_delay 사용).
+    서킷 브레이커가 열려 있으면 요청 없이 CircuitOpenError.
+    """
+    breaker = get_breaker(url)
+    breaker.before_request()
+    payload = {'model': model, 'prompt': prompt, 'stream': True, 'options': options or {}}
+    if system:
+        payload['system'] = system
+
+    start = time.time()
+    first_token_at = None
+    pieces = []
+    text_len = 0
+    tokens = 0
+    eval_count = None
+    aborted = False
+    abort_reason = ''
+    forbidden = tuple(forbidden)
+    keep = max((len(f) for f in forbidden), default=1) - 1  # 다음 조각과 이어 볼 꼬리 글자 수
+    tail = ''
+
+    try:
+        r = _PooledResponse(url, payload, timeout)
+    except Exception:
+        breaker.record_failure()
+        raise
+    try:
+        for raw in r.resp:
+            raw = raw.strip()
+            if not raw:
+                continue
+            chunk = json.loads(raw.decode('utf-8'))
+            piece = chunk.get('response', '')
+            if piece:
+                if first_token_at is None:
+                    first_token_at = time.time()
+                tokens += 1
+                pieces.append(piece)
+                text_len += len(piece)
+
+                # 금지어는 토큰 경계에 걸칠 수 있음 → 직전 (가장 긴 금지어 - 1)글자 + 이번 조각만 검사
+                # (토큰 수가 아니라 글자 수 — 한국어는 1글자 토큰으로 오는 경우가 많음)
+                if forbidden:
+                    window = tail + piece
+                    hit = next((f for f in forbidden if f in window), None)
+                    if hit:
+                        aborted, abort_reason = True, f'forbidden:{hit}'
+                        break
+                    tail = window[-keep:] if keep else ''
+                if max_chars and text_len > max_chars:
+                    aborted, abort_reason = True, 'too_long'
+                    break
+
+            if chunk.get('done'):
+                eval_count = chunk.get('eval_count')
+                break
+    except Exception:
+        r.close(reusable=False)
+        breaker.record_failure()
+        raise
+    if not aborted:
+        r.resp.read()  # chunked 종료 마커까지 소비해야 연결 재사용 가능
+    r.close(reusable=not aborted)
+    breaker.record_success()
+
+    end = time.time()
+    if eval_count:
+        tokens = eval_count
+    gen_time = end - first_token_at if first_token_at else 0.0
+    return {
+        'text': ''.join(pieces).strip(),
+        'aborted': aborted,
+        'abort_reason': abort_reason,
+        'ttft_s': (first_token_at - start) if first_token_at else None,
+        'elapsed_s': end - start,
+        'tokens': tokens,
+        'tokens_per_sec': tokens / gen_time if gen_time > 0 else 0.0,
+    }
+
+
+class StreamStats:
+    """호출별 스트리밍 지표 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def record(self, result: dict):
+        with self._lock:
+            self.calls.append({k: result[k] for k in
+                               ('aborted', 'abort_reason', 'ttft_s', 'elapsed_s', 'tokens', 'tokens_per_sec')})
+
+    def summary(self) -> str:
+        with self._lock:
+            calls = list(self.calls)
+        if not calls:
+            return 'Ollama 스트리밍: 호출 없음'
+        ttfts = sorted(c['ttft_s'] for c in calls if c['ttft_s'] is not None)
+        # 호출별 비율 평균은 짧은 응답에 휘둘려서 전체 토큰 / 전체 생성 시간으로 계산
+        gen = [(c['tokens'], c['elapsed_s'] - c['ttft_s']) for c in calls if c['ttft_s'] is not None]
+        gen_time = sum(t for _, t in gen)
+        aborted = [c for c in calls if c['aborted']]
+        forbidden = sum(1 for c in aborted if c['abort_reason'].startswith('forbidden'))
+        saved = sum(c['elapsed_s'] for c in aborted)
+        ttft_p50 = ttfts[len(ttfts) // 2] if ttfts else 0.0
+        avg_tps = sum(n for n, _ in gen) / gen_time if gen_time > 0 else 0.0
+        return (f"Ollama 스트리밍: {len(calls)}회, TTFT p50 {ttft_p50:.2f}초, "
+                f"평균 {avg_tps:.1f} tok/s, 조기 중단 {len(aborted)}회 "
+                f"(금지어 {forbidden} / 길이 {len(aborted) - forbidden}, 중단까지 {saved:.1f}초)")
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""콘텐츠 파이프라인 러너 (단계 DAG + 입력 해시 스킵 + 내용 주소 캐시)
+
+기존: 스크립트 5개를 손으로 순서대로 실행
+  generate_narratives → postprocess_v1 → generate_buckets → generate_slots → validate_narratives
+  (generate_buckets는 자기 입력 파일을 덮어써서, 순서를 틀리거나 두 번 돌리면 결과가 꼬임)
+
+러너:
+- 단계마다 입력(데이터 + 그 단계가 쓰는 코드/규칙 파일)과 출력을 선언 → 출력→입력 연결로 DAG 구성
+- 단계 키 = sha256(단계 이름, 입력 파일 내용 해시들). 마지막 실행과 키가 같고 출력도 그대로면 건너뜀
+- 출력은 .cache/pipeline/objects/<sha256> 에 내용 주소로 보관
+  → 예전에 본 입력 조합(규칙을 고쳤다 되돌린 경우 등)은 실행 없이 캐시에서 복원
+- bucket 1~6은 파일로 안 펼침 (generate_buckets.BucketSource가 on-demand 생성)
+  → postprocess 결과가 곧 v1plus. 평탄 파일이 필요할 때만 buckets 단계(수동)로
+    .cache/pipeline/work/ 에 내보냄 — 자기 입력을 덮어쓰는 단계 없음
+- 파일 해시는 (크기, mtime) 기준으로 기억 → 아무것도 안 바뀐 재빌드는 파일 stat만 하고 끝 (1초 미만)
+
+사용법:
+  python scripts/pipeline.py                  # 바뀐 단계만 실행 (generate는 수동 단계라 제외)
+  python scripts/pipeline.py slots            # slots와 그 선행 단계만
+  python scripts/pipeline.py generate         # LLM 생성까지 (수동 단계는 이름을 지정해야 실행)
+  python scripts/pipeline.py buckets          # bucket 0~6 평탄 파일 내보내기 (수동 단계)
+  python scripts/pipeline.py slots_compact    # slots 압축 형식 + 크기/파싱 시간 비교 (수동 단계)
+  python scripts/pipeline.py --force slots    # 해당 단계 강제 재실행 (뒤 단계는 입력이 바뀌면 따라 실행)
+  python scripts/pipeline.py --dry-run        # 실행할 단계만 표시
+  python scripts/pipeline.py --list           # 단계/입출력 목록
+  python scripts/pipeline.py --gc             # 최근 실행에서 안 쓰는 캐시 객체 삭제
+"""
+import argparse
+import ast
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pipeline')
+OBJECTS_DIR = os.path.join(CACHE_DIR, 'objects')
+LOG_DIR = os.path.join(CACHE_DIR, 'logs')
+STATE_PATH = os.path.join(CACHE_DIR, 'state.json')
+STATE_VERSION = 1
+RUNS_PER_STAGE = 5  # 단계별로 캐시에 남겨 둘 실행 수 (--gc 기준)
+
+GENERATED = 'src/data/generated'
+WORK = 'scripts/.cache/pipeline/work'
+
+
+class PipelineError(RuntimeError):
+    """단계 실패 / DAG 구성 오류"""
+
+
+class Stage:
+    """파이프라인 단계 1개. inputs/outputs는 저장소 루트 기준 경로
+
+    run(inputs, outputs, options): 절대 경로 목록을 받아 실행, 실패하면 PipelineError
+    manual: 이름을 직접 지정했을 때만 실행 (LLM 생성처럼 비싼 단계)
+    """
+
+    def __init__(self, name: str, run, inputs, outputs, manual: bool = False, description: str = ''):
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.manual = manual
+        self.description = description
+
+
+# === 단계 실행 함수 (모듈 import는 실행할 때만 — 아무것도 안 바뀐 재빌드는 import 비용도 없음) ===
+
+def _run_generate(inputs, outputs, options):
+    import generate_narratives
+    generate_narratives.OUTPUT_DIR = os.path.dirname(outputs[0])
+    generate_narratives.main([])
+
+
+def _run_postprocess(inputs, outputs, options):
+    import postprocess_v1
+    postprocess_v1.INPUT, postprocess_v1.OUTPUT = inputs[0], outputs[0]
+    try:
+        postprocess_v1.main(['--workers', str(options.workers)])
+    except SystemExit as e:
+        if e.code:
+            raise PipelineError(f'후처리 실패 (종료 코드 {e.code})') from None
+
+
+def _run_buckets(inputs, outputs, options):
+    import generate_buckets
+    generate_buckets.INPUT = generate_buckets.OUTPUT = inputs[0]
+    generate_buckets.main(['--export', outputs[0]])
+
+
+def _run_slots(inputs, outputs, options):
+    import generate_slots
+    generate_slots.INPUT, generate_slots.OUTPUT = inputs[0], outputs[0]
+    generate_slots.main()
+
+
+def _run_slots_compact(inputs, outputs, options):
+    import slots_compact
+    slots_compact.main([inputs[0], '-o', outputs[0]])
+
+
+def _run_validate(inputs, outputs, options):
+    import validate_narratives
+    validate_narratives.INPUT = inputs[0]
+    try:
+        validate_narratives.main()
+    except SystemExit as e:
+        if e.code:
+            raise PipelineError(f'검증 실패 (종료 코드 {e.code})') from None
+
+
+# 코드 입력: 단계 결과에 영향을 주는 스크립트/규칙 파일 — 고치면 그 단계부터 다시 실행
+# 스크립트는 import를 따라가 scripts/ 안 모듈을 전부 모음 (손으로 적으면 빠뜨리기 쉬움 → 고쳐도 "건너뜀")
+def _code(script: str, *extra) -> list:
+    """scripts/<script> + 그 스크립트가 (함수 안 import 포함) 직간접으로 import하는 scripts/ 모듈 + extra"""
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    found, todo = [], [script]
+    while todo:
+        name = todo.pop(0)
+        if name in found:
+            continue
+        found.append(name)
+        with open(os.path.join(scripts_dir, name), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                modules = [node.module]
+            else:
+                continue
+            todo.extend(f'{m}.py' for m in modules if os.path.isfile(os.path.join(scripts_dir, f'{m}.py')))
+    return [f'scripts/{name}' for name in found] + list(extra)
+
+
+_REWRITE_RULES = 'scripts/rules/rewrite_rules.json'
+
+STAGES = [
+    Stage('generate', _run_generate,
+          inputs=_code('generate_narratives.py'),
+          outputs=[f'{GENERATED}/narratives_generated.json'],
+          manual=True, description='LLM 통문장 생성 (Ollama)'),
+    Stage('postprocess', _run_postprocess,
+          inputs=[f'{GENERATED}/narratives_generated.json'] + _code('postprocess_v1.py', _REWRITE_RULES),
+          outputs=[f'{GENERATED}/narratives_generated_v1plus.json'],
+          description='클리셰 치환 / 첫 문장 / 조사 후처리'),
+    Stage('buckets', _run_buckets,
+          inputs=[f'{GENERATED}/narratives_generated_v1plus.json'] + _code('generate_buckets.py', _REWRITE_RULES),
+          outputs=[f'{WORK}/narratives_v1plus_buckets.json'],
+          manual=True, description='bucket 0~6 평탄 파일 내보내기 (평소엔 BucketSource로 on-demand)'),
+    Stage('slots', _run_slots,
+          inputs=[f'{GENERATED}/narratives_generated_v1plus.json'] + _code('generate_slots.py'),
+          outputs=[f'{GENERATED}/narratives_slots_v1.json'],
+          description='4슬롯 셔플 풀'),
+    Stage('slots_compact', _run_slots_compact,
+          inputs=[f'{GENERATED}/narratives_slots_v1.json'] + _code('slots_compact.py'),
+          outputs=[f'{GENERATED}/narratives_slots_v1_compact.json'],
+          manual=True, description='slots 압축 형식 + 크기/파싱 시간 비교 (앱은 아직 안 씀)'),
+    Stage('validate', _run_validate,
+          inputs=[f'{GENERATED}/narratives_generated_v1plus.json'] + _code('validate_narratives.py'),
+          outputs=[],
+          description='금지어/문법/다양성/거의 같은 본문 검증'),
+]
+
+
+# === DAG ===
+
+def build_graph(stages) -> dict:
+    """{단계: [선행 단계]} — 어떤 단계의 출력이 다른 단계의 입력이면 간선"""
+    producer = {}
+    for stage in stages:
+        for path in stage.outputs:
+            if path in producer:
+                raise PipelineError(f'{path}: {producer[path]} / {stage.name} 둘 다 출력')
+            producer[path] = stage.name
+    return {s.name: sorted({producer[p] for p in s.inputs if p in producer} - {s.name}) for s in stages}
+
+
+def plan(stages, targets) -> list:
+    """targets와 그 선행 단계를 선언 순서와 어긋나지 않는 위상 순서로 (순환이면 오류)
+
+    수동 단계는 targets에 직접 있을 때만 포함 — 아니면 그 출력은 원천 데이터로 취급
+    """
+    by_name = {s.name: s for s in stages}
+    graph = build_graph(stages)
+    order, state = [], {}
+
+    def visit(name, explicit):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise PipelineError(f'단계 순환: {name}')
+        if by_name[name].manual and not explicit:
+            return
+        state[name] = 'visiting'
+        for dep in graph[name]:
+            visit(dep, dep in targets)
+        state[name] = 'done'
+        order.append(by_name[name])
+
+    for name in targets:
+        if name not in by_name:
+            raise PipelineError(f'알 수 없는 단계: {name} (가능: {", ".join(by_name)})')
+        visit(name, True)
+    return order
+
+
+# === 내용 주소 캐시 ===
+
+class ArtifactCache:
+    """파일 해시 (stat 기억) + objects/<sha256> 보관 + 단계 실행 기록"""
+
+    def __init__(self, path: str = STATE_PATH):
+        self.path = path
+        self.files = {}    # 상대 경로 → [크기, mtime_ns, sha256]
+        self.stages = {}   # 단계 → {'key': 키, 'outputs': {경로: sha256}}
+        self.runs = {}     # 단계 → [{'key': 키, 'outputs': {...}}] 최근 순
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('version') == STATE_VERSION:
+                    self.files = state['files']
+                    self.stages = state['stages']
+                    self.runs = state['runs']
+            except (OSError, ValueError, KeyError):
+                pass  # 깨진 상태 파일 → 처음부터 (캐시는 최적화일 뿐)
+
+    def digest(self, rel: str):
+        """파일 sha256 (없으면 None). 크기/mtime이 기억과 같으면 다시 읽지 않음"""
+        path = os.path.join(ROOT, rel)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        known = self.files.get(rel)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        self.files[rel] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def stage_key(self, stage: Stage) -> str:
+        h = hashlib.sha256(stage.name.encode('utf-8'))
+        for rel in stage.inputs:
+            digest = self.digest(rel)
+            if digest is None:
+                raise PipelineError(f'{stage.name}: 입력 파일 없음 {rel}')
+            h.update(f'\x00{rel}\x00{digest}'.encode('utf-8'))
+        return h.hexdigest()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(OBJECTS_DIR, digest[:2], digest)
+
+    def outputs_current(self, stage: Stage, key: str) -> bool:
+        record = self.stages.get(stage.name)
+        if not record or record['key'] != key:
+            return False
+        return all(self.digest(rel) == digest for rel, digest in record['outputs'].items())
+
+    def cached_run(self, stage: Stage, key: str):
+        """같은 키로 예전에 실행한 결과가 objects에 다 남아 있으면 그 기록"""
+        for run in self.runs.get(stage.name, []):
+            if run['key'] == key and all(os.path.exists(self._object_path(d)) for d in run['outputs'].values()):
+                return run
+        return None
+
+    def restore(self, stage: Stage, run: dict):
+        for rel, digest in run['outputs'].items():
+            dst = os.path.join(ROOT, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copyfile(self._object_path(digest), dst + '.tmp')
+            os.replace(dst + '.tmp', dst)
+        self._record(stage, run['key'], run['outputs'])
+
+    def store(self, stage: Stage, key: str):
+        """실행 직후 출력 파일들을 objects에 넣고 기록"""
+        outputs = {}
+        for rel in stage.outputs:
+            digest = self.digest(rel)
+            if digest is None:
+                raise PipelineError(f'{stage.name}: 출력 파일이 안 만들어짐 {rel}')
+            obj = self._object_path(digest)
+            if not os.path.exists(obj):
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                shutil.copyfile(os.path.join(ROOT, rel), obj + '.tmp')
+                os.replace(obj + '.tmp', obj)
+            outputs[rel] = digest
+        self._record(stage, key, outputs)
+
+    def _record(self, stage: Stage, key: str, outputs: dict):
+        self.stages[stage.name] = {'key': key, 'outputs': outputs}
+        runs = [r for r in self.runs.get(stage.name, []) if r['key'] != key]
+        self.runs[stage.name] = ([{'key': key, 'outputs': outputs}] + runs)[:RUNS_PER_STAGE]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATE_VERSION, 'files': self.files, 'stages': self.stages, 'runs': self.runs},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def gc(self) -> tuple:
+        """실행 기록에 없는 objects 삭제 → (삭제 수, 바이트)"""
+        live = {d for runs in self.runs.values() for r in runs for d in r['outputs'].values()}
+        removed = freed = 0
+        if not os.path.isdir(OBJECTS_DIR):
+            return removed, freed
+        for sub in os.listdir(OBJECTS_DIR):
+            for name in os.listdir(os.path.join(OBJECTS_DIR, sub)):
+                if name not in live:
+                    path = os.path.join(OBJECTS_DIR, sub, name)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+        return removed, freed
+
+
+# === 실행 ===
+
+def run_stage(stage: Stage, options):
+    inputs = [os.path.join(ROOT, p) for p in stage.inputs]
+    outputs = [os.path.join(ROOT, p) for p in stage.outputs]
+    for path in outputs:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not options.quiet:
+        stage.run(inputs, outputs, options)
+        return
+    # --quiet: 단계 출력은 로그 파일로 (실패하면 경로 안내)
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f'{stage.name}.log')
+    with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        try:
+            stage.run(inputs, outputs, options)
+        except Exception as e:
+            raise PipelineError(f'{stage.name} 실패 — 로그: {log_path}') from e
+
+
+def run(stages, options, cache: ArtifactCache) -> list:
+    """계획된 단계 실행 → [(단계, 결과, 초)]  결과: 실행 / 캐시 복원 / 건너뜀 / 실행 예정"""
+    report = []
+    pending = set()  # --dry-run: 실행 예정 단계의 출력 (뒤 단계 입력이 바뀔 예정)
+    for stage in stages:
+        start = time.perf_counter()
+        if pending.intersection(stage.inputs):
+            pending.update(stage.outputs)
+            report.append((stage.name, '실행 예정', 0.0))
+            continue
+        key = cache.stage_key(stage)
+        if stage.name not in options.force and cache.outputs_current(stage, key):
+            status = '건너뜀'
+        elif stage.name not in options.force and cache.cached_run(stage, key):
+            status = '캐시 복원'
+            if not options.dry_run:
+                cache.restore(stage, cache.cached_run(stage, key))
+        elif options.dry_run:
+            status = '실행 예정'
+            pending.update(stage.outputs)
+        else:
+            print(f"\n▶ {stage.name}: {stage.description}")
+            try:
+                run_stage(stage, options)
+            finally:
+                cache.save()  # 실패해도 그때까지 계산한 파일 해시는 보존
+            cache.store(stage, key)
+            status = '실행'
+        if not options.dry_run:
+            cache.save()
+        report.append((stage.name, status, time.perf_counter() - start))
+    return report
+
+
+def print_report(report, wall: float):
+    print(f"\n=== 파이프라인 (벽시계 {wall:.3f}초) ===")
+    for name, status, seconds in report:
+        print(f"  {name:<12} {status:<8} {seconds:>9.3f}초")
+
+
+def print_stages(stages):
+    graph = build_graph(stages)
+    for s in stages:
+        deps = ', '.join(graph[s.name]) or '-'
+        print(f"{s.name}{' (수동)' if s.manual else ''}: {s.description}  ← {deps}")
+        for p in s.inputs:
+            print(f"    in  {p}")
+        for p in s.outputs:
+            print(f"    out {p}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='콘텐츠 파이프라인 (바뀐 단계만 실행)')
+    parser.add_argument('targets', nargs='*', help='실행할 단계 (기본: 수동 단계 제외 전부)')
+    parser.add_argument('--force', action='append', default=[], metavar='STAGE',
+                        help='입력이 같아도 다시 실행할 단계 (여러 번 지정 가능)')
+    parser.add_argument('--dry-run', action='store_true', help='실행하지 않고 계획만 표시')
+    parser.add_argument('--quiet', action='store_true', help='단계 출력은 .cache/pipeline/logs/ 로')
+    parser.add_argument('--workers', type=int, default=1, help='postprocess 프로세스 수 (0=CPU 코어 수)')
+    parser.add_argument('--list', action='store_true', help='단계/입출력 목록')
+    parser.add_argument('--gc', action='store_true', help='최근 실행 기록에 없는 캐시 객체 삭제')
+    options = parser.parse_args(argv)
+
+    if options.list:
+        print_stages(STAGES)
+        return
+    cache = ArtifactCache()
+    if options.gc:
+        removed, freed = cache.gc()
+        print(f"캐시 객체 {removed}개 삭제 ({freed / 1024 / 1024:.1f} MB)")
+        return
+
+    targets = options.targets or [s.name for s in STAGES if not s.manual]
+    start = time.perf_counter()
+    try:
+        stages = plan(STAGES, targets + options.force)
+        report = run(stages, options, cache)
+    except PipelineError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print_report(report, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""증분 재생성 매니페스트 (키별 입력 해시)
+
+TEN_GOD_DESC / STAGE_DESC / 구조 템플릿 한 줄만 고쳐도 전체를 다시 돌리거나
+JSON에서 키를 손으로 지워야 했던 문제 해결.
+
+- 키마다 "그 값을 만든 프롬프트(+구조)"의 sha256을 기록
+- 다음 실행 때 같은 키의 현재 프롬프트 해시와 비교 → 달라진 키만 재생성
+- 어떤 키가 왜 다시 만들어지는지 stale_report()로 출력
+
+파일: <output>.manifest.json  {"version": 1, "sections": {섹션: {키: 해시}}}
+크래시 대비: 실행 중에는 저널 줄의 "h" 필드에 해시가 같이 기록되고,
+  재시작 시 CheckpointJournal.hashes로 복원됨. save()는 compact() 직전에 호출.
+매니페스트 파일이 아예 없으면(도입 전 결과) 기존 값은 현재 프롬프트로 만든 것으로 간주(adopt).
+"""
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def fingerprint(*parts) -> str:
+    """입력 조각들(프롬프트, 구조 키 등) → sha256 앞 16자리"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode('utf-8'))
+        h.update(b'\x00')  # 조각 경계 (('ab','c') != ('a','bc'))
+    return h.hexdigest()[:16]
+
+
+class RegenManifest:
+    def __init__(self, output_path: str, sections):
+        self.path = os.path.splitext(output_path)[0] + '.manifest.json'
+        self.sections = {s: {} for s in sections}
+        self.existed = False
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                for s, entries in data.get('sections', {}).items():
+                    if s in self.sections:
+                        self.sections[s].update(entries)
+                self.existed = True
+        return self
+
+    def merge(self, hashes: dict):
+        """저널에서 복원한 {섹션: {키: 해시}} 반영"""
+        for s, entries in hashes.items():
+            if s in self.sections:
+                self.sections[s].update(entries)
+
+    def get(self, section: str, key: str):
+        return self.sections[section].get(key)
+
+    def record(self, section: str, key: str, input_hash: str):
+        self.sections[section][key] = input_hash
+
+    def forget(self, section: str, key: str):
+        self.sections[section].pop(key, None)
+
+    def save(self):
+        """임시 파일 기록 후 os.replace (원자적 교체)"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'sections': self.sections},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def stale_report(section: str, stale: dict, limit: int = 30) -> str:
+    """{키: 사유} → 사유별 개수 + 키 목록 (limit개까지)"""
+    if not stale:
+        return f"  [{section}] 재생성 대상 없음"
+    by_reason = {}
+    for key, reason in stale.items():
+        by_reason.setdefault(reason, []).append(key)
+    lines = [f"  [{section}] 재생성 대상 {len(stale)}개"]
+    for reason, keys in by_reason.items():
+        shown = ', '.join(keys[:limit])
+        more = f" 외 {len(keys) - limit}개" if len(keys) > limit else ''
+        lines.append(f"    {reason} {len(keys)}개: {shown}{more}")
+    return '\n'.join(lines)
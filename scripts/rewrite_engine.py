@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""정규식 치환 규칙 엔진 (postprocess_v1 공용)
+
+기존 방식: 규칙마다 re.subn으로 본문 전체를 훑음 → 텍스트 1개당 수십~백 번 스캔.
+대부분의 규칙은 그 텍스트에서 한 번도 안 걸리는데도 매번 전체를 다시 읽음.
+
+엔진 방식 (RuleSet 1개 = 순서가 있는 규칙 묶음):
+1. 규칙은 모듈 로드 시 1회 컴파일 (Rule)
+2. 규칙마다 모든 매치가 만족해야 하는 필수 리터럴 조건(required_literals)을 정규식
+   파싱 결과에서 자동 추출 — AND of OR:
+     r'(\\S+)는?\\s*게\\s*좋을\\s*것\\s*같아요' → '같아요' AND '좋을' AND '게' AND '것'
+     r'[^.]*(한 줄 적어두|메모장에|떠오르는[^.]*적어)…' → '한 줄 적어두' OR '메모장에' OR '떠오르는'
+3. 텍스트별 후보 인덱스: 첫 조건의 리터럴 → 규칙 목록. 서로 다른 리터럴만 str in
+   (C 수준 검색)으로 훑고, 걸린 규칙만 나머지 조건 확인 후 원래 순서대로 실제 치환
+   (조건을 못 뽑은 규칙만 항상 실행)
+4. 치환으로 텍스트가 바뀌면 건너뛰었던 뒤 규칙의 조건을 다시 검사
+   → 앞 규칙의 출력이 뒤 규칙에 걸리는 연쇄 치환도 기존과 동일
+
+후보 선택은 기존과 같음: candidates[(seed + 매치 번호) % len]
+  seed = 키 해시 + 규칙별 seed_offset, 매치 번호는 규칙별 또는 묶음 공용(shared_counter).
+→ 규칙을 하나씩 순서대로 re.subn 하던 결과와 바이트 단위로 동일.
+
+참고: 규칙 정규식을 통째로 교대(alternation) 하나로 합쳐 1회 스캔하는 방식도 재봤지만
+Python re는 위치마다 모든 분기를 시도해서 개별 스캔보다 ~10배 느림
+(앵커를 lookahead 교대로 묶은 스캐너도 str in 반복보다 느렸음).
+"""
+import re
+import time
+
+# required_literals 분석 방식이 바뀌면 올림 → rule_tables 컴파일 캐시 무효화
+ENGINE_VERSION = 3
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+    from re._constants import (ASSERT, ASSERT_NOT, AT, BRANCH, LITERAL, MAX_REPEAT,
+                               MIN_REPEAT, SUBPATTERN)
+except ImportError:  # Python 3.10 이하
+    import sre_parse
+    from sre_constants import (ASSERT, ASSERT_NOT, AT, BRANCH, LITERAL, MAX_REPEAT,
+                               MIN_REPEAT, SUBPATTERN)
+
+
+def _requirements(seq) -> list:
+    """파싱된 정규식 시퀀스 → 필수 리터럴 집합 목록 [(a, b, ...), ...]
+
+    집합(튜플) 하나 = "이 중 하나는 반드시 들어감" (OR), 목록 전체 = 모두 만족 (AND).
+    연속 리터럴 조각은 원소 1개짜리 집합, 선택(BRANCH)은 분기마다 대표 리터럴 1개씩 모은 집합.
+    """
+    groups = []
+    current = []
+
+    def flush():
+        if current:
+            groups.append((''.join(current),))
+            current.clear()
+
+    for op, av in seq:
+        if op is LITERAL:
+            current.append(chr(av))
+        elif op in (AT, ASSERT, ASSERT_NOT):
+            continue  # 폭 0 — 앞뒤 리터럴은 여전히 붙어 있음
+        elif op is SUBPATTERN:
+            flush()
+            if not av[1] & re.IGNORECASE:  # (?i:...) 안은 대소문자 무시 → 조건 없음
+                groups.extend(_requirements(av[-1]))
+        elif op in (MAX_REPEAT, MIN_REPEAT) and av[0] >= 1:
+            flush()
+            groups.extend(_requirements(av[2]))
+        elif op is BRANCH:
+            flush()
+            alternatives = []
+            for alt in av[1]:
+                singles = [g[0] for g in _requirements(alt) if len(g) == 1]
+                if not singles:
+                    alternatives = None  # 리터럴 없는 분기가 하나라도 있으면 조건 없음
+                    break
+                alternatives.append(max(singles, key=len))
+            if alternatives:
+                groups.append(tuple(dict.fromkeys(alternatives)))
+        else:
+            flush()  # 문자 클래스 / 0회 가능 반복 등
+    flush()
+    return groups
+
+
+def required_literals(pattern: str, flags: int = 0) -> tuple:
+    """모든 매치가 만족해야 하는 리터럴 조건 (AND of OR) — 선택도 높은(긴) 조건부터.
+    조건 하나라도 텍스트에 없으면 그 규칙은 절대 안 걸림. 조건이 없으면 ()"""
+    parsed = sre_parse.parse(pattern, flags)
+    if parsed.state.flags & re.IGNORECASE:  # flags 인자 또는 패턴 앞 (?i)
+        return ()
+    groups = dict.fromkeys(_requirements(parsed))
+    return tuple(sorted(groups, key=lambda g: (-min(map(len, g)), len(g))))
+
+
+def leading_literal(pattern: str, flags: int = 0) -> str:
+    """모든 매치가 이 문자열로 시작함 (앞쪽 폭 0 단언은 건너뜀). 없으면 ''
+      r'(?<![\\w])특히(?=\\s)' → '특히',  r'기운이 (\\S+)' → '기운이 ',  r'(\\S+)는' → ''"""
+    parsed = sre_parse.parse(pattern, flags)
+    if parsed.state.flags & re.IGNORECASE:
+        return ''
+    chars = []
+    for op, av in parsed:
+        if op is LITERAL:
+            chars.append(chr(av))
+        elif op in (AT, ASSERT, ASSERT_NOT) and not chars:
+            continue
+        else:
+            break
+    return ''.join(chars)
+
+
+def _matches_all(requires, text: str) -> bool:
+    for group in requires:
+        for lit in group:
+            if lit in text:
+                break
+        else:
+            return False
+    return True
+
+
+class Rule:
+    """치환 규칙 1개.
+
+    candidates: 후보 목록 — (seed + 매치 번호) % len 으로 선택
+    repl:       고정 치환 문자열 (re 템플릿, \\1 등 그대로 지원) — candidates 대신
+    group_repl: 선택된 후보의 '\\1'을 매치 그룹 1로 바꿈 (diversify_closings 방식)
+    count:      최대 치환 횟수 (0 = 전부)
+    seed_offset: 키 해시에 더할 값
+    """
+
+    def __init__(self, pattern: str, candidates=None, repl: str = None, flags: int = 0,
+                 count: int = 0, seed_offset: int = 0, group_repl: bool = False, requires=None):
+        if (candidates is None) == (repl is None):
+            raise ValueError(f'candidates/repl 중 하나만 지정: {pattern}')
+        self.pattern = pattern
+        self.flags = flags
+        self._regex = None
+        self.candidates = list(candidates) if candidates is not None else None
+        self.repl = repl
+        self.count = count
+        self.seed_offset = seed_offset
+        self.group_repl = group_repl
+        # requires: 규칙 테이블 컴파일 캐시(rule_tables)에 저장된 분석 결과가 있으면 그대로 사용
+        self.requires = tuple(map(tuple, requires)) if requires is not None else required_literals(pattern, flags)
+
+    @property
+    def regex(self):
+        """첫 실행 때 컴파일 — 사전 필터에 한 번도 안 걸리는 규칙은 컴파일 비용도 없음"""
+        if self._regex is None:
+            self._regex = re.compile(self.pattern, self.flags)
+        return self._regex
+
+    def apply(self, text: str, base_hash: int, counter: list):
+        """re.subn 1회 → (새 텍스트, 치환 수). counter[0]은 매치마다 1 증가"""
+        if self.repl is not None:
+            return self.regex.subn(self.repl, text, count=self.count)
+
+        candidates = self.candidates
+        seed = base_hash + self.seed_offset
+        group_repl = self.group_repl
+
+        def picker(m):
+            idx = counter[0]
+            counter[0] += 1
+            chosen = candidates[(seed + idx) % len(candidates)]
+            if group_repl and '\\1' in chosen:
+                grp = m.group(1) if m.lastindex else ''
+                return chosen.replace('\\1', grp)
+            return chosen
+
+        return self.regex.subn(picker, text, count=self.count)
+
+
+class RuleSet:
+    """순서가 있는 규칙 묶음. apply()는 순차 re.subn과 같은 결과를 리터럴 사전 필터로 빠르게
+
+    텍스트별 후보 인덱스: 규칙마다 가장 선택도 높은 조건(requires[0])의 리터럴 → 규칙 번호 목록.
+    텍스트 1개에 대해 서로 다른 리터럴만 1번씩 str in 검사 → 걸린 규칙만 나머지 조건 확인.
+    """
+
+    def __init__(self, rules, shared_counter: bool = False):
+        self.rules = list(rules)
+        self.shared_counter = shared_counter
+        self._always = []   # 조건 없는 규칙 (항상 실행)
+        self._index = {}    # 리터럴 → [(규칙 번호, 나머지 조건)]
+        for i, rule in enumerate(self.rules):
+            if not rule.requires:
+                self._always.append(i)
+                continue
+            first, rest = rule.requires[0], rule.requires[1:]
+            for lit in first:
+                self._index.setdefault(lit, []).append((i, rest))
+        # 통계 (prefilter_summary)
+        self.texts = 0
+        self.executed = 0
+        self.revived = 0
+        # 규칙별 프로파일 (enable_profile 후에만): [실행, 매치, 바뀐 텍스트, 초]
+        self.profile = None
+
+    def candidates(self, text: str) -> list:
+        """이 텍스트에서 걸릴 수 있는 규칙 번호 (오름차순)"""
+        found = set(self._always)
+        for lit, entries in self._index.items():
+            if lit in text:
+                for i, rest in entries:
+                    if i not in found and _matches_all(rest, text):
+                        found.add(i)
+        return sorted(found)
+
+    def apply(self, text: str, base_hash: int = 0):
+        """규칙 순서대로 적용 → (텍스트, 총 치환 수)"""
+        rules = self.rules
+        live = [False] * len(rules)
+        for i in self.candidates(text):
+            live[i] = True
+        self.texts += 1
+        shared = [0]
+        total = 0
+        for i, rule in enumerate(rules):
+            if not live[i]:
+                continue
+            self.executed += 1
+            counter = shared if self.shared_counter else [0]
+            if self.profile is None:
+                new_text, n = rule.apply(text, base_hash, counter)
+            else:
+                start = time.perf_counter()
+                new_text, n = rule.apply(text, base_hash, counter)
+                row = self.profile[i]
+                row[0] += 1
+                row[1] += n
+                row[2] += n > 0
+                row[3] += time.perf_counter() - start
+            total += n
+            if new_text != text:
+                text = new_text
+                # 치환 결과에 새로 생긴 리터럴 → 뒤 규칙 되살림 (연쇄 치환)
+                for j in range(i + 1, len(rules)):
+                    if not live[j] and _matches_all(rules[j].requires, text):
+                        live[j] = True
+                        self.revived += 1
+        return text, total
+
+    def stats(self) -> tuple:
+        """(처리한 텍스트 수, 실행한 규칙 수, 연쇄로 되살린 규칙 수)"""
+        return self.texts, self.executed, self.revived
+
+    def reset_stats(self):
+        self.texts = self.executed = self.revived = 0
+        if self.profile is not None:
+            self.enable_profile()
+
+    def enable_profile(self):
+        """규칙별 실행 수/매치 수/영향받은 텍스트 수/시간 기록 시작 (약간 느려짐)"""
+        self.profile = [[0, 0, 0, 0.0] for _ in self.rules]
+
+    def profile_rows(self, stage: str, profile: list = None) -> list:
+        """규칙별 프로파일 → dict 목록. profile: 다른 프로세스에서 모은 값 (없으면 자체 기록)"""
+        profile = profile if profile is not None else self.profile
+        if profile is None:
+            return []
+        rows = []
+        for i, (rule, (executions, matches, affected, seconds)) in enumerate(zip(self.rules, profile)):
+            rows.append({
+                'stage': stage,
+                'index': i,
+                'pattern': rule.pattern,
+                'executions': executions,
+                'matches': matches,
+                'keys_affected': affected,
+                'seconds': round(seconds, 6),
+                'dead': matches == 0,
+            })
+        return rows
+
+
+def prefilter_summary(rule_sets: dict, stats: dict = None) -> str:
+    """{이름: RuleSet} → 단계별 텍스트당 평균 실행 규칙 수 / 전체 규칙 수
+    stats: {이름: RuleSet.stats()} — 다른 프로세스에서 모은 통계를 쓸 때 지정"""
+    lines = [f"{'단계':<16} {'규칙':>5} {'텍스트당 실행':>12} {'건너뜀':>8}"]
+    total_rules = total_exec = 0
+    for name, rs in rule_sets.items():
+        texts, executed, _ = stats.get(name, (0, 0, 0)) if stats is not None else rs.stats()
+        if not texts:
+            continue
+        possible = texts * len(rs.rules)
+        skipped = 1 - executed / possible if possible else 0.0
+        lines.append(f"{name:<16} {len(rs.rules):>5} {executed / texts:>12.2f} {skipped:>7.1%}")
+        total_rules += possible
+        total_exec += executed
+    if total_rules:
+        lines.append(f"전체 정규식 실행 {total_exec:,} / {total_rules:,}회 "
+                     f"(사전 필터로 {1 - total_exec / total_rules:.1%} 건너뜀)")
+    return '\n'.join(lines)
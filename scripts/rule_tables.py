@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""치환 규칙 테이블 로더 (postprocess_v1 / generate_buckets 공용)
+
+규칙은 코드가 아니라 데이터 파일 scripts/rules/rewrite_rules.json 에 있음.
+규칙을 고칠 때는 JSON만 수정 — 스크립트 코드는 건드릴 필요 없음.
+
+파일 형식 (version 1):
+  {"version": 1, "tables": {
+     "<테이블>": {"description": ..., "rules": [
+        {"pattern": 정규식, "candidates": [후보...]  또는  "repl": 고정 치환,
+         "flags": ["MULTILINE", ...], "note": 설명}, ...]},
+     "bucket_prefixes": {"description": ..., "buckets": {"1": {"note": ..., "prefixes": [...]}, ...}}}}
+
+컴파일 캐시: scripts/.cache/rules/rules-<파일 해시>-e<엔진 버전>-py<버전>.pickle
+  - 검증(정규식 컴파일 확인)과 필수 리터럴 분석(rewrite_engine.required_literals)을
+    파일 내용이 바뀔 때만 1회 하고 결과를 pickle로 저장 → 이후 실행은 pickle만 읽음
+  - 정규식 객체 자체는 pickle해도 로드 시 다시 컴파일되므로 저장하지 않음
+    (대신 Rule이 첫 실행 때 컴파일 — 사전 필터에 안 걸리는 규칙은 컴파일도 안 함)
+  - JSON 한 글자만 바뀌어도 해시가 달라져 새로 컴파일
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+import time
+
+from rewrite_engine import ENGINE_VERSION, Rule, required_literals
+
+RULES_PATH = os.path.join(os.path.dirname(__file__), 'rules', 'rewrite_rules.json')
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '.cache', 'rules')
+RULES_VERSION = 1
+FLAG_NAMES = {'MULTILINE': re.MULTILINE, 'IGNORECASE': re.IGNORECASE, 'DOTALL': re.DOTALL}
+
+
+class RuleTableError(ValueError):
+    """규칙 파일 형식 오류 (어느 테이블 몇 번째 규칙인지 포함)"""
+
+
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def _compile_entry(table: str, index: int, entry: dict) -> dict:
+    where = f'{table}[{index}]'
+    if not isinstance(entry, dict) or 'pattern' not in entry:
+        raise RuleTableError(f'{where}: pattern 없음')
+    if ('candidates' in entry) == ('repl' in entry):
+        raise RuleTableError(f'{where}: candidates/repl 중 하나만 지정')
+    if 'candidates' in entry and not entry['candidates']:
+        raise RuleTableError(f'{where}: candidates가 비어 있음')
+    flags = 0
+    for name in entry.get('flags', []):
+        if name not in FLAG_NAMES:
+            raise RuleTableError(f'{where}: 알 수 없는 flag {name!r}')
+        flags |= FLAG_NAMES[name]
+    try:
+        re.compile(entry['pattern'], flags)
+    except re.error as e:
+        raise RuleTableError(f'{where}: 정규식 오류 {e} — {entry["pattern"]!r}') from e
+    return {
+        'pattern': entry['pattern'],
+        'candidates': list(entry['candidates']) if 'candidates' in entry else None,
+        'repl': entry.get('repl'),
+        'flags': flags,
+        'requires': required_literals(entry['pattern'], flags),
+    }
+
+
+def compile_tables(doc: dict) -> dict:
+    """JSON 문서 → {테이블: [규칙 dict]} + {'bucket_prefixes': {번호: [prefix]}} (검증 포함)"""
+    if doc.get('version') != RULES_VERSION:
+        raise RuleTableError(f"규칙 파일 version {doc.get('version')!r} (지원: {RULES_VERSION})")
+    tables = {}
+    for name, table in doc.get('tables', {}).items():
+        if 'buckets' in table:
+            tables[name] = {int(b): list(v['prefixes']) for b, v in table['buckets'].items()}
+        else:
+            tables[name] = [_compile_entry(name, i, e) for i, e in enumerate(table.get('rules', []))]
+    return tables
+
+
+class RuleTables:
+    def __init__(self, tables: dict, digest: str, cache_hit: bool = False):
+        self.tables = tables
+        self.digest = digest
+        self.cache_hit = cache_hit
+
+    def _table(self, name: str):
+        if name not in self.tables:
+            raise RuleTableError(f'규칙 테이블 없음: {name}')
+        return self.tables[name]
+
+    def pairs(self, name: str) -> list:
+        """[(패턴, 후보 목록 또는 고정 치환)] — 기존 파이썬 리터럴 테이블과 같은 모양"""
+        return [(e['pattern'], e['candidates'] if e['candidates'] is not None else e['repl'])
+                for e in self._table(name)]
+
+    def bucket_prefixes(self, name: str = 'bucket_prefixes') -> dict:
+        return {b: list(p) for b, p in self._table(name).items()}
+
+    def rules(self, *names, seed_base: int = 0, seed_step: int = 0, **kwargs) -> list:
+        """테이블(여러 개면 이어 붙인 순서) → Rule 목록.
+        i번째 규칙의 seed_offset = seed_base + i * seed_step, 나머지 kwargs는 Rule에 그대로"""
+        entries = [e for name in names for e in self._table(name)]
+        return [Rule(e['pattern'], e['candidates'], e['repl'], flags=e['flags'],
+                     seed_offset=seed_base + i * seed_step, requires=e['requires'], **kwargs)
+                for i, e in enumerate(entries)]
+
+
+def _cache_path(digest: str) -> str:
+    py = f'{sys.version_info[0]}{sys.version_info[1]}'
+    return os.path.join(CACHE_DIR, f'rules-{digest}-e{ENGINE_VERSION}-py{py}.pickle')
+
+
+def load_rule_tables(path: str = RULES_PATH, use_cache: bool = True) -> RuleTables:
+    digest = file_hash(path)
+    cache_path = _cache_path(digest)
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                return RuleTables(pickle.load(f), digest, cache_hit=True)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass  # 깨진 캐시 → 새로 컴파일
+
+    with open(path, 'r', encoding='utf-8') as f:
+        tables = compile_tables(json.load(f))
+    if use_cache:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # 캐시는 최적화일 뿐 — 못 써도 진행
+    return RuleTables(tables, digest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='규칙 파일 검증 + 컴파일 캐시 생성')
+    parser.add_argument('path', nargs='?', default=RULES_PATH)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    rt = load_rule_tables(args.path)
+    elapsed = time.perf_counter() - start
+    print(f"{args.path} (sha256 {rt.digest}) — {'캐시' if rt.cache_hit else '새로 컴파일'} {elapsed * 1000:.1f}ms")
+    for name, table in rt.tables.items():
+        print(f"  {name:<18} {len(table):>4}개")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,12 +8,16 @@
 - 장생: 12운성 첫 단계 → 새 시작, 성장 에너지
 
 톤 4종 × 변형 ~7개 + 일부 = 30개
+(처리량/지연 백분위/설정별 비교는 bench_generation.py — 여기 추정 시간은 참고용)
 """
+import argparse
+import http.client
 import sys
 import json
 import time
-import urllib.request
-import urllib.error
+
+from llm_cache import add_cache_args, configure_from_args, get_cache, make_key
+from ollama_client import CircuitOpenError, OllamaError, backoff_delay, generate_stream, pool_summary
 
 sys.stdout.reconfigure(encoding='utf-8')
 
@@ -55,33 +59,52 @@ TONES = [
 ]
 
 
-def call_ollama(prompt: str, max_tokens: int = 500) -> tuple[str, float]:
-    """Ollama API 호출 → (생성 텍스트, 소요 시간)"""
-    payload = {
-        'model': MODEL,
-        'prompt': prompt,
-        'system': SYSTEM_PROMPT,
-        'stream': False,
-        'options': {
-            'temperature': 0.85,  # 다양성 확보
-            'top_p': 0.95,
-            'num_predict': max_tokens,
-            'repeat_penalty': 1.15,
-        }
+# 검증 기준 — 스트리밍 중 이 기준을 넘으면 바로 끊고 FAIL 처리
+FORBIDDEN_TERMS = ['비견', '정관', '용신', '일간', '십신', '12운성', '장생', '갑목']
+LENGTH_MIN = 150
+LENGTH_MAX = 400
+RETRIES = 2  # 연결 오류 재시도 (지수 백오프)
+
+
+def call_ollama(prompt: str, max_tokens: int = 500) -> tuple[str, float, dict]:
+    """Ollama API 호출 → (생성 텍스트, 소요 시간, 스트리밍 지표). 캐시 hit이면 소요 시간/지표 None"""
+    options = {
+        'temperature': 0.85,  # 다양성 확보
+        'top_p': 0.95,
+        'num_predict': max_tokens,
+        'repeat_penalty': 1.15,
     }
-    data = json.dumps(payload).encode('utf-8')
-    req = urllib.request.Request(OLLAMA_URL, data=data, headers={'Content-Type': 'application/json'})
+    cache = get_cache()
+    key = make_key('ollama', MODEL, prompt, SYSTEM_PROMPT, options, cache.variant)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit, None, None
+
     start = time.time()
-    try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            result = json.loads(resp.read().decode('utf-8'))
-            elapsed = time.time() - start
-            return result.get('response', '').strip(), elapsed
-    except urllib.error.URLError as e:
-        return f'[ERROR] {e}', time.time() - start
+    result = None
+    for attempt in range(RETRIES + 1):
+        try:
+            result = generate_stream(OLLAMA_URL, MODEL, prompt, options, system=SYSTEM_PROMPT,
+                                     forbidden=FORBIDDEN_TERMS, max_chars=LENGTH_MAX)
+            break
+        except CircuitOpenError as e:
+            return f'[ERROR] {e}', time.time() - start, None
+        except (OSError, http.client.HTTPException, OllamaError) as e:
+            if attempt == RETRIES:
+                return f'[ERROR] {e}', time.time() - start, None
+            time.sleep(backoff_delay(attempt))
+
+    # 조기 중단된 샘플은 캐시하지 않음 (다음 실행에서 다시 시도)
+    if result['text'] and not result['aborted']:
+        cache.put(key, result['text'], 'ollama', MODEL)
+    return result['text'], result['elapsed_s'], result
 
 
 def main():
+    parser = argparse.ArgumentParser(description='로컬 LLM 운세 생성 샘플')
+    add_cache_args(parser)
+    cache = configure_from_args(parser.parse_args())
+
     print("=" * 70)
     print(f"운세 생성 샘플 — 모델: {MODEL}")
     print("대상: 비견_yongsin_장생 × 30 변형 (톤 4종 × 7~8회)")
@@ -89,8 +112,8 @@ def main():
 
     # 30개 변형: 톤 4종을 라운드로빈
     samples = []
-    total_time = 0.0
-    forbidden_terms = ['비견', '정관', '용신', '일간', '십신', '12운성', '장생', '갑목']
+    total_time = 0.0  # 실제 생성한 샘플만 (캐시 hit은 시간/추정에서 제외)
+    generated = 0
 
     for i in range(1, 31):
         tone_name, tone_instr = TONES[(i - 1) % len(TONES)]
@@ -100,17 +123,24 @@ def main():
             tone_instruction=tone_instr,
         )
 
-        text, elapsed = call_ollama(prompt)
-        total_time += elapsed
+        text, elapsed, metrics = call_ollama(prompt)
+        cached = elapsed is None
+        if not cached:
+            total_time += elapsed
+            generated += 1
 
         # 검증
         char_count = len(text)
-        forbidden_hits = [t for t in forbidden_terms if t in text]
-        length_ok = 150 <= char_count <= 400
+        forbidden_hits = [t for t in FORBIDDEN_TERMS if t in text]
+        length_ok = LENGTH_MIN <= char_count <= LENGTH_MAX
         forbidden_ok = len(forbidden_hits) == 0
+        aborted = bool(metrics and metrics['aborted'])
 
-        status = '[OK]' if (length_ok and forbidden_ok) else '[FAIL]'
+        passed = length_ok and forbidden_ok and not aborted
+        status = '[OK]' if passed else '[FAIL]'
         marks = []
+        if aborted:
+            marks.append(f"조기 중단({metrics['abort_reason']})")
         if not length_ok:
             marks.append(f'길이 {char_count}자')
         if not forbidden_ok:
@@ -121,12 +151,18 @@ def main():
             'tone': tone_name,
             'text': text,
             'chars': char_count,
-            'elapsed_s': round(elapsed, 1),
+            'elapsed_s': round(elapsed, 1) if not cached else None,
+            'cached': cached,
             'forbidden_hits': forbidden_hits,
-            'pass': length_ok and forbidden_ok,
+            'aborted': aborted,
+            'ttft_s': round(metrics['ttft_s'], 2) if metrics and metrics['ttft_s'] is not None else None,
+            'tokens_per_sec': round(metrics['tokens_per_sec'], 1) if metrics else None,
+            'pass': passed,
         })
 
-        print(f"\n[{i:02d}/30] 톤={tone_name}, {char_count}자, {elapsed:.1f}초 {status} {marks}")
+        speed = f", TTFT {metrics['ttft_s']:.2f}초, {metrics['tokens_per_sec']:.1f} tok/s" if metrics and metrics['ttft_s'] is not None else ''
+        took = '캐시' if cached else f'{elapsed:.1f}초'
+        print(f"\n[{i:02d}/30] 톤={tone_name}, {char_count}자, {took}{speed} {status} {marks}")
         print(f"  {text[:150]}{'...' if len(text) > 150 else ''}")
 
     # 결과 저장
@@ -136,8 +172,9 @@ def main():
             'model': MODEL,
             'key': '비견_yongsin_장생',
             'total_samples': len(samples),
+            'cached_count': len(samples) - generated,
             'total_time_s': round(total_time, 1),
-            'avg_time_s': round(total_time / len(samples), 1),
+            'avg_time_s': round(total_time / generated, 1) if generated else None,
             'pass_count': sum(1 for s in samples if s['pass']),
             'samples': samples,
         }, f, ensure_ascii=False, indent=2)
@@ -149,10 +186,17 @@ def main():
     print("=" * 70)
     print(f"  생성 완료: 30/30")
     print(f"  통과 (길이+금지어): {pass_count}/30 ({pass_count*100/30:.0f}%)")
-    print(f"  총 소요: {total_time:.1f}초 ({total_time/60:.1f}분)")
-    print(f"  평균 1개당: {total_time/30:.1f}초")
-    print(f"  전체 14,400개 추정 시간: {total_time/30 * 14400 / 3600:.1f}시간")
+    print(f"  캐시에서 읽음: {30 - generated}/30 (시간/추정에서 제외)")
+    print(f"  총 소요: {total_time:.1f}초 ({total_time/60:.1f}분, 실제 생성 {generated}개)")
+    if generated:
+        print(f"  평균 1개당: {total_time/generated:.1f}초")
+        print(f"  전체 14,400개 추정 시간: {total_time/generated * 14400 / 3600:.1f}시간")
+    else:
+        print("  평균/추정 시간: 실제 생성 0개 — --no-cache 로 다시 실행")
+    print(f"  조기 중단: {sum(1 for s in samples if s['aborted'])}/30")
     print(f"\n  결과 저장: {out_path}")
+    print(f"  {cache.summary()}")
+    print(f"  {pool_summary()}")
 
     # 톤별 다양성 확인
     by_tone = {}
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""슬롯 풀 압축 형식 (narratives_slots_v1.json → narratives_slots_v1_compact.json)
+
+기존 slots 파일: overall_slots를 indent=2 중첩 문자열 배열로 — 들여쓰기 공백 + 여러 그룹에 나오는 파편이 그대로 중복.
+압축 형식 = 문자열 표 1개 + 그룹·슬롯별 정수 번호 배열, 공백 없는 JSON:
+
+{
+  "format": "slots_compact_v1",
+  "strings": ["파편 또는 카테고리 본문", ...],       # 중복 없음, 처음 나온 순서
+  "slot_names": ["slot0", "slot1", "slot2", "slot3"],
+  "overall_slots": {"비견_yongsin": [[0, 1, ...], [...], [...], [...]], ...},  # slot_names 순서
+  "categories": {"wealth_비견_yongsin": 57, ...},
+  "meta": {...}                                         # slots 파일 meta 그대로
+}
+
+읽는 쪽 계약 (generatePersonalNarrative.ts expandCompactSlots와 같음):
+  overall_slots[그룹][slot_names[i]] = overall_slots[그룹][i].map(n => strings[n])
+  categories[키] = strings[categories[키]]
+→ load_compact(path)는 slots 파일을 json.load 한 것과 같은 dict (unpack(pack(d)) == d)
+
+  python scripts/slots_compact.py                       # 기본 slots 파일 → 압축 파일 + 크기/파싱 시간
+  python scripts/slots_compact.py IN.json -o OUT.json
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+FORMAT = 'slots_compact_v1'
+SLOT_NAMES = ['slot0', 'slot1', 'slot2', 'slot3']
+INPUT = 'src/data/generated/narratives_slots_v1.json'
+OUTPUT = 'src/data/generated/narratives_slots_v1_compact.json'
+
+
+def compact_path(path: str) -> str:
+    """narratives_slots_v1.json → narratives_slots_v1_compact.json"""
+    root, ext = os.path.splitext(path)
+    return f'{root}_compact{ext}'
+
+
+class StringTable:
+    """문자열 → 번호 (처음 나온 순서, 같은 문자열은 같은 번호)"""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, text: str) -> int:
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return sid
+
+
+def pack(doc: dict) -> dict:
+    """slots 파일 dict → 압축 형식 dict"""
+    table = StringTable()
+    overall = {}
+    for group, pool in doc.get('overall_slots', {}).items():
+        extra = set(pool) - set(SLOT_NAMES)
+        if extra:
+            raise ValueError(f'{group}: 모르는 슬롯 {sorted(extra)} (SLOT_NAMES = {SLOT_NAMES})')
+        overall[group] = [[table.intern(t) for t in pool.get(slot, [])] for slot in SLOT_NAMES]
+    categories = {k: table.intern(v) for k, v in doc.get('categories', {}).items()}
+    compact = {
+        'format': FORMAT,
+        'strings': table.strings,
+        'slot_names': SLOT_NAMES,
+        'overall_slots': overall,
+        'categories': categories,
+    }
+    if 'meta' in doc:
+        compact['meta'] = doc['meta']
+    return compact
+
+
+def unpack(compact: dict) -> dict:
+    """압축 형식 dict → slots 파일과 같은 dict"""
+    if compact.get('format') != FORMAT:
+        raise ValueError(f"압축 slots 형식이 아님: format={compact.get('format')!r} (기대 {FORMAT})")
+    strings, slot_names = compact['strings'], compact['slot_names']
+    doc = {
+        'overall_slots': {
+            group: {slot: [strings[i] for i in ids] for slot, ids in zip(slot_names, pools)}
+            for group, pools in compact['overall_slots'].items()
+        },
+        'categories': {k: strings[i] for k, i in compact['categories'].items()},
+    }
+    if 'meta' in compact:
+        doc['meta'] = compact['meta']
+    return doc
+
+
+def dumps_compact(compact: dict) -> str:
+    return json.dumps(compact, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_compact(path: str, doc: dict) -> dict:
+    """slots dict를 압축 형식으로 저장 (임시 파일 → os.replace). 압축 dict 반환"""
+    compact = pack(doc)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(dumps_compact(compact))
+    os.replace(tmp_path, path)
+    return compact
+
+
+def load_compact(path: str) -> dict:
+    """압축 파일 → slots 파일을 json.load 한 것과 같은 dict"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return unpack(json.load(f))
+
+
+# 앱 쪽 파싱 시간 (node가 있을 때만) — JSON.parse + expandCompactSlots와 같은 펼치기
+_NODE_PARSE = r"""
+const fs = require('fs');
+const [path, compact, repeat] = [process.argv[1], process.argv[2] === '1', Number(process.argv[3])];
+const data = fs.readFileSync(path, 'utf8');
+const expand = (c) => {
+  const s = c.strings, overall = {}, categories = {};
+  for (const [g, pools] of Object.entries(c.overall_slots)) {
+    const pool = {};
+    c.slot_names.forEach((name, i) => { pool[name] = pools[i].map((n) => s[n]); });
+    overall[g] = pool;
+  }
+  for (const [k, n] of Object.entries(c.categories)) categories[k] = s[n];
+  return { overall_slots: overall, categories, meta: c.meta };
+};
+let best = Infinity;
+for (let r = 0; r < repeat; r++) {
+  const t = process.hrtime.bigint();
+  const doc = JSON.parse(data);
+  if (compact) expand(doc);
+  best = Math.min(best, Number(process.hrtime.bigint() - t) / 1e6);
+}
+console.log(best);
+"""
+
+
+def _parse_ms(data: str, decode, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _node_parse_ms(path: str, compact: bool, repeat: int):
+    node = shutil.which('node')
+    if node is None:
+        return None
+    try:
+        out = subprocess.run([node, '-e', _NODE_PARSE, path, '1' if compact else '0', str(repeat)],
+                             capture_output=True, text=True, timeout=60, check=True)
+        return float(out.stdout.strip())
+    except (subprocess.SubprocessError, ValueError):
+        return None
+
+
+_DECODERS = (('slots', False, json.loads), ('압축', True, lambda s: unpack(json.loads(s))))
+
+
+def compare(slots_path: str, compact_path_: str, repeat: int = 20) -> list:
+    """[(이름, 바이트, gzip 바이트, 파이썬 파싱 ms, node 파싱 ms 또는 None)] — 최솟값
+
+    파싱 = JSON 해석 (+ 압축 형식은 펼치기까지) — 앱이 실제로 쓰는 형태가 될 때까지
+    """
+    rows = []
+    for (name, compact, decode), path in zip(_DECODERS, (slots_path, compact_path_)):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        rows.append((name, len(raw), len(gzip.compress(raw, 9)),
+                     _parse_ms(raw.decode('utf-8'), decode, repeat), _node_parse_ms(path, compact, repeat)))
+    return rows
+
+
+def compare_in_memory(slots_text: str, repeat: int = 5) -> tuple:
+    """압축 파일을 안 쓰고 node도 안 띄우는 compare — (rows, 압축 dict), node 칸은 None
+
+    generate_slots "파일 크기"용 (매 실행마다 도는 곳이라 파이썬만, 반복 적게)
+    """
+    compact = pack(json.loads(slots_text))
+    rows = []
+    for (name, _, decode), text in zip(_DECODERS, (slots_text, dumps_compact(compact))):
+        raw = text.encode('utf-8')
+        rows.append((name, len(raw), len(gzip.compress(raw, 9)), _parse_ms(text, decode, repeat), None))
+    return rows, compact
+
+
+def print_compare(rows: list, compact: dict = None):
+    for name, size, gz, py_ms, node_ms in rows:
+        node = f', node {node_ms:5.2f}ms' if node_ms is not None else ''
+        print(f'  {name:5} {size / 1024:6.1f} KB (gzip {gz / 1024:5.1f} KB) 파싱: 파이썬 {py_ms:5.2f}ms{node}')
+    (_, old, old_gz, old_py, old_node), (_, new, new_gz, new_py, new_node) = rows
+    line = (f'  압축 형식: 크기 {(new - old) / old * 100:+.1f}%, gzip {(new_gz - old_gz) / old_gz * 100:+.1f}%, '
+            f'파싱 파이썬 {(new_py - old_py) / old_py * 100:+.0f}%')
+    if old_node is not None and new_node is not None:
+        line += f', node {(new_node - old_node) / old_node * 100:+.0f}%'
+    print(line)
+    if compact is not None:
+        refs = sum(len(ids) for pools in compact['overall_slots'].values() for ids in pools) + len(compact['categories'])
+        print(f'  문자열 표: {len(compact["strings"])}개 (참조 {refs}개 → 중복 {refs - len(compact["strings"])}개 제거)')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='slots 파일 → 문자열 표 + 번호 배열 압축 형식')
+    parser.add_argument('input', nargs='?', default=INPUT, help=f'slots 파일 (기본 {INPUT})')
+    parser.add_argument('-o', '--output', help='압축 파일 (기본: 입력 이름_compact.json)')
+    args = parser.parse_args(argv)
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    output = args.output or compact_path(args.input)
+    with open(args.input, 'r', encoding='utf-8') as f:
+        doc = json.load(f)
+    compact = write_compact(output, doc)
+    if load_compact(output) != doc:
+        raise SystemExit(f'❌ 왕복 불일치: {output}')
+    print(f'{args.input} → {output}')
+    print_compare(compare(args.input, output), compact)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""generate_buckets 단어 치환 회귀 테스트 — split 엔진 = 기존 순차 re.sub
+
+기준 구현: 엔진 도입 전 apply_word_swaps (규칙마다 re.sub, high는 카운터를
+local_seed + 999 + bucket 으로 바꿔 한 번 더 re.sub) 를 아래에 그대로 둠.
+  - 코퍼스 전체 원본 × bucket 1~6 × normal/high 에서 결과 비교
+  - 연쇄('기운이' → '흐름이'), 자기 재매치('낮' → '한낮'), 경계 케이스 합성 텍스트 × 시드 여러 개
+  - 패턴/후보 조각을 무작위로 이어 붙인 텍스트 (고정 시드)
+  - rules 파일을 고친 경우: 후보가 옆 원문의 뒤 문맥을 만들어 2회차에 치환 자리 밖이 새로 걸림
+  - fixtures/bucket_swaps.json: 엔진 도입 전 bucket 파일(--export 평탄 파일, md5 36104b0c…)의
+    섹션 × bucket별 sha256 — 입력 원본이 같을 때 bucket_text 결과가 그 파일과 같은지
+
+실행: python scripts/test_bucket_swaps.py            (pytest로도 실행 가능)
+     python scripts/test_bucket_swaps.py --update   # 원본(postprocess 결과)이 바뀐 뒤 기준 구현으로 fixture 갱신
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_buckets as gb  # noqa: E402
+from key_hash import hash_with_suffix  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'bucket_swaps.json')
+SAMPLE_KEYS = {'overall': ['비견_yongsin_장생', '정관_gisin_제왕'], 'categories': ['wealth_비견_yongsin']}
+EDGE_TEXTS = [
+    '', '치환할 단어 없음', '낮',
+    '기운이 좋아요. 흐름이 있어요. 기운이 돼요.',      # 앞 규칙 결과를 뒤 규칙이 다시 잡는 연쇄
+    '한낮 낮 낮에는 낮. 아침 저녁에는 특히 정말 혹시 ',  # '낮' → '한낮' 처럼 2회차에 다시 걸리는 후보
+    '특히특히 정말\n혹시\t있어요.있어요.',
+    '곁의 사람 곁에 있는 사람 분위기예요. 시간이에요. 결이에요.',
+    '기운이 기운이 흐름이 흐름이 기운이',                # 2회차 매치가 1회차 치환 범위를 넘어감
+    '기운이 기운이 기운이 기운이 있어요.',
+]
+FUZZ_CASES = 3000
+FUZZ_GLUE = ['', ' ', ' ', '\n', '.', '에는', '에는 ', '요', '이', ' 기운이 ', '낮']
+
+
+def fuzz_texts(n: int = FUZZ_CASES, seed: int = 20261017) -> list:
+    """패턴 리터럴·후보 조각을 무작위로 이어 붙인 텍스트 (규칙끼리 겹치고 붙는 경우를 많이 만듦)"""
+    rng = random.Random(seed)
+    pieces = [c.replace('\\1', rng.choice(['좋아요.', '흐름이', '낮', 'X']))
+              for _, cands in gb.SWAP_POOLS for c in cands]
+    pieces += [lit for rule in gb._SWAP_RULES for group in rule.requires for lit in group]
+    return [''.join(rng.choice(pieces) + rng.choice(FUZZ_GLUE) for _ in range(rng.randint(1, 12)))
+            for _ in range(n)]
+
+
+_LEGACY_REGEXES = [re.compile(p) for p, _ in gb.SWAP_POOLS]
+
+
+def legacy_apply_word_swaps(text: str, seed: int, intensity: str = 'normal', bucket_num: int = 0) -> str:
+    """엔진 도입 전 apply_word_swaps 그대로 (기준 구현)"""
+    counter = [0]
+    for i, ((_, candidates), regex) in enumerate(zip(gb.SWAP_POOLS, _LEGACY_REGEXES)):
+        local_seed = seed + i * 17 + bucket_num * 31
+
+        def picker(m):
+            idx = counter[0]
+            counter[0] += 1
+            chosen = candidates[(local_seed + idx) % len(candidates)]
+            if '\\1' in chosen and m.lastindex:
+                chosen = chosen.replace('\\1', m.group(1))
+            return chosen
+
+        text = regex.sub(picker, text)
+        if intensity == 'high':
+            counter[0] = local_seed + 999 + bucket_num
+            text = regex.sub(picker, text)
+
+    return text
+
+
+def _base_texts() -> dict:
+    return gb.BucketSource().base
+
+
+def _digest(items) -> str:
+    h = hashlib.sha256()
+    for key, text in items:
+        h.update(f'{key}\x00{text}\n'.encode('utf-8'))
+    return h.hexdigest()
+
+
+def _input_digest(base: dict) -> str:
+    return _digest((f'{s}/{k}', v) for s in gb.SECTIONS for k, v in base[s].items())
+
+
+def _bucket_digests(base: dict, make) -> dict:
+    """{섹션: {bucket: sha256}} — make(섹션, 키, 원본, bucket)로 만든 본문, 키 순서 = 평탄 파일 순서"""
+    return {s: {str(b): _digest((k, make(s, k, v, b)) for k, v in base[s].items()) for b in range(1, 7)}
+            for s in gb.SECTIONS}
+
+
+def _legacy_bucket_text(section: str, key: str, text: str, bucket_num: int) -> str:
+    """bucket_text와 같은 흐름, 단어 치환만 기준 구현으로"""
+    swaps = gb.apply_word_swaps
+    gb.apply_word_swaps = legacy_apply_word_swaps
+    try:
+        return gb.bucket_text(section, key, text, bucket_num)
+    finally:
+        gb.apply_word_swaps = swaps
+
+
+def test_matches_two_pass_reference():
+    base = _base_texts()
+    n = 0
+    for section in gb.SECTIONS:
+        for key, text in base[section].items():
+            for b in range(1, 7):
+                h = hash_with_suffix(key, f'_b{b}')
+                for intensity in gb.INTENSITY_PASSES:
+                    got = gb.apply_word_swaps(text, h, intensity, b)
+                    want = legacy_apply_word_swaps(text, h, intensity, b)
+                    assert got == want, f'{section}/{key} bucket {b} {intensity}:\n  {got[:120]}\n  {want[:120]}'
+                    n += 1
+    print(f'코퍼스 = 기준 구현: {n}개 (원본 × bucket 1~6 × normal/high)')
+
+
+def test_edge_cases():
+    n = 0
+    for text in EDGE_TEXTS:
+        for seed in list(range(64)) + [2**31 - 1, 2**32 - 1]:
+            for b in range(7):
+                for intensity in gb.INTENSITY_PASSES:
+                    got = gb.apply_word_swaps(text, seed, intensity, b)
+                    assert got == legacy_apply_word_swaps(text, seed, intensity, b), (text, seed, intensity, b)
+                    n += 1
+    print(f'경계 케이스 = 기준 구현: {n}개')
+
+
+def test_fuzz():
+    rng = random.Random(7)
+    n = 0
+    for text in fuzz_texts():
+        seed, b = rng.randrange(2**32), rng.randint(0, 6)
+        for intensity in gb.INTENSITY_PASSES:
+            assert gb.apply_word_swaps(text, seed, intensity, b) == legacy_apply_word_swaps(text, seed, intensity, b), \
+                (text, seed, intensity, b)
+            n += 1
+    print(f'무작위 조합 = 기준 구현: {n}개')
+
+
+def test_edited_candidates():
+    """'낮' 후보를 ' 햇살'로 — '낮낮.'의 1회차 '낮 햇살.' 에서 앞 '낮'(치환 자리 밖)이 2회차에 새로 걸림"""
+    i = next(k for k, (pattern, _) in enumerate(gb.SWAP_POOLS) if pattern.startswith('낮'))
+    rule = gb._SWAP_RULES[i]
+    saved = list(rule.candidates), list(gb.SWAP_POOLS[i][1]), gb._SWAP_REVIVES
+    try:
+        for cands in (rule.candidates, gb.SWAP_POOLS[i][1]):
+            cands[:] = [' 햇살']
+        gb._SWAP_REVIVES = gb._revive_targets(gb._SWAP_RULES)
+        assert legacy_apply_word_swaps('낮낮.', 0, 'high', 4) == ' 햇살 햇살.'
+        n = 0
+        for text in ['낮낮.', '낮낮낮.', '낮낮에는 낮.', '아침낮낮.'] + fuzz_texts(300, seed=22):
+            for seed in range(8):
+                for b in range(7):
+                    for intensity in gb.INTENSITY_PASSES:
+                        got = gb.apply_word_swaps(text, seed, intensity, b)
+                        assert got == legacy_apply_word_swaps(text, seed, intensity, b), (text, seed, intensity, b)
+                        n += 1
+    finally:
+        rule.candidates[:], gb.SWAP_POOLS[i][1][:], gb._SWAP_REVIVES = saved
+    print(f'고친 후보(낮 → \' 햇살\') = 기준 구현: {n}개')
+
+
+def test_matches_fixture():
+    if not os.path.exists(FIXTURE):
+        print(f'fixture 없음 — 건너뜀 ({FIXTURE})')
+        return
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    base = _base_texts()
+    if _input_digest(base) != fixture['input_sha256']:
+        print('원본이 fixture 생성 때와 다름 — 건너뜀 (기준 구현 비교는 위에서 통과, 필요하면 --update)')
+        return
+    for name, want in fixture['samples'].items():
+        section, flat_key = name.split('/', 1)
+        assert gb.BucketSource(base).lookup(section, flat_key) == want, name
+    got = _bucket_digests(base, gb.bucket_text)
+    bad = [(s, b) for s in gb.SECTIONS for b in got[s] if got[s][b] != fixture['buckets'][s][b]]
+    assert not bad, f'bucket 파일과 다른 섹션/bucket: {bad}'
+    print(f'fixture(엔진 도입 전 bucket 파일) 일치: {sum(len(v) for v in base.values())}개 키 × bucket 1~6')
+
+
+def update_fixture():
+    base = _base_texts()
+    samples = {f'{s}/{k}_{b}': _legacy_bucket_text(s, k, base[s][k], b)
+               for s, keys in SAMPLE_KEYS.items() for k in keys if k in base[s] for b in range(1, 7)}
+    fixture = {
+        'description': 'generate_buckets bucket 1~6 본문 기준값 (엔진 도입 전 순차 2회 스캔 결과). '
+                       'buckets = 섹션 × bucket별 sha256("키\\0본문\\n" 을 원본 키 순서대로)',
+        'input_sha256': _input_digest(base),
+        'buckets': _bucket_digests(base, _legacy_bucket_text),
+        'samples': samples,
+    }
+    os.makedirs(os.path.dirname(FIXTURE), exist_ok=True)
+    with open(FIXTURE, 'w', encoding='utf-8') as f:
+        json.dump(fixture, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f'fixture 갱신: {FIXTURE}')
+
+
+def benchmark(repeat: int = 5):
+    """원본 × bucket 1~6 단어 치환 시간 (기준 구현 vs 엔진, 최솟값)"""
+    base = _base_texts()
+    calls = [(text, hash_with_suffix(key, f'_b{b}'), 'high' if b >= 4 else 'normal', b)
+             for s in gb.SECTIONS for key, text in base[s].items() for b in range(1, 7)]
+    times = {}
+    for name, fn in (('기준 (순차 re.sub)', legacy_apply_word_swaps), ('엔진 (split)', gb.apply_word_swaps)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for args in calls:
+                fn(*args)
+            best = min(best, time.perf_counter() - start)
+        times[name] = best
+        print(f'  {name:20} {best * 1000:7.1f}ms ({len(calls)}개)')
+    old, new = times.values()
+    print(f'  → {old / new:.1f}배')
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    if '--update' in sys.argv[1:]:
+        update_fixture()
+        sys.exit(0)
+    test_matches_two_pass_reference()
+    test_edge_cases()
+    test_fuzz()
+    test_edited_candidates()
+    test_matches_fixture()
+    print('✅ 전부 통과')
+    print('\n=== 단어 치환 시간 ===')
+    benchmark()
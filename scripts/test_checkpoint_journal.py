@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""checkpoint_journal 테스트 — 크래시로 잘린 마지막 줄 뒤에 이어 써도 기록이 안 사라짐
+
+  - 잘린 줄(줄바꿈 없음) → 재시작 → append → load: 잘린 줄만 버리고 새 기록은 전부 남음
+  - 그 상태로 compact → 본 JSON에 전부, 저널은 비워짐
+  - 줄바꿈 없이 잘린 조각만 있는 저널 / _TAIL_CHUNK보다 긴 잘린 줄
+
+실행: python scripts/test_checkpoint_journal.py   (pytest로도 실행 가능)
+"""
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import checkpoint_journal as cj  # noqa: E402
+
+SECTIONS = ['overall', 'categories']
+
+
+def _crash_mid_line(journal: cj.CheckpointJournal, cut: int):
+    """마지막 줄을 쓰다가 죽은 것처럼 — 끝에서 cut바이트를 잘라냄 (줄바꿈 포함)"""
+    journal.close()
+    size = os.path.getsize(journal.journal_path)
+    with open(journal.journal_path, 'r+b') as f:
+        f.truncate(size - cut)
+
+
+def test_append_after_torn_line_keeps_records():
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'narratives.json')
+        first = cj.CheckpointJournal(out, SECTIONS)
+        first.append('overall', 'a', '첫 번째', input_hash='h1')
+        first.append('overall', 'b', '두 번째')
+        first.append('categories', 'torn', '쓰다 만 줄' * 3)
+        _crash_mid_line(first, 7)
+
+        second = cj.CheckpointJournal(out, SECTIONS)
+        results, replayed, dropped = second.load()
+        assert (replayed, dropped) == (2, 1)
+        second.append('categories', 'c', '세 번째')
+        second.append('overall', 'd', '네 번째')
+        second.close()
+
+        third = cj.CheckpointJournal(out, SECTIONS)
+        results, replayed, dropped = third.load()
+        assert (replayed, dropped) == (4, 0), (replayed, dropped)
+        want = {'overall': {'a': '첫 번째', 'b': '두 번째', 'd': '네 번째'}, 'categories': {'c': '세 번째'}}
+        assert results == want
+        assert third.hashes['overall'] == {'a': 'h1'}
+
+        third.compact(results)
+        assert not os.path.exists(third.journal_path)
+        with open(out, 'r', encoding='utf-8') as f:
+            assert json.load(f) == want
+        assert cj.CheckpointJournal(out, SECTIONS).load() == (want, 0, 0)
+    print('잘린 줄 뒤 append → load / compact: 기록 손실 없음')
+
+
+def test_torn_only_and_long_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'narratives.json')
+        journal = cj.CheckpointJournal(out, SECTIONS)
+        with open(journal.journal_path, 'w', encoding='utf-8') as f:
+            f.write('{"s": "overall", "k": "x", "v": "조각')  # 줄바꿈이 하나도 없음
+        journal.append('overall', 'y', '새 줄')
+        journal.close()
+        assert cj.CheckpointJournal(out, SECTIONS).load() == ({'overall': {'y': '새 줄'}, 'categories': {}}, 1, 0)
+
+        journal = cj.CheckpointJournal(out, SECTIONS)
+        journal.append('overall', 'long', '가' * (cj._TAIL_CHUNK * 2))  # 청크 경계를 넘는 줄
+        _crash_mid_line(journal, 3)
+        journal = cj.CheckpointJournal(out, SECTIONS)
+        journal.append('overall', 'z', '마지막')
+        journal.close()
+        results, replayed, dropped = cj.CheckpointJournal(out, SECTIONS).load()
+        assert results['overall'] == {'y': '새 줄', 'z': '마지막'} and dropped == 0
+    print('줄바꿈 없는 조각 / 긴 잘린 줄도 잘라내고 이어 씀')
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    test_append_after_torn_line_keeps_records()
+    test_torn_only_and_long_lines()
+    print('✅ 전부 통과')
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""key_hash ↔ 앱 TypeScript 해시 패리티 테스트
+
+src/hooks/useTodayFortune.ts 에서 실제 해시 코드를 그대로 뽑아 node로 실행하고
+같은 입력에 대한 key_hash 결과와 비트 단위로 비교:
+  - 다항식: str.split('').reduce((a, b) => ((a << 5) - a) + b.charCodeAt(0), 0)  (>>> 0)
+  - fmix32(다항식)  (getHash 폴백 경로)
+입력: narratives 키 전체 × 스크립트가 쓰는 suffix + 경계 케이스(빈 문자열, 이모지, 긴 문자열).
+
+실행: python scripts/test_hash_parity.py   (pytest로도 실행 가능, node 없으면 건너뜀)
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from key_hash import fmix32, hash_batch, hash_extend, hash_str, hash_with_suffix  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TS_SOURCE = os.path.join(ROOT, 'src', 'hooks', 'useTodayFortune.ts')
+NARRATIVES = os.path.join(ROOT, 'src', 'data', 'generated', 'narratives_generated.json')
+SUFFIXES = ['', '_first', '_close'] + [f'_b{b}' for b in range(1, 7)]
+EDGE_CASES = [
+    '', 'a', '비견', '가' * 500, 'x' * 5000,      # 긴 문자열: JS 중간값이 int32 밖으로 커지는 경우
+    '🍀행운', '날이에요😊', '𠀀', '\x00끝\x00',     # 서로게이트 쌍, 널 문자
+    '2026-10-17-stem', 'stem-2026-10-17',
+]
+
+
+def _extract_ts_hash_code() -> str:
+    """useTodayFortune.ts의 다항식 reduce 식과 fmix32 본문 → 실행 가능한 JS"""
+    with open(TS_SOURCE, 'r', encoding='utf-8') as f:
+        src = f.read()
+    poly = re.search(r"return fmix32\((str\.split\(''\)\.reduce\(.+?, 0\))\);", src)
+    fmix = re.search(r'export function fmix32\(h: number\): number \{(.+?)\n\}', src, re.S)
+    if not poly or not fmix:
+        raise AssertionError(f'{TS_SOURCE}에서 해시 코드를 찾지 못함 (구현이 바뀌었으면 이 테스트도 갱신)')
+    return (
+        f"function fmix32(h) {{{fmix.group(1)}\n}}\n"
+        f"function poly(str) {{ return {poly.group(1)}; }}\n"
+    )
+
+
+def ts_hashes(strings: list) -> list:
+    """node로 TS 해시 코드 실행 → [(다항식 >>> 0, fmix32(다항식))]"""
+    script = _extract_ts_hash_code() + (
+        "const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));\n"
+        "process.stdout.write(JSON.stringify(input.map(s => { const p = poly(s); return [p >>> 0, fmix32(p)]; })));\n"
+    )
+    out = subprocess.run(['node', '-e', script], input=json.dumps(strings), capture_output=True,
+                         text=True, encoding='utf-8', check=True)
+    return [tuple(x) for x in json.loads(out.stdout)]
+
+
+def parity_inputs() -> list:
+    keys = []
+    if os.path.exists(NARRATIVES):
+        with open(NARRATIVES, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        keys = [k for section in data.values() if isinstance(section, dict) for k in section]
+    return [k + s for k in keys for s in SUFFIXES] + EDGE_CASES
+
+
+def test_scalar_matches_typescript():
+    if shutil.which('node') is None:
+        print('node 없음 — 건너뜀')
+        return
+    inputs = parity_inputs()
+    expected = ts_hashes(inputs)
+    mismatches = [(s, (hash_str(s), fmix32(hash_str(s))), e) for s, e in zip(inputs, expected)
+                  if (hash_str(s), fmix32(hash_str(s))) != e]
+    assert not mismatches, f'TS와 다른 해시 {len(mismatches)}개: {mismatches[:5]}'
+    print(f'TS 패리티 OK: {len(inputs)}개 입력')
+
+
+def test_incremental_and_batch_match_scalar():
+    inputs = parity_inputs()
+    for s in inputs:
+        for cut in {0, len(s) // 2, len(s)}:
+            base, suffix = s[:cut], s[cut:]
+            assert hash_extend(hash_str(base), suffix) == hash_str(s), s
+            assert hash_with_suffix(base, suffix) == hash_str(s), s
+    assert hash_batch(inputs) == [hash_str(s) for s in inputs]
+    assert hash_batch([]) == [] and hash_batch(['']) == [0]
+    print(f'증분/배치 = 스칼라: {len(inputs)}개 입력')
+
+
+def test_matches_legacy_ord_loop():
+    """스크립트에 있던 기존 hash_str (ord 루프) — BMP 안에서는 같은 값이어야 기존 출력 유지"""
+    def legacy(s):
+        h = 0
+        for c in s:
+            h = ((h << 5) - h) + ord(c)
+            h = h & 0xFFFFFFFF
+        return h
+    for s in parity_inputs():
+        if all(ord(c) <= 0xFFFF for c in s):
+            assert hash_str(s) == legacy(s), s
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    test_scalar_matches_typescript()
+    test_incremental_and_batch_match_scalar()
+    test_matches_legacy_ord_loop()
+    print('✅ 전부 통과')
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""near_duplicates 테스트 — MinHash/LSH 군집 = 모든 쌍 정확 비교
+
+  - NumPy 경로와 파이썬 경로의 서명이 같음 (NumPy 있을 때만)
+  - 서명 추정 유사도가 정확한 자카드와 가까움
+  - 원본 본문 + 글자를 조금 바꾼 사본을 섞은 코퍼스에서, 정확한 자카드로 모든 쌍을 비교한 결과와
+    LSH 군집이 같음 (임계값 근처 쌍은 추정 오차로 갈릴 수 있어 여유 구간은 제외)
+
+실행: python scripts/test_near_duplicates.py   (pytest로도 실행 가능)
+"""
+import json
+import os
+import random
+import sys
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import near_duplicates as nd  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+NARRATIVES = os.path.join(ROOT, 'src', 'data', 'generated', 'narratives_generated_v1plus.json')
+THRESHOLD = 0.8
+MARGIN = 0.1  # 정확한 자카드가 임계값 ± 이 범위면 판정을 강제하지 않음
+
+
+def _corpus(n_base: int = 120, seed: int = 3) -> dict:
+    """원본 n_base개 + 그중 일부를 글자 몇 개만 바꾼 사본 (이름 '원본키~번호')"""
+    with open(NARRATIVES, 'r', encoding='utf-8') as f:
+        overall = json.load(f)['overall']
+    rng = random.Random(seed)
+    docs = dict(list(overall.items())[:n_base])
+    for key in rng.sample(list(docs), n_base // 3):
+        for copy in range(rng.randint(1, 3)):
+            chars = list(docs[key])
+            for _ in range(rng.randint(0, 6)):
+                chars[rng.randrange(len(chars))] = rng.choice('가나다라XYZ ')
+            docs[f'{key}~{copy}'] = ''.join(chars)
+    return docs
+
+
+def test_numpy_matches_python():
+    if nd.np is None:
+        print('NumPy 없음 — 건너뜀')
+        return
+    texts = list(_corpus(20).values())
+    fast = nd.MinHasher()
+    numpy, nd.np = nd.np, None
+    try:
+        slow = nd.MinHasher()
+        for text in texts:
+            grams = nd.shingles(text)
+            assert slow.signature(grams) == fast.signature(grams), text[:40]
+    finally:
+        nd.np = numpy
+    print(f'NumPy = 파이썬 서명: {len(texts)}개')
+
+
+def test_estimate_close_to_jaccard():
+    hasher = nd.MinHasher()
+    docs = _corpus(60)
+    worst = 0.0
+    for a, b in combinations(list(docs.values())[:80], 2):
+        ga, gb = nd.shingles(a), nd.shingles(b)
+        worst = max(worst, abs(nd.estimate(hasher.signature(ga), hasher.signature(gb)) - nd.jaccard(ga, gb)))
+    assert worst < 0.15, worst  # num_perm=128 → 표준오차 ≈ 0.044
+    print(f'추정 오차 최대 {worst:.3f}')
+
+
+def test_clusters_match_all_pairs():
+    docs = _corpus()
+    index = nd.NearDuplicateIndex(THRESHOLD)
+    for name, text in docs.items():
+        index.add('overall', name, text)
+    together = {}
+    for c in index.clusters():
+        for m in c['members']:
+            together[m] = c['members'][0]
+    grams = {name: nd.shingles(text) for name, text in docs.items()}
+    checked = 0
+    for a, b in combinations(docs, 2):
+        sim = nd.jaccard(grams[a], grams[b])
+        if sim >= THRESHOLD + MARGIN:
+            assert together.get(a) is not None and together.get(a) == together.get(b), (a, b, sim)
+            checked += 1
+        elif sim < THRESHOLD - MARGIN and together.get(a) is not None and together.get(a) == together.get(b):
+            # 연쇄로 같은 군집에 들 수는 있음 — 그럴 땐 둘을 잇는 사본이 있어야 함
+            assert a.split('~')[0] == b.split('~')[0], (a, b, sim)
+    pairs = len(docs) * (len(docs) - 1) // 2
+    assert index.compared < pairs // 10, (index.compared, pairs)
+    print(f'모든 쌍 비교와 일치: 유사 쌍 {checked}개, 후보 비교 {index.compared}/{pairs}회')
+
+
+def test_sections_are_separate():
+    index = nd.NearDuplicateIndex()
+    text = '오늘은 마음이 조용히 가라앉는 날이에요. 천천히 걸어도 괜찮아요.'
+    index.add('overall', 'a', text)
+    index.add('categories', 'b', text)
+    index.add_entry('overall_slots', 'g', {'slot0': [text, text]})
+    clusters = index.clusters()
+    assert [(c['section'], c['members']) for c in clusters] == [('overall_slots', ['g/slot0/0', 'g/slot0/1'])]
+    print('섹션끼리는 비교 안 함')
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    test_numpy_matches_python()
+    test_estimate_close_to_jaccard()
+    test_clusters_match_all_pairs()
+    test_sections_are_separate()
+    print('✅ 전부 통과')
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""ollama_client 테스트 — Ollama 서버 없이 (가짜 연결 / mock_ollama 핸들러)
+
+  - 유휴 연결이 끊겨 새 연결로 재전송했는데 그것도 실패 → 두 연결 모두 닫힘
+  - generate_stream 금지어 조기 중단: 1글자 토큰으로 쪼개져 와도 (8토큰보다 긴 어구 포함) 잡음
+    (mock_ollama 핸들러를 이 프로세스 안 임시 포트로 띄움)
+
+실행: python scripts/test_ollama_client.py   (pytest로도 실행 가능)
+"""
+import http.client
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ollama_client as oc  # noqa: E402
+from mock_ollama import MockOllamaHandler, fake_response  # noqa: E402
+
+PROMPT = '오늘 운세'
+
+
+class _FakeConn:
+    """request()에서 정해 둔 예외를 던지는 연결"""
+
+    def __init__(self, error):
+        self.error = error
+        self.closed = False
+
+    def request(self, *args, **kwargs):
+        raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+class _FakePool:
+    """미리 준비한 (연결, 재사용 여부)를 순서대로 내줌"""
+
+    def __init__(self, conns):
+        self.conns = list(conns)
+
+    def acquire(self, scheme, netloc, timeout):
+        return self.conns.pop(0)
+
+
+def _with_pool(pool, fn):
+    saved = oc._pool
+    oc._pool = pool
+    try:
+        return fn()
+    finally:
+        oc._pool = saved
+
+
+def test_stale_retry_failure_closes_new_connection():
+    stale = _FakeConn(http.client.RemoteDisconnected('idle closed'))
+    fresh = _FakeConn(ConnectionRefusedError('server down'))
+    pool = _FakePool([(stale, True), (fresh, False)])
+    try:
+        _with_pool(pool, lambda: oc._PooledResponse('http://127.0.0.1:1/api/generate', {}, 1.0))
+    except ConnectionRefusedError:
+        pass
+    else:
+        raise AssertionError('재전송 실패가 올라오지 않음')
+    assert stale.closed and fresh.closed
+    print('끊긴 유휴 연결 재전송 실패 → 두 연결 모두 닫힘')
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # 조기 중단으로 클라이언트가 끊은 연결 — 정상
+
+
+def _serve_mock(token_size: int):
+    """임시 포트 mock 서버 → (server, url)"""
+    handler = type('Handler', (MockOllamaHandler,), {'latency': 0.0, 'token_size': token_size})
+    server = _QuietServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/api/generate'
+
+
+def test_forbidden_split_across_tokens():
+    full = fake_response(PROMPT)
+    phrases = [full[20:37], full[60:69], full[5:7]]  # 17 / 9 / 2글자 — 본문 가운데에서 잘라 옴
+    for token_size in (1, 2, 3):
+        server, url = _serve_mock(token_size)
+        try:
+            for phrase in phrases:
+                result = oc.generate_stream(url, 'mock', PROMPT, forbidden=['없는 어구', phrase])
+                assert result['aborted'] and result['abort_reason'] == f'forbidden:{phrase}', (token_size, phrase)
+                # 어구가 끝나는 토큰에서 바로 끊김
+                assert len(result['text']) < full.index(phrase) + len(phrase) + token_size
+            result = oc.generate_stream(url, 'mock', PROMPT, forbidden=['없는 어구'])
+            assert not result['aborted'] and result['text'] == full
+        finally:
+            server.shutdown()
+            server.server_close()
+    print(f'토큰 경계에 걸친 금지어 조기 중단: {[len(p) for p in phrases]}글자 어구 × 토큰 1~3글자')
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    test_stale_retry_failure_closes_new_connection()
+    test_forbidden_split_across_tokens()
+    print('✅ 전부 통과')
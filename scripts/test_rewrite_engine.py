@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""rewrite_engine 테스트 — 사전 필터(required_literals) + RuleSet.apply = 순차 re.subn
+
+  - required_literals 건전성: 패턴이 텍스트에 걸리면 조건도 반드시 만족
+    (corpus_index가 검증 패턴 후보 축소에 그대로 씀 → 틀리면 적중이 조용히 빠짐)
+  - RuleSet.apply = 규칙을 순서대로 re.subn (아래 sequential_apply, 사전 필터 없음)
+    선택(|), {n,} 반복, 전후방 탐색, 인라인 플래그, 앞 규칙 결과가 뒤 규칙을 되살리는 연쇄
+  - 무작위 패턴 × 무작위 텍스트 (고정 시드, 작은 글자 집합이라 매치/연쇄가 자주 생김)
+
+실행: python scripts/test_rewrite_engine.py   (pytest로도 실행 가능)
+"""
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from rewrite_engine import Rule, RuleSet, _matches_all, leading_literal, required_literals  # noqa: E402
+
+ALPHABET = ['가', '나', '다', 'a', 'B', ' ', '.']
+FUZZ_RULE_SETS = 400
+FUZZ_TEXTS = 30
+# 손으로 고른 패턴 — 분기 / 반복 / 탐색 / 플래그 / 그룹 참조
+PATTERNS = [
+    '가나', '가|나다', '(가나|다)a', '(?:가|나)+다', '가{2,}나', '(?:가나){1,}', 'a{1,3}B', '가?나',
+    '가(?=나)', '(?<=다)가', '(?<!a)가나', '가(?!나)다', r'\b가', r'(\S+)는?\s*가',
+    '(?i)aB', '(?i:a)B', 'a(?i:b)', '[가나]다', '[^.]*가', '(가)\\1', '^가', '다$', r'가\s*나',
+]
+
+
+def sequential_apply(rules, text: str, base_hash: int = 0, shared_counter: bool = False):
+    """엔진 도입 전 방식 그대로 — 규칙마다 re.subn (기준 구현)"""
+    total = 0
+    shared = [0]
+    for rule in rules:
+        counter = shared if shared_counter else [0]
+        regex = re.compile(rule.pattern, rule.flags)
+        if rule.repl is not None:
+            text, n = regex.subn(rule.repl, text, count=rule.count)
+        else:
+            seed = base_hash + rule.seed_offset
+
+            def picker(m, rule=rule, seed=seed, counter=counter):
+                idx = counter[0]
+                counter[0] += 1
+                chosen = rule.candidates[(seed + idx) % len(rule.candidates)]
+                if rule.group_repl and '\\1' in chosen:
+                    return chosen.replace('\\1', m.group(1) if m.lastindex else '')
+                return chosen
+
+            text, n = regex.subn(picker, text, count=rule.count)
+        total += n
+    return text, total
+
+
+def _random_text(rng, n: int = 14) -> str:
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, n)))
+
+
+def _random_pattern(rng, depth: int = 0) -> str:
+    """작은 글자 집합으로 만든 무작위 정규식 (re.compile 되는 것만)"""
+    parts = []
+    for _ in range(rng.randint(1, 3)):
+        kind = rng.randrange(10 if depth < 2 else 5)
+        atom = re.escape(rng.choice(ALPHABET[:5])) + (rng.choice(ALPHABET[:5]) if rng.random() < 0.3 else '')
+        if kind <= 1:
+            parts.append(atom)
+        elif kind == 2:
+            parts.append(rng.choice(['[가나]', '[^가]', r'\s', r'\S', '.']))
+        elif kind == 3:
+            parts.append(f'(?=[{rng.choice(ALPHABET[:5])}{rng.choice(ALPHABET[:5])}])')
+        elif kind == 4:
+            parts.append(rng.choice(['(?<!가)', '(?<=나)', r'\b']))
+        elif kind == 5:
+            parts.append(f'(?:{_random_pattern(rng, depth + 1)}|{_random_pattern(rng, depth + 1)})')
+        elif kind == 6:
+            parts.append(f'(?:{_random_pattern(rng, depth + 1)}){rng.choice(["{1,}", "{2,}", "{0,2}", "+", "*", "?"])}')
+        elif kind == 7:
+            parts.append(f'({_random_pattern(rng, depth + 1)})')
+        elif kind == 8:
+            parts.append(f'(?i:{_random_pattern(rng, depth + 1)})')
+        else:
+            parts.append(f'(?={_random_pattern(rng, depth + 1)})')
+    return ''.join(parts)
+
+
+def _random_rules(rng) -> list:
+    """규칙 3~6개 — 후보는 같은 글자 집합이라 앞 규칙 결과가 뒤 규칙에 걸리는 연쇄가 자주 생김"""
+    rules = []
+    for i in range(rng.randint(3, 6)):
+        pattern = rng.choice(PATTERNS) if rng.random() < 0.4 else _random_pattern(rng)
+        flags = re.IGNORECASE if rng.random() < 0.1 else 0
+        if rng.random() < 0.3:
+            rules.append(Rule(pattern, repl=_random_text(rng, 3).replace('\\', ''), flags=flags,
+                              count=rng.choice([0, 0, 1, 2])))
+        else:
+            cands = [_random_text(rng, 3) for _ in range(rng.randint(1, 3))]
+            group_repl = re.compile(pattern, flags).groups > 0 and rng.random() < 0.5
+            if group_repl:
+                cands = [c + '\\1' for c in cands]
+            rules.append(Rule(pattern, candidates=cands, flags=flags, seed_offset=i * 7, group_repl=group_repl))
+    return rules
+
+
+def test_required_literals_sound():
+    rng = random.Random(12)
+    patterns = PATTERNS + [_random_pattern(rng) for _ in range(1500)]
+    n = 0
+    for pattern in patterns:
+        regex = re.compile(pattern)
+        requires = required_literals(pattern)
+        head = leading_literal(pattern)
+        for _ in range(40):
+            text = _random_text(rng)
+            for m in regex.finditer(text):
+                assert _matches_all(requires, text), (pattern, requires, text)
+                assert text.startswith(head, m.start()), (pattern, head, text)
+                n += 1
+    print(f'required_literals / leading_literal 건전: 패턴 {len(patterns)}개, 매치 {n}개')
+
+
+def test_inline_ignorecase():
+    assert required_literals('(?i)ab') == ()
+    assert required_literals('(?i:ab)c') == (('c',),)
+    assert leading_literal('(?i)ab') == ''
+    assert leading_literal('(?i:a)b') == ''
+    assert required_literals('ab', re.IGNORECASE) == ()
+    print('인라인 (?i) / (?i:...) → 그 부분은 조건 없음')
+
+
+def test_chained_rewrites():
+    rules = [Rule('가나', repl='다'), Rule('다다', candidates=['aB', 'B']), Rule('(?<=a)B', repl='가나'),
+             Rule('가나', repl='끝')]
+    rs = RuleSet(rules)
+    for text in ['가나다', '다가나', '가나가나', 'aa다다', '가다']:
+        assert rs.apply(text, 3) == sequential_apply(rules, text, 3), text
+    assert rs.apply('다다', 0) == ('a끝', 3)  # 다다 → aB → a가나 → a끝: 처음엔 없던 규칙 2개가 되살아남
+    assert rs.stats()[2] >= 2
+    print('연쇄 치환 (뒤 규칙 되살림) = 순차 re.subn')
+
+
+def test_fuzz_matches_sequential():
+    rng = random.Random(20261017)
+    n = 0
+    for _ in range(FUZZ_RULE_SETS):
+        rules = _random_rules(rng)
+        for shared in (False, True):
+            rs = RuleSet(rules, shared_counter=shared)
+            for _ in range(FUZZ_TEXTS):
+                text, base = _random_text(rng, 20), rng.randrange(1000)
+                assert rs.apply(text, base) == sequential_apply(rules, text, base, shared), \
+                    ([r.pattern for r in rules], text, base, shared)
+                n += 1
+    print(f'무작위 규칙 묶음 = 순차 re.subn: {n}개')
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    test_required_literals_sound()
+    test_inline_ignorecase()
+    test_chained_rewrites()
+    test_fuzz_matches_sequential()
+    print('✅ 전부 통과')
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""generate_narratives_v2.run_jobs 테스트 — 묶음 응답이 일부만 파싱돼도 OK로 치지 않음
+
+  - 묶음 작업(기대 키 3개)이 1개만 파싱 → 실패로 셈, 파싱된 키만 저장 + 매니페스트 기록
+  - 0개 파싱 → 실패, 아무것도 안 저장
+  - 전부 파싱 → 성공
+  - 매니페스트에 안 남은 키 = 다음 단계(단건 호출)에서 다시 생성할 키
+
+실행: python scripts/test_run_jobs.py   (pytest로도 실행 가능)
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_narratives_v2 as gen  # noqa: E402
+from checkpoint_journal import CheckpointJournal  # noqa: E402
+from regen_manifest import RegenManifest  # noqa: E402
+
+DECISION = "🟢 보고서 초안 끝내기\n🟡 친구와 돈 약속\n🔴 새 투자 결정"
+RESPONSES = {
+    'full': '\n'.join(f'[{s}]\n{DECISION}' for s in ('장생', '목욕', '관대')),
+    'short': f'[장생]\n{DECISION}\n[목욕]\n🟢 하나만',   # 목욕은 항목이 모자람, 관대는 없음
+    'none': '형식을 안 지킨 응답',
+}
+
+
+def _batch_job(name: str, stages):
+    return (name, name, {},
+            lambda text, stages=stages, name=name: {f'{name}_{s}': d
+                                                     for s, d in gen.parse_decision_batch(text, stages).items()},
+            lambda: {}, len(stages))
+
+
+def test_short_batch_parse_counts_as_failure():
+    stages = ['장생', '목욕', '관대']
+    keys = [f'{name}_{s}' for name in RESPONSES for s in stages]
+    fingerprints = {k: f'h-{k}' for k in keys}
+    saved = gen.call_ai
+    gen.call_ai = lambda prompt, **_: RESPONSES[prompt]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'v2.json')
+            journal = CheckpointJournal(out, ['decisions'])
+            manifest = RegenManifest(out, ['decisions'])
+            results = {'decisions': {}}
+            jobs = [_batch_job(name, stages) for name in RESPONSES]
+            stored, failed, _ = gen.run_jobs(jobs, 'decisions', results, journal, 2, manifest, fingerprints)
+            journal.close()
+    finally:
+        gen.call_ai = saved
+
+    assert (stored, failed) == (4, 2), (stored, failed)
+    assert sorted(results['decisions']) == sorted(['full_장생', 'full_목욕', 'full_관대', 'short_장생'])
+    retry = [k for k in keys if manifest.get('decisions', k) != fingerprints[k]]
+    assert retry == ['short_목욕', 'short_관대', 'none_장생', 'none_목욕', 'none_관대']
+    print(f'묶음 일부 파싱 → 실패 {failed}건, 단건 재시도 대상 {len(retry)}키')
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    test_short_batch_parse_counts_as_failure()
+    print('✅ 전부 통과')
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""generate_slots 슬롯 중복 제거 테스트
+
+  - exact 모드 = 기존 리스트 기반 중복 제거 (아래 legacy_dedup, 그대로 둠) — 코퍼스 + 파편을 부풀린 큰 풀
+  - normalized: 띄어쓰기/문장부호만 다른 파편이 하나로, 처음 나온 것이 남음
+  - near: 글자 한두 개만 다른 파편이 하나로, 다른 그룹·슬롯끼리는 안 합침
+
+실행: python scripts/test_slot_dedup.py   (pytest로도 실행 가능)
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_slots as gs  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+NARRATIVES = os.path.join(ROOT, 'src', 'data', 'generated', 'narratives_generated_v1plus.json')
+
+
+def legacy_dedup(groups: dict) -> dict:
+    """기존 build_slot_pools 마지막 단계 그대로 (slot0 첫 4자 + 리스트 in, slot1~3 리스트 in)"""
+    out = {}
+    for gk, slots_dict in groups.items():
+        out[gk] = {}
+        for slot_name, texts in slots_dict.items():
+            if slot_name == 'slot0':
+                seen_starts = set()
+                kept = []
+                for t in texts:
+                    start = t[:4]
+                    if start not in seen_starts and t not in kept:
+                        seen_starts.add(start)
+                        kept.append(t)
+                out[gk][slot_name] = kept
+            else:
+                seen = []
+                for t in texts:
+                    if t not in seen:
+                        seen.append(t)
+                out[gk][slot_name] = seen
+    return out
+
+
+def _overall(copies: int = 1, seed: int = 5) -> list:
+    """(키, 본문) — copies > 1이면 같은 키 본문을 문장 순서만 섞은 사본을 붙여 풀을 키움"""
+    with open(NARRATIVES, 'r', encoding='utf-8') as f:
+        overall = list(json.load(f)['overall'].items())
+    rng = random.Random(seed)
+    items = list(overall)
+    for c in range(1, copies):
+        for key, text in overall:
+            sents = gs.split_sentences(text)
+            rng.shuffle(sents)
+            items.append((f'{key}{c}x', ' '.join(sents)))
+    return items
+
+
+def _raw_pools(items) -> dict:
+    """중복 제거 전 풀 (기존 코드가 중복 제거 직전에 갖고 있던 것)"""
+    groups = {}
+    for k, text in items:
+        slots = gs.split_4slots(text)
+        gk = gs.overall_key_extractor(k)
+        if slots is None or gk is None:
+            continue
+        pool = groups.setdefault(gk, {f'slot{i}': [] for i in range(4)})
+        for i, slot_sents in enumerate(slots):
+            joined = ' '.join(slot_sents).strip()
+            if joined:
+                pool[f'slot{i}'].append(joined)
+    return groups
+
+
+def test_exact_matches_legacy():
+    for copies in (1, 8):
+        items = _overall(copies)
+        got, _, _ = gs.build_slot_pools(iter(items), gs.overall_key_extractor, 'exact')
+        assert got == legacy_dedup(_raw_pools(items)), copies
+    print('exact = 기존 중복 제거 (원본, 8배 풀)')
+
+
+def test_normalized_folds_spacing_and_punctuation():
+    texts = {
+        '비견_yongsin_장생': '오늘은 천천히 가도 좋아요. 둘째 문장이에요. 셋째 문장이에요. 넷째 문장이에요. 다섯째 문장이에요.',
+        '비견_yongsin_목욕': '천천히 가도 괜찮아요. 둘째 문장이에요! 셋째 문장이에요 . 넷째, 문장이에요. 다섯째 문장이에요.',
+        '비견_yongsin_관대': '새로 여는 날이에요. 둘째 문장이지요. 셋째 문장이에요. 넷째 문장이에요. 다섯째 문장이에요.',
+    }
+    exact, _, _ = gs.build_slot_pools(texts, gs.overall_key_extractor, 'exact')
+    norm, _, _ = gs.build_slot_pools(texts, gs.overall_key_extractor, 'normalized')
+    assert exact['비견_yongsin']['slot1'] == ['둘째 문장이에요.', '둘째 문장이에요!', '둘째 문장이지요.']
+    assert norm['비견_yongsin']['slot1'] == ['둘째 문장이에요.', '둘째 문장이지요.']
+    assert len(exact['비견_yongsin']['slot2']) == 2
+    assert norm['비견_yongsin']['slot2'] == ['셋째 문장이에요. 넷째 문장이에요.']
+    assert norm['비견_yongsin']['slot0'] == exact['비견_yongsin']['slot0']
+    print('normalized: 띄어쓰기/기호만 다른 파편 합침, 처음 것 유지')
+
+
+def test_near_folds_small_edits_within_scope():
+    body = '조용히 흐름을 지켜보면 생각보다 많은 것이 제자리를 찾아가는 하루예요.'
+    texts = {
+        '비견_yongsin_장생': f'첫 문장이에요. {body} 셋째 문장이에요. 넷째 문장이에요. 다섯째 문장이에요.',
+        '비견_yongsin_목욕': f'다른 도입이에요. {body[:-1]} 정말. 셋째 문장이에요. 넷째 문장이에요. 다섯째 문장이에요.',
+        '겁재_yongsin_장생': f'첫 문장이에요. {body} 셋째 문장이에요. 넷째 문장이에요. 다섯째 문장이에요.',
+    }
+    norm, _, _ = gs.build_slot_pools(texts, gs.overall_key_extractor, 'normalized')
+    deduper = gs.SlotDeduper('near')
+    near, _, _ = gs.build_slot_pools(texts, gs.overall_key_extractor, deduper)
+    assert len(norm['비견_yongsin']['slot1']) == 2
+    assert near['비견_yongsin']['slot1'] == [body]
+    assert near['겁재_yongsin']['slot1'] == [body]  # 다른 그룹은 따로
+    print(f'near: 거의 같은 파편 합침 (뺀 파편 {deduper.dropped}개)')
+
+
+def _dedup(raw: dict, mode: str) -> dict:
+    deduper = gs.SlotDeduper(mode)
+    return {gk: {slot: [t for t in texts if deduper.admit(f'{gk}/{slot}', t, check_start=(slot == 'slot0'))]
+                 for slot, texts in pool.items()} for gk, pool in raw.items()}
+
+
+def benchmark(copies: int = 40):
+    """중복 제거만 (풀 빌드 전 파편 → 중복 제거된 풀), 원본 copies배로 부풀린 풀"""
+    raw = _raw_pools(_overall(copies))
+    biggest = max(len(v) for pool in raw.values() for v in pool.values())
+    print(f'  파편 {sum(len(v) for pool in raw.values() for v in pool.values())}개, 슬롯당 최대 {biggest}개')
+    for name, fn in [('기존 (리스트 in)', legacy_dedup)] + [(m, lambda r, m=m: _dedup(r, m)) for m in gs.DEDUP_MODES]:
+        start = time.perf_counter()
+        fn(raw)
+        print(f'  {name:16} {(time.perf_counter() - start) * 1000:8.1f}ms')
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    test_exact_matches_legacy()
+    test_normalized_folds_spacing_and_punctuation()
+    test_near_folds_small_edits_within_scope()
+    print('✅ 전부 통과')
+    print('\n=== 중복 제거 시간 (원본 40배 풀) ===')
+    benchmark()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""slots_compact 테스트 — 압축 형식 왕복 = slots 파일 그대로
+
+  - 실제 slots 파일: pack → JSON 문자열 → unpack 이 json.load 결과와 같음 (키 순서 포함)
+  - 여러 그룹/카테고리에 나오는 같은 문자열은 표에 1번만
+  - format이 다르면 ValueError
+  - compare_in_memory(파일 안 씀) 크기 = 실제로 쓴 압축 파일 크기
+
+실행: python scripts/test_slots_compact.py   (pytest로도 실행 가능)
+"""
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import slots_compact as sc  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SLOTS = os.path.join(ROOT, 'src', 'data', 'generated', 'narratives_slots_v1.json')
+
+
+def test_roundtrip_real_file():
+    with open(SLOTS, 'r', encoding='utf-8') as f:
+        doc = json.load(f)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'slots_compact.json')
+        sc.write_compact(path, doc)
+        got = sc.load_compact(path)
+    assert got == doc
+    assert [list(pool) for pool in got['overall_slots'].values()] == [list(pool) for pool in doc['overall_slots'].values()]
+    assert list(got['categories']) == list(doc['categories'])
+    print(f"실제 slots 파일 왕복 일치: 그룹 {len(doc['overall_slots'])}개, 카테고리 {len(doc['categories'])}개")
+
+
+def test_shared_strings_interned():
+    doc = {
+        'overall_slots': {
+            'a': {'slot0': ['x', 'y'], 'slot1': ['z'], 'slot2': [], 'slot3': ['x']},
+            'b': {'slot0': ['y'], 'slot1': ['z'], 'slot2': ['w'], 'slot3': []},
+        },
+        'categories': {'wealth_a': 'w', 'love_a': 'v'},
+        'meta': {'version': 'slots_v1'},
+    }
+    compact = sc.pack(doc)
+    assert compact['strings'] == ['x', 'y', 'z', 'w', 'v']
+    assert compact['overall_slots'] == {'a': [[0, 1], [2], [], [0]], 'b': [[1], [2], [3], []]}
+    assert compact['categories'] == {'wealth_a': 3, 'love_a': 4}
+    assert sc.unpack(json.loads(sc.dumps_compact(compact))) == doc
+    print('같은 문자열은 표에 1번')
+
+
+def test_rejects_other_format():
+    for bad in ({}, {'format': 'slots_v1'}):
+        try:
+            sc.unpack(bad)
+        except ValueError:
+            continue
+        raise AssertionError(bad)
+    try:
+        sc.pack({'overall_slots': {'a': {'slot4': []}}})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('모르는 슬롯 이름 통과')
+    print('다른 형식 / 모르는 슬롯 거부')
+
+
+def test_compare_in_memory_matches_written_file():
+    with open(SLOTS, 'r', encoding='utf-8') as f:
+        text = f.read()
+    rows, compact = sc.compare_in_memory(text, repeat=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'slots_compact.json')
+        assert sc.write_compact(path, json.loads(text)) == compact
+        assert [r[1:3] for r in rows] == [r[1:3] for r in sc.compare(SLOTS, path, repeat=1)]
+    assert all(r[4] is None for r in rows)  # node 안 띄움
+    print(f'메모리 비교 크기 = 파일 크기: {rows[0][1]} → {rows[1][1]} 바이트')
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    test_roundtrip_real_file()
+    test_shared_strings_interned()
+    test_rejects_other_format()
+    test_compare_in_memory_matches_written_file()
+    print('✅ 전부 통과')
@@ -8,13 +8,17 @@
 3. 키 완전성 (overall 360, categories 120)
 4. 다양성 (어절 빈도 Gini 계수)
 5. 1인 가구 배려 (관계 의존 어절 비율)
+6. 거의 같은 본문 (MinHash/LSH 군집 — near_duplicates)
 """
-import json
 import re
 import sys
 import os
 from collections import Counter
 
+from corpus_index import CorpusIndex, np
+from narrative_stream import iter_entries
+from near_duplicates import NearDuplicateIndex, summarize
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 INPUT = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
@@ -44,17 +48,21 @@ BROKEN_GRAMMAR = [
     (r'결과를\s+(꾸준함의|시간이|결국 길이)', '결과를 + 단절 (Phase1)'),
 ]
 
-# Phase 1 + B안: 신 클리셰 폭증 검출
-# bucket 도입(원본+_1+_2 = 3배)으로 인해 임계값도 3배 조정
-# bucket 7배 적용 → 임계값도 7배
+# 금지어가 이 건수 이상이면 ERROR (미만이면 WARN)
+FORBIDDEN_ERROR_COUNT = 30
+
+# Phase 1 + B안: 신 클리셰 폭증 검출 (원본 키 기준 임계값)
+# bucket 1~6은 이제 파일에 안 펼침 (generate_buckets.BucketSource로 on-demand) → 7배 보정 제거.
+# generate_buckets --export 로 펼친 파일을 검증할 때만 키당 본문 수만큼 건수 임계값을 자동으로 곱함.
 POST_TRANSFORM_FREQ = [
-    ('뜻밖의', 420),
-    ('생각지 못한', 420),
-    ('예기치 못한', 420),
-    ('인연이 닿는 사람', 350),
-    ('오늘 만나는 사람', 350),
-    ('곁에 있는 사람', 350),
+    ('뜻밖의', 60),
+    ('생각지 못한', 60),
+    ('예기치 못한', 60),
+    ('인연이 닿는 사람', 50),
+    ('오늘 만나는 사람', 50),
+    ('곁에 있는 사람', 50),
 ]
+BUCKET_KEY = re.compile(r'_[1-6]$')  # 펼친 파일의 bucket 1~6 키
 
 # 1인 가구 배려: 이 어절이 너무 많으면 경고
 RELATION_WORDS = ['동료', '상사', '선배', '가족', '연인', '저녁 약속']
@@ -66,6 +74,11 @@ LENGTH_MAX_OVERALL = 800
 LENGTH_MIN_CAT = 20
 LENGTH_MAX_CAT = 400
 
+# 거의 같은 본문: 자카드 유사도(글자 5-gram) 이 값 이상이면 군집 → ERROR
+# (overall/categories 전부, overall_slots는 같은 그룹·같은 슬롯 안. 다른 그룹끼리는 WARN)
+NEAR_DUP_THRESHOLD = 0.9
+NEAR_DUP_SHOW = 5  # 출력할 군집 수
+
 # 예상 키 수
 EXPECTED_OVERALL = 360
 EXPECTED_CATEGORIES = 120
@@ -75,6 +88,14 @@ def gini(counts):
     """어절 빈도의 Gini 계수 (불평등 지표). 0=완전평등, 1=완전불평등"""
     if not counts:
         return 0.0
+    if np is not None:  # 정수 합은 그대로 정확 → 아래 순수 파이썬 경로와 같은 값
+        sorted_counts = np.sort(np.asarray(counts, dtype=np.int64))
+        n = len(sorted_counts)
+        cumsum = int((np.arange(1, n + 1, dtype=np.int64) * sorted_counts).sum())
+        total = int(sorted_counts.sum())
+        if total == 0:
+            return 0.0
+        return (2 * cumsum) / (n * total) - (n + 1) / n
     sorted_counts = sorted(counts)
     n = len(sorted_counts)
     cumsum = 0
@@ -86,57 +107,114 @@ def gini(counts):
     return (2 * cumsum) / (n * total) - (n + 1) / n
 
 
+LENGTH_RANGES = {
+    'overall': (LENGTH_MIN_OVERALL, LENGTH_MAX_OVERALL),
+    'categories': (LENGTH_MIN_CAT, LENGTH_MAX_CAT),
+}
+SCAN_SECTIONS = list(LENGTH_RANGES) + ['overall_slots']  # overall_slots는 거의 같은 본문 검사만
+
+
+def _slot_scope(name: str) -> str:
+    """overall_slots 문서 이름 '그룹/slotN/번호' → '그룹/slotN'"""
+    return name.rsplit('/', 1)[0]
+
+
+class CorpusScan:
+    """입력 1회 스트리밍 → 단어-문서 색인(corpus_index) + MinHash 색인(near_duplicates) + 문서별 집계
+
+    금지어/문법/클리셰/관계 어절 검사는 전부 색인 질의 (검사마다 전체 스캔 안 함)
+    """
+
+    def __init__(self):
+        self.index = CorpusIndex()
+        self.near = NearDuplicateIndex(NEAR_DUP_THRESHOLD)
+        self.sizes = Counter()      # 섹션 → 원본(bucket 0) 키 수
+        self.bucket_keys = 0        # 펼친 파일의 bucket 1~6 키 수
+        self.starts = Counter()     # 첫 2글자
+        self.short = Counter()      # 섹션 → 너무 짧은 항목 수
+        self.long = Counter()
+
+    @property
+    def total(self) -> int:
+        return len(self.index)
+
+    @property
+    def variants(self) -> int:
+        """원본 키당 본문 수 (원본만 있는 파일 = 1, bucket 0~6 펼친 파일 = 7)"""
+        base = sum(self.sizes.values())
+        return max(1, round(self.total / base)) if base else 1
+
+    def add(self, section: str, key: str, text: str):
+        self.index.add(section, text)
+        self.near.add(section, key, text)
+        if BUCKET_KEY.search(key):
+            self.bucket_keys += 1
+        else:
+            self.sizes[section] += 1
+        self.starts[text.lstrip()[:2]] += 1
+        lo, hi = LENGTH_RANGES[section]
+        if len(text) < lo:
+            self.short[section] += 1
+        if len(text) > hi:
+            self.long[section] += 1
+
+
+def scan_corpus(path: str) -> CorpusScan:
+    scan = CorpusScan()
+    for section, key, value in iter_entries(path, SCAN_SECTIONS):
+        if section in LENGTH_RANGES:
+            scan.add(section, key, value)
+        else:
+            scan.near.add_entry(section, key, value)
+    scan.index.finalize()
+    return scan
+
+
 def main():
     print(f"검증 대상: {INPUT}\n")
-    with open(INPUT, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    scan = scan_corpus(INPUT)
 
     errors = []
     warnings = []
     info = []
 
-    overall = data.get('overall', {})
-    categories = data.get('categories', {})
+    n_overall, n_categories = scan.sizes['overall'], scan.sizes['categories']
 
     # 1. 키 개수
-    info.append(f"overall: {len(overall)}/{EXPECTED_OVERALL}")
-    info.append(f"categories: {len(categories)}/{EXPECTED_CATEGORIES}")
-    if len(overall) < EXPECTED_OVERALL:
-        warnings.append(f"overall 키 부족: {len(overall)}/{EXPECTED_OVERALL}")
+    info.append(f"overall: {n_overall}/{EXPECTED_OVERALL}")
+    info.append(f"categories: {n_categories}/{EXPECTED_CATEGORIES}")
+    if n_overall < EXPECTED_OVERALL:
+        warnings.append(f"overall 키 부족: {n_overall}/{EXPECTED_OVERALL}")
+    scale = scan.variants  # 건수 임계값 배수 (펼친 파일일 때만 > 1)
+    if scan.bucket_keys:
+        info.append(f"bucket 펼친 파일: bucket 키 {scan.bucket_keys}개 → 건수 임계값 ×{scale}")
 
     # 2. 금지어
     print("=== 금지어 검증 ===")
-    all_texts = []
-    for k, v in overall.items():
-        all_texts.append((f"overall/{k}", v))
-    for k, v in categories.items():
-        all_texts.append((f"categories/{k}", v))
-
-    forbidden_hits = {}
+    index = scan.index
     for pattern, label in FORBIDDEN:
-        hits = [k for k, t in all_texts if re.search(pattern, t)]
-        forbidden_hits[label] = len(hits)
-        symbol = '✅' if len(hits) == 0 else ('⚠️' if len(hits) < 10 else '❌')
-        print(f"  {symbol} {label:20} {len(hits):3}건")
-        # bucket 7배 적용 → 임계값도 7배 (30 → 210)
-        if len(hits) >= 210:
-            errors.append(f"금지어 다수: {label} ({len(hits)}건)")
-        elif len(hits) > 0:
-            warnings.append(f"금지어 잔존: {label} ({len(hits)}건)")
+        hits = index.count_regex(pattern)
+        symbol = '✅' if hits == 0 else ('⚠️' if hits < 10 else '❌')
+        print(f"  {symbol} {label:20} {hits:3}건")
+        if hits >= FORBIDDEN_ERROR_COUNT * scale:
+            errors.append(f"금지어 다수: {label} ({hits}건)")
+        elif hits > 0:
+            warnings.append(f"금지어 잔존: {label} ({hits}건)")
 
     # 2.5 깨진 문법 (ERROR 레벨)
     print("\n=== 깨진 문법 검증 ===")
     for pattern, label in BROKEN_GRAMMAR:
-        hits = [k for k, t in all_texts if re.search(pattern, t)]
-        symbol = '✅' if len(hits) == 0 else '❌'
-        print(f"  {symbol} {label:30} {len(hits):3}건")
-        if len(hits) > 0:
-            errors.append(f"깨진 문법: {label} ({len(hits)}건)")
+        hits = index.count_regex(pattern)
+        symbol = '✅' if hits == 0 else '❌'
+        print(f"  {symbol} {label:30} {hits:3}건")
+        if hits > 0:
+            errors.append(f"깨진 문법: {label} ({hits}건)")
 
     # 2.7 신 클리셰 폭증 검증 (Phase 1 신규)
     print("\n=== 신 클리셰 빈도 (50~60회 임계값) ===")
     for word, threshold in POST_TRANSFORM_FREQ:
-        cnt = sum(1 for _, t in all_texts if word in t)
+        threshold *= scale
+        cnt = index.count_substring(word)
         symbol = '✅' if cnt < threshold else ('⚠️' if cnt < threshold * 1.5 else '❌')
         print(f"  {symbol} '{word}': {cnt}회 (임계 {threshold})")
         if cnt >= threshold * 1.5:
@@ -146,12 +224,9 @@ def main():
 
     # 2.6 첫 문장 다양성
     print("\n=== 첫 문장 다양성 ===")
-    starts = Counter()
-    for _, t in all_texts:
-        first = t.lstrip()[:2]
-        starts[first] += 1
+    starts = scan.starts
     top1, top1_cnt = starts.most_common(1)[0]
-    top1_pct = top1_cnt / len(all_texts) * 100
+    top1_pct = top1_cnt / scan.total * 100
     symbol = '✅' if top1_pct < 30 else ('⚠️' if top1_pct < 45 else '❌')
     print(f"  {symbol} 가장 흔한 시작: '{top1}' ({top1_cnt}건, {top1_pct:.1f}%)")
     if top1_pct >= 45:
@@ -160,30 +235,23 @@ def main():
         warnings.append(f"첫 문장 편중: '{top1}' {top1_pct:.0f}%")
     print(f"  Top 5 첫 글자:")
     for s, c in starts.most_common(5):
-        print(f"    '{s:3}' {c:>4}건 ({c/len(all_texts)*100:.1f}%)")
+        print(f"    '{s:3}' {c:>4}건 ({c/scan.total*100:.1f}%)")
 
     # 3. 길이
     print("\n=== 길이 검증 ===")
-    short_overall = [k for k, t in overall.items() if len(t) < LENGTH_MIN_OVERALL]
-    long_overall = [k for k, t in overall.items() if len(t) > LENGTH_MAX_OVERALL]
-    short_cat = [k for k, t in categories.items() if len(t) < LENGTH_MIN_CAT]
-    long_cat = [k for k, t in categories.items() if len(t) > LENGTH_MAX_CAT]
-
-    print(f"  overall 너무 짧음 ({LENGTH_MIN_OVERALL}자 미만): {len(short_overall)}건")
-    print(f"  overall 너무 긺 ({LENGTH_MAX_OVERALL}자 초과): {len(long_overall)}건")
-    print(f"  category 너무 짧음 ({LENGTH_MIN_CAT}자 미만): {len(short_cat)}건")
-    print(f"  category 너무 긺 ({LENGTH_MAX_CAT}자 초과): {len(long_cat)}건")
-    if short_overall: warnings.append(f"overall 짧은 항목: {len(short_overall)}건")
-    if long_cat: warnings.append(f"category 긴 항목: {len(long_cat)}건")
+    short_overall, long_overall = scan.short['overall'], scan.long['overall']
+    short_cat, long_cat = scan.short['categories'], scan.long['categories']
+
+    print(f"  overall 너무 짧음 ({LENGTH_MIN_OVERALL}자 미만): {short_overall}건")
+    print(f"  overall 너무 긺 ({LENGTH_MAX_OVERALL}자 초과): {long_overall}건")
+    print(f"  category 너무 짧음 ({LENGTH_MIN_CAT}자 미만): {short_cat}건")
+    print(f"  category 너무 긺 ({LENGTH_MAX_CAT}자 초과): {long_cat}건")
+    if short_overall: warnings.append(f"overall 짧은 항목: {short_overall}건")
+    if long_cat: warnings.append(f"category 긴 항목: {long_cat}건")
 
     # 4. 어절 다양성
     print("\n=== 어절 다양성 (Gini 계수) ===")
-    word_counter = Counter()
-    for _, t in all_texts:
-        for word in re.split(r'\s+', t):
-            w = re.sub(r'[^\w가-힣]', '', word)
-            if len(w) >= 2:
-                word_counter[w] += 1
+    word_counter = index.word_counts(min_len=2)
 
     counts = list(word_counter.values())
     g = gini(counts)
@@ -198,16 +266,45 @@ def main():
 
     # 5. 관계 의존 어절 비율
     print("\n=== 1인 가구 배려 (관계 의존 어절) ===")
-    total_count = len(all_texts)
+    total_count = scan.total
     for word in RELATION_WORDS:
-        cnt = sum(1 for _, t in all_texts if word in t)
+        cnt = index.count_substring(word)
         pct = cnt / total_count
         symbol = '✅' if pct < RELATION_THRESHOLD else '⚠️'
         print(f"  {symbol} '{word}': {cnt}/{total_count} ({pct*100:.1f}%)")
         if pct >= RELATION_THRESHOLD:
             warnings.append(f"'{word}' 등장 {pct*100:.0f}% (1인 가구 배려)")
 
-    # 6. 파일 크기
+    # 6. 거의 같은 본문 (MinHash/LSH — 모든 쌍 비교 대신 후보 쌍만)
+    print(f"\n=== 거의 같은 본문 (자카드 ≥ {NEAR_DUP_THRESHOLD}) ===")
+    near = scan.near
+    clusters = near.clusters()
+    slot_dups, slot_cross = [], []
+    for c in clusters:
+        if c['section'] == 'overall_slots':
+            scopes = Counter(_slot_scope(m) for m in c['members'])
+            (slot_dups if scopes.most_common(1)[0][1] > 1 else slot_cross).append(c)
+    dups = [c for c in clusters if c['section'] != 'overall_slots'] + slot_dups
+    summary = summarize(dups)
+    for section in SCAN_SECTIONS:
+        n, docs = summary.get(section, (0, 0))
+        symbol = '✅' if n == 0 else '❌'
+        print(f"  {symbol} {section:15} 군집 {n:3}개 (본문 {docs}개)")
+    if slot_cross:
+        print(f"  ⚠️  overall_slots 다른 그룹끼리: 군집 {len(slot_cross)}개")
+    print(f"  후보 쌍 비교 {near.compared}회 / 본문 {len(near)}개")
+    for c in (dups + slot_cross)[:NEAR_DUP_SHOW]:
+        shown = ', '.join(c['members'][:4]) + (f" 외 {c['size'] - 4}개" if c['size'] > 4 else '')
+        print(f"    [{c['section']}] 유사도 {c['min_similarity']:.2f}~{c['max_similarity']:.2f}: {shown}")
+    for section in SCAN_SECTIONS:
+        if section not in summary:
+            continue
+        n, docs = summary[section]
+        errors.append(f"거의 같은 본문: {section} 군집 {n}개 (본문 {docs}개)")
+    if slot_cross:
+        warnings.append(f"overall_slots 다른 그룹에 거의 같은 파편: {len(slot_cross)}개")
+
+    # 7. 파일 크기
     print("\n=== 파일 크기 ===")
     size = os.path.getsize(INPUT)
     print(f"  {size/1024:.1f} KB ({'OK' if size < 600*1024 else 'WARN: 번들 부담'})")
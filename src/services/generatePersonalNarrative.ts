@@ -72,13 +72,49 @@ interface AINarrativesSlots {
   meta?: { version: string; overall_groups: number };
 }
 
+// 압축 slots 형식 (scripts/slots_compact.py, format = 'slots_compact_v1')
+// 문자열 표 1개 + 그룹·슬롯별 번호 배열 — 읽는 쪽 계약:
+//   overall_slots[그룹][slot_names[i]] = overall_slots[그룹][i].map(n => strings[n])
+//   categories[키] = strings[categories[키]]
+// 현재 데이터는 파편 1,415개 중 그룹 간 중복이 1개뿐 → 크기 -2.1%, gzip +2.7%, 파싱(+펼치기)은 더 느림
+// → 앱은 계속 narratives_slots_v1.json을 읽고, 그룹 간 중복이 커지면 같은 require 자리에서 그대로 교체
+// (readSlotsArtifact가 두 형식 모두 받음, 수치는 generate_slots.py "파일 크기" / pipeline.py slots_compact 출력)
+interface AINarrativesSlotsCompact {
+  format: 'slots_compact_v1';
+  strings: string[];
+  slot_names: string[];
+  overall_slots: Record<string, number[][]>;
+  categories: Record<string, number>;
+  meta?: { version: string; overall_groups: number };
+}
+
+function expandCompactSlots(c: AINarrativesSlotsCompact): AINarrativesSlots {
+  const overall: AINarrativesSlots['overall_slots'] = {};
+  for (const group of Object.keys(c.overall_slots)) {
+    const pools = c.overall_slots[group];
+    const pool: Record<string, string[]> = {};
+    c.slot_names.forEach((name, i) => { pool[name] = (pools[i] ?? []).map((n) => c.strings[n]); });
+    overall[group] = pool as AINarrativesSlots['overall_slots'][string];
+  }
+  const categories: Record<string, string> = {};
+  for (const key of Object.keys(c.categories)) categories[key] = c.strings[c.categories[key]];
+  return { overall_slots: overall, categories, meta: c.meta };
+}
+
+// slots 파일 → AINarrativesSlots (기존 형식은 그대로, 압축 형식은 펼쳐서)
+function readSlotsArtifact(raw: AINarrativesSlots | AINarrativesSlotsCompact): AINarrativesSlots {
+  return (raw as AINarrativesSlotsCompact).format === 'slots_compact_v1'
+    ? expandCompactSlots(raw as AINarrativesSlotsCompact)
+    : (raw as AINarrativesSlots);
+}
+
 let AI_SLOTS: AINarrativesSlots | null = null;
 let AI_NARRATIVES: AINarrativesV1 | null = null;  // 폴백용
 let AI_VERSION: 'slots_v1' | 'v1plus' | 'v1' = 'v1';
 
-// 우선순위: slots_v1 (단락 셔플) > v1plus (가짜 bucket) > v1 (원본)
+// 우선순위: slots_v1 (단락 셔플) > v1plus (후처리본, bucket 1~6은 파일에 없음 — 원본 키만 사용) > v1 (원본)
 try {
-  AI_SLOTS = require('../data/generated/narratives_slots_v1.json');
+  AI_SLOTS = readSlotsArtifact(require('../data/generated/narratives_slots_v1.json'));
   AI_VERSION = 'slots_v1';
 } catch (e) {
   try {